@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Record/replay wrapper for one `codex exec` call (CODEX_CASSETTE=record|replay).
+
+record  run the wrapped `[timeout N] codex exec ...` command and store its --output-last-message
+        file, exit code, stdout/stderr and duration as <key>.json under CODEX_CASSETTE_DIR
+        (default <repo>/.skilled-reviews/.cassettes)
+replay  serve the stored entry back without running codex; a missing entry fails the call.
+        CODEX_CASSETTE_LATENCY delays the answer: seconds, `recorded` or `recorded:<scale>`
+
+The key hashes the `exec ...` arguments and the prompt, with the repo root and the run-id path
+segment replaced, so a recording replays in another run or checkout. `-C` (worktree slot or
+review checkout) is dropped from the key.
+
+Usage (the runners wrap their codex call when CODEX_CASSETTE is set):
+  codex_cassette.py [--repo-root DIR] [--run-id ID] -- <command...>
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+DEFAULT_DIR = os.path.join(".skilled-reviews", ".cassettes")
+
+
+def cassette_key(exec_args: List[str], prompt: str, repo_root: str, run_id: str) -> Tuple[str, dict]:
+    """(sha256, key material) for the `exec ...` arguments and the prompt."""
+
+    def norm(text: str) -> str:
+        if repo_root:
+            text = text.replace(repo_root.rstrip("/") + "/", "<repo>/").replace(repo_root, "<repo>")
+        if run_id:
+            text = text.replace(f"/{run_id}/", "/<run>/")
+        return text
+
+    args: List[str] = []
+    i = 0
+    while i < len(exec_args):
+        arg = exec_args[i]
+        if arg == "-C" and i + 1 < len(exec_args):
+            i += 2
+            continue
+        if arg in {"--output-last-message", "--output-schema"} and i + 1 < len(exec_args):
+            args += [arg, norm(os.path.abspath(exec_args[i + 1]))]
+            i += 2
+            continue
+        if arg.startswith(("--output-last-message=", "--output-schema=")):
+            flag, value = arg.split("=", 1)
+            arg = f"{flag}={norm(os.path.abspath(value))}"
+        args.append(arg)
+        i += 1
+    material = {"args": args, "prompt": norm(prompt)}
+    digest = hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+    return digest, material
+
+
+def output_path(exec_args: List[str]) -> str:
+    for i, arg in enumerate(exec_args):
+        if arg == "--output-last-message" and i + 1 < len(exec_args):
+            return exec_args[i + 1]
+        if arg.startswith("--output-last-message="):
+            return arg.split("=", 1)[1]
+    return ""
+
+
+def replay(entry_path: str, key: str, out_path: str) -> int:
+    try:
+        with open(entry_path, "r", encoding="utf-8") as fh:
+            entry = json.load(fh)
+    except (OSError, ValueError):
+        print(
+            f"codex-cassette: no recording for this call (key {key}, output {out_path or '-'}); "
+            "record it with CODEX_CASSETTE=record",
+            file=sys.stderr,
+        )
+        return 1
+    latency = os.environ.get("CODEX_CASSETTE_LATENCY", "0").strip() or "0"
+    if latency.startswith("recorded"):
+        _, _, scale = latency.partition(":")
+        delay = float(entry.get("duration_s", 0)) * (float(scale) if scale else 1.0)
+    else:
+        delay = float(latency)
+    if delay > 0:
+        time.sleep(delay)
+    if out_path and entry.get("output") is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        with open(out_path, "w", encoding="utf-8") as fh:
+            fh.write(entry["output"])
+    sys.stdout.write(entry.get("stdout", ""))
+    sys.stderr.write(entry.get("stderr", ""))
+    return int(entry.get("exit_code", 0))
+
+
+def record(command: List[str], prompt: bytes, entry_path: str, key: str, material: dict, out_path: str) -> int:
+    start = time.monotonic()
+    proc = subprocess.run(command, input=prompt, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    duration = time.monotonic() - start
+    stdout = proc.stdout.decode("utf-8", errors="replace")
+    stderr = proc.stderr.decode("utf-8", errors="replace")
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+
+    output = None
+    if out_path and os.path.isfile(out_path):
+        with open(out_path, "r", encoding="utf-8", errors="replace") as fh:
+            output = fh.read()
+    entry = {
+        "key": key,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "args": material["args"],
+        "prompt": material["prompt"],
+        "exit_code": proc.returncode,
+        "duration_s": round(duration, 3),
+        "output": output,
+        "stdout": stdout,
+        "stderr": stderr,
+    }
+    cassette_dir = os.path.dirname(entry_path)
+    try:
+        os.makedirs(cassette_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".cassette.", suffix=".tmp", dir=cassette_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(entry, fh, ensure_ascii=False, indent=2)
+            fh.write("\n")
+        os.replace(tmp_path, entry_path)
+    except OSError as exc:
+        print(f"codex-cassette: failed to record {entry_path}: {exc}", file=sys.stderr)
+    return proc.returncode
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Wrap a `[timeout N] codex exec ...` command. CODEX_CASSETTE=record runs it and stores "
+            "the --output-last-message file, exit code and stdout/stderr under CODEX_CASSETTE_DIR "
+            "(default <repo>/.skilled-reviews/.cassettes); replay serves them back without running "
+            "codex (CODEX_CASSETTE_LATENCY: seconds, `recorded` or `recorded:<scale>`)."
+        ),
+    )
+    parser.add_argument("--repo-root", default="")
+    parser.add_argument("--run-id", default="", help="Replaced in paths/prompt so recordings replay in other runs")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+
+    mode = os.environ.get("CODEX_CASSETTE", "")
+    if mode not in {"record", "replay"}:
+        print(f"CODEX_CASSETTE must be record or replay (got: {mode!r})", file=sys.stderr)
+        return 2
+    if "exec" not in command:
+        print("codex-cassette: expected a `codex exec ...` command", file=sys.stderr)
+        return 2
+    exec_args = command[command.index("exec"):]
+    out_path = output_path(exec_args)
+    repo_root = os.path.abspath(args.repo_root) if args.repo_root else ""
+    cassette_dir = os.environ.get("CODEX_CASSETTE_DIR") or os.path.join(repo_root or os.getcwd(), DEFAULT_DIR)
+
+    prompt = sys.stdin.buffer.read()
+    key, material = cassette_key(exec_args, prompt.decode("utf-8", errors="replace"), repo_root, args.run_id)
+    entry_path = os.path.join(cassette_dir, f"{key}.json")
+    if mode == "replay":
+        return replay(entry_path, key, out_path)
+    return record(command, prompt, entry_path, key, material, out_path)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Diff snapshot for the review runners: capture the reviewed diff once, describe it once.
+
+`snapshot` parses the diff a single time (unified_diff.py) and writes into the run dir:
+  diff.patch          the diff itself (every later stage reads this file)
+  diff-manifest.json  content hashes, per-file status / add-delete counts / modes / subsystem /
+                      hunk ranges, totals and the stat text
+  diff-summary.txt    the stat text (same layout as `git apply --stat`), for prompts and pr-review
+and prints the diff's git blob id (what `git hash-object` prints), used as the run fingerprint.
+No git process is started.
+
+Manifest (version 1):
+  source, bytes, sha256, git_blob
+  files[]: path, old_path (renames/copies), status (added/deleted/renamed/copied/modified),
+           added, deleted, binary, old_mode, new_mode, subsystem (first path segment or "root"),
+           hunks ([old_start, old_lines, new_start, new_lines] per hunk)
+  totals:  files, added, deleted, subsystems
+  stat:    the diff-summary.txt text
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from typing import List, Optional
+
+from unified_diff import FilePatch, PatchParseError, iter_file_patches
+
+MANIFEST_FILE = "diff-manifest.json"
+PATCH_FILE = "diff.patch"
+SUMMARY_FILE = "diff-summary.txt"
+MANIFEST_VERSION = 1
+# `git apply --stat` layout: names are cut to 50 columns, name + graph fit in 70.
+STAT_NAME_MAX = 50
+STAT_GRAPH_MAX = 70
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def git_blob_id(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def subsystem_of(path: str) -> str:
+    return path.split("/", 1)[0] if "/" in path else "root"
+
+
+def _status(fp: FilePatch) -> str:
+    if fp.is_new:
+        return "added"
+    if fp.is_deleted:
+        return "deleted"
+    if fp.rename_from or fp.rename_to:
+        return "renamed"
+    if fp.copy_from or fp.copy_to:
+        return "copied"
+    return "modified"
+
+
+def _names(fp: FilePatch) -> List[str]:
+    """Names git apply measures: no old name for an added file, no new name for a deleted one."""
+    old = "" if fp.is_new else (fp.rename_from or fp.copy_from or fp.old_path)
+    new = "" if fp.is_deleted else (fp.rename_to or fp.copy_to or fp.new_path)
+    return [old, new]
+
+
+def _quote(path: str) -> str:
+    """C-style quoting, as git prints paths with special bytes (core.quotePath)."""
+    raw = path.encode("utf-8", "surrogateescape")
+    if not any(b < 0x20 or b >= 0x7F or b in (0x22, 0x5C) for b in raw):
+        return path
+    escapes = {0x07: "\\a", 0x08: "\\b", 0x09: "\\t", 0x0A: "\\n", 0x0B: "\\v", 0x0C: "\\f", 0x0D: "\\r",
+               0x22: '\\"', 0x5C: "\\\\"}
+    out = []
+    for b in raw:
+        if b in escapes:
+            out.append(escapes[b])
+        elif b < 0x20 or b >= 0x7F:
+            out.append(f"\\{b:03o}")
+        else:
+            out.append(chr(b))
+    return '"' + "".join(out) + '"'
+
+
+def stat_text(patches: List[FilePatch]) -> str:
+    """The `git apply --stat` summary of the parsed patches."""
+    if not patches:
+        return ""
+    max_len = max(len(_quote(n)) for fp in patches for n in _names(fp) if n)
+    max_change = max(fp.added + fp.deleted for fp in patches)
+    width = min(max_len, STAT_NAME_MAX)
+    graph = STAT_GRAPH_MAX - width if width + max_change > STAT_GRAPH_MAX else max_change
+    lines = []
+    for fp in patches:
+        old, new = _names(fp)
+        name = _quote(new or old)
+        if len(name) > width:
+            cut = name.find("/", len(name) + 3 - width)
+            name = "..." + name[cut if cut != -1 else len(name) + 3 - width:]
+        if fp.binary:
+            lines.append(f" {name:<{width}} |  Bin")
+            continue
+        add, dels = fp.added, fp.deleted
+        if max_change > 0:
+            total = ((add + dels) * graph + max_change // 2) // max_change
+            add = (add * graph + max_change // 2) // max_change
+            dels = total - add
+        lines.append(f" {name:<{width}} |{fp.added + fp.deleted:5d} " + "+" * add + "-" * dels)
+    files = len(patches)
+    ins = sum(fp.added for fp in patches)
+    dels = sum(fp.deleted for fp in patches)
+    summary = f" {files} file{'' if files == 1 else 's'} changed"
+    if ins or not dels:
+        summary += f", {ins} insertion{'' if ins == 1 else 's'}(+)"
+    if dels or not ins:
+        summary += f", {dels} deletion{'' if dels == 1 else 's'}(-)"
+    return "\n".join(lines + [summary]) + "\n"
+
+
+def build_manifest(data: bytes, source: str = "") -> dict:
+    patches = list(iter_file_patches(data.decode("utf-8", "surrogateescape")))
+    files = []
+    for fp in patches:
+        path = fp.path
+        entry = {
+            "path": path,
+            "status": _status(fp),
+            "added": fp.added,
+            "deleted": fp.deleted,
+            "binary": fp.binary,
+            "old_mode": fp.old_mode or fp.deleted_file_mode or fp.index_mode or None,
+            "new_mode": fp.new_mode or fp.new_file_mode or fp.index_mode or None,
+            "subsystem": subsystem_of(path),
+            "hunks": [list(h) for h in fp.hunks],
+        }
+        old = fp.rename_from or fp.copy_from
+        if old:
+            entry["old_path"] = old
+        files.append(entry)
+    return {
+        "version": MANIFEST_VERSION,
+        "source": source or "file",
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "git_blob": git_blob_id(data),
+        "files": files,
+        "totals": {
+            "files": len(files),
+            "added": sum(f["added"] for f in files),
+            "deleted": sum(f["deleted"] for f in files),
+            "subsystems": sorted({f["subsystem"] for f in files}),
+        },
+        "stat": stat_text(patches),
+    }
+
+
+def load_manifest(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION or not isinstance(data.get("files"), list):
+        return None
+    return data
+
+
+def manifest_paths(manifest: dict) -> List[str]:
+    return [str(f.get("path")) for f in manifest["files"] if isinstance(f, dict) and f.get("path")]
+
+
+def cmd_snapshot(args) -> int:
+    with open(args.diff_file, "rb") as fh:
+        data = fh.read()
+    if not data.strip():
+        eprint(f"Diff is empty: {args.diff_file}")
+        return 1
+    try:
+        manifest = build_manifest(data, args.source)
+    except PatchParseError as exc:
+        eprint(f"Failed to parse diff {args.diff_file}: {exc}")
+        return 1
+    if not manifest["files"]:
+        eprint(f"No `diff --git` file blocks in {args.diff_file} (expected git diff output)")
+        return 1
+    os.makedirs(args.out_dir, exist_ok=True)
+    patch_path = os.path.join(args.out_dir, PATCH_FILE)
+    if not (os.path.exists(patch_path) and os.path.samefile(args.diff_file, patch_path)):
+        shutil.copyfile(args.diff_file, patch_path)
+    tmp = os.path.join(args.out_dir, f"{MANIFEST_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+        fh.write("\n")
+    os.replace(tmp, os.path.join(args.out_dir, MANIFEST_FILE))
+    summary_out = args.summary_out or os.path.join(args.out_dir, SUMMARY_FILE)
+    with open(summary_out, "w", encoding="utf-8", errors="surrogateescape") as fh:
+        fh.write(manifest["stat"])
+    print(manifest["git_blob"])
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Snapshot a diff into a run dir: diff.patch + diff-manifest.json.")
+    sub = parser.add_subparsers(dest="what", required=True)
+    p = sub.add_parser("snapshot", help=f"Write {PATCH_FILE}, {MANIFEST_FILE} and {SUMMARY_FILE}; print the git blob id")
+    p.add_argument("diff_file")
+    p.add_argument("--out-dir", required=True, help="Run dir")
+    p.add_argument("--source", default="", help="Where the diff came from (staged / worktree / file)")
+    p.add_argument("--summary-out", default="", help=f"Stat text path (default: <out-dir>/{SUMMARY_FILE})")
+    args = parser.parse_args(argv)
+    return cmd_snapshot(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
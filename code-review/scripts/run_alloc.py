@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Run-dir allocation and the per-scope `.current_run` pointer.
+
+alloc    claim a new run dir under <root> and print its id. The id is the start time
+         (YYYYmmdd_HHMMSS); when that dir already exists (another run started in the same
+         second) the next free -02, -03, ... -99 suffix is taken. Each candidate is created
+         with an exclusive mkdir, so two concurrent runs never share a directory, and ids
+         keep sorting in start order.
+publish  point <root>/.current_run at a finished run. Updates are serialized by an flock on
+         <root>/.current_run.lock. Rule: the run that *started* last wins. A run that finishes
+         after a newer run has already published leaves the pointer alone (its own run dir is
+         kept and can still be named explicitly). Ties go to the later publisher.
+
+The start time of the published run is kept in <root>/.current_run.started. Both files are
+written to a temp name and renamed into place, so readers never see a partial id.
+"""
+import argparse
+import contextlib
+import fcntl
+import os
+import sys
+import time
+from typing import Iterator, List, Optional
+
+POINTER_FILE = ".current_run"
+STARTED_FILE = ".current_run.started"
+LOCK_FILE = ".current_run.lock"
+MAX_SUFFIX = 99
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def allocate(root: str, stamp: str = "") -> str:
+    """Create <root>/<stamp>[-NN] exclusively and return the id."""
+    os.makedirs(root, exist_ok=True)
+    base = stamp or time.strftime("%Y%m%d_%H%M%S")
+    for n in range(1, MAX_SUFFIX + 1):
+        run_id = base if n == 1 else f"{base}-{n:02d}"
+        try:
+            os.mkdir(os.path.join(root, run_id))
+        except FileExistsError:
+            continue
+        return run_id
+    raise OSError(f"no free run dir under {root} ({base} .. {base}-{MAX_SUFFIX} all exist)")
+
+
+@contextlib.contextmanager
+def pointer_lock(root: str) -> Iterator[None]:
+    # flock is released by the kernel when the holder dies: no stale-lock cleanup needed.
+    fd = os.open(os.path.join(root, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return fh.read().strip()
+    except OSError:
+        return ""
+
+
+def _write(path: str, text: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp, path)
+
+
+def publish(root: str, run_id: str, started: float) -> Optional[str]:
+    """Point .current_run at run_id unless a later-started run already holds it.
+
+    Returns None when the pointer was updated, else the id that was kept.
+    """
+    os.makedirs(root, exist_ok=True)
+    with pointer_lock(root):
+        current = _read(os.path.join(root, POINTER_FILE))
+        try:
+            current_started = float(_read(os.path.join(root, STARTED_FILE)))
+        except ValueError:
+            # A pointer written before start times were recorded: any finished run replaces it.
+            current_started = float("-inf")
+        if (current and current != run_id and current_started > started
+                and os.path.isdir(os.path.join(root, current))):
+            return current
+        _write(os.path.join(root, STARTED_FILE), f"{started:.6f}")
+        _write(os.path.join(root, POINTER_FILE), run_id)
+    return None
+
+
+def _epoch(value: str) -> float:
+    # EPOCHREALTIME uses the locale's decimal separator.
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an epoch time: {value!r}") from None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Allocate run dirs and update the .current_run pointer.")
+    sub = parser.add_subparsers(dest="what", required=True)
+    p = sub.add_parser("alloc", help="Create a new run dir exclusively and print its id")
+    p.add_argument("root", help="Parent dir of the run dirs (e.g. reviewed_scopes/<scope-id>)")
+    p = sub.add_parser("publish", help="Point <root>/.current_run at a run (the latest-started run wins)")
+    p.add_argument("root")
+    p.add_argument("run_id")
+    p.add_argument("--started", type=_epoch, required=True, help="Start time of the run (epoch seconds)")
+    args = parser.parse_args(argv)
+    if args.what == "alloc":
+        try:
+            print(allocate(args.root))
+        except OSError as exc:
+            eprint(f"run-alloc: {exc}")
+            return 1
+        return 0
+    kept = publish(args.root, args.run_id, args.started)
+    if kept is not None:
+        eprint(f"Not updating .current_run: {kept} started after {args.run_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -30,7 +30,7 @@ done
 if (( ${#positional_args[@]} < 1 || ${#positional_args[@]} > 2 )); then
   echo "Usage: $0 <scope-id> [run-id] [--dry-run]" >&2
   echo "Required env: SOT, TESTS" >&2
-  echo "Optional env: RUN_ID, CONSTRAINTS, DIFF_FILE, DIFF_MODE, STRICT_STAGED, SCHEMA_PATH, CODEX_BIN, MODEL, REASONING_EFFORT, EXEC_TIMEOUT_SEC, VALIDATE, FORMAT_JSON" >&2
+  echo "Optional env: RUN_ID, CONSTRAINTS, DIFF_FILE, REVIEW_CHECKOUT, DIFF_MODE, STRICT_STAGED, SCHEMA_PATH, CODEX_BIN, CODEX_CASSETTE, CODEX_CASSETTE_DIR, CODEX_MAX_CONCURRENT, CODEX_RPM, CODEX_RPM_BURST, CODEX_LIMIT_DIR, MODEL, REASONING_EFFORT, EXEC_TIMEOUT_SEC, VALIDATE, FORMAT_JSON, PROGRESS, SKILLED_REVIEWS_TRACE, SKILLED_REVIEWS_TRACE_FORMAT, SKILLED_REVIEWS_PROFILE" >&2
   exit 1
 fi
 
@@ -54,8 +54,85 @@ fi
 
 start_epoch=$(date +%s)
 start_ts=$(date +"%Y-%m-%dT%H:%M:%S%z")
+run_started="${EPOCHREALTIME:-$start_epoch}"
 echo "Start: $start_ts" >&2
 
+trace_cat="code-review"
+# Tracing: SKILLED_REVIEWS_TRACE=<file> appends one Chrome trace-event "X" span per stage
+# (NDJSON; SKILLED_REVIEWS_TRACE_FORMAT=chrome streams a JSON array instead).
+trace_file="${SKILLED_REVIEWS_TRACE:-}"
+trace_sep=""
+if [[ -n "$trace_file" ]]; then
+  case "${SKILLED_REVIEWS_TRACE_FORMAT:-ndjson}" in
+    ndjson) ;;
+    chrome)
+      trace_sep=","
+      if [[ ! -s "$trace_file" ]]; then
+        (set -C; printf '[\n' >"$trace_file") 2>/dev/null || true
+      fi
+      ;;
+    *)
+      echo "Invalid SKILLED_REVIEWS_TRACE_FORMAT: ${SKILLED_REVIEWS_TRACE_FORMAT} (expected ndjson|chrome)" >&2
+      exit 1
+      ;;
+  esac
+  if [[ "$trace_file" != /* ]]; then
+    trace_file="${PWD}/${trace_file}"
+  fi
+  export SKILLED_REVIEWS_TRACE="$trace_file" SKILLED_REVIEWS_TRACE_PID="$$"
+fi
+trace_now() {
+  # Sets variable $1 to the current time in microseconds (0 when tracing is off).
+  if [[ -z "$trace_file" ]]; then
+    printf -v "$1" '0'
+  elif [[ -n "${EPOCHREALTIME:-}" ]]; then
+    local trace_t="${EPOCHREALTIME/,/.}"
+    printf -v "$1" '%s%s' "${trace_t%.*}" "${trace_t#*.}"
+  else
+    printf -v "$1" '%s000000' "$(date +%s)"
+  fi
+}
+trace_span() {
+  # trace_span <name> <start-us> [key=value ...]
+  [[ -n "$trace_file" ]] || return 0
+  local name="$1" start="$2" end kv value args="" sep=""
+  shift 2
+  trace_now end
+  for kv in "$@"; do
+    value="${kv#*=}"
+    value="${value//\\/\\\\}"
+    value="${value//\"/\\\"}"
+    args+="${sep}\"${kv%%=*}\":\"${value}\""
+    sep=","
+  done
+  printf '{"name":"%s","cat":"%s","ph":"X","ts":%s,"dur":%s,"pid":%s,"tid":%s,"args":{%s}}%s\n' \
+    "$name" "$trace_cat" "$start" "$((end - start))" "$SKILLED_REVIEWS_TRACE_PID" "${BASHPID:-$$}" "$args" "$trace_sep" \
+    >>"$trace_file"
+}
+trace_now run_t0
+
+# Progress: each step appends one event to <run-dir>/progress.ndjson (PROGRESS=0 turns it off),
+# rendered by `skilled_reviews_cli.py watch`. Events: run-start, queued, started, retried,
+# finished, cached, done, cancelled, validated, run-end.
+progress_file=""
+progress_event() {
+  # progress_event <event> [key=value ...]; integer values are written as JSON numbers
+  [[ -n "$progress_file" ]] || return 0
+  local event="$1" kv value fields="" now="${EPOCHREALTIME:-}"
+  shift
+  [[ -n "$now" ]] || now="$(date +%s)"
+  for kv in "$@"; do
+    value="${kv#*=}"
+    if [[ ! "$value" =~ ^(0|-?[1-9][0-9]*)$ ]]; then
+      value="${value//\\/\\\\}"
+      value="\"${value//\"/\\\"}\""
+    fi
+    fields+=",\"${kv%%=*}\":${value}"
+  done
+  printf '{"ts":%s,"runner":"%s","pid":%s,"run":"%s","event":"%s"%s}\n' \
+    "${now/,/.}" "$trace_cat" "$$" "$run_id" "$event" "$fields" >>"$progress_file"
+}
+
 repo_root="$(git rev-parse --show-toplevel 2>/dev/null || true)"
 if [[ -z "$repo_root" ]]; then
   echo "Not in a git repository; cannot locate repo root." >&2
@@ -80,6 +157,22 @@ else
   exit 1
 fi
 
+local_cli="${script_dir}/skilled_reviews_cli.py"
+shared_cli="${skills_root}/review-parallel/scripts/skilled_reviews_cli.py"
+shared_cli_impl="${skills_root}/review-parallel (impl)/scripts/skilled_reviews_cli.py"
+
+cli=""
+if [[ -f "$local_cli" ]]; then
+  cli="$local_cli"
+elif [[ -f "$shared_cli_impl" ]]; then
+  cli="$shared_cli_impl"
+elif [[ -f "$shared_cli" ]]; then
+  cli="$shared_cli"
+else
+  echo "skilled_reviews_cli.py not found: $local_cli (or $shared_cli_impl or $shared_cli)" >&2
+  exit 1
+fi
+
 local_policy="${script_dir}/review-v2-policy.md"
 shared_policy="${skills_root}/review-parallel/scripts/review-v2-policy.md"
 shared_policy_impl="${skills_root}/review-parallel (impl)/scripts/review-v2-policy.md"
@@ -111,6 +204,11 @@ fi
 
 constraints="${CONSTRAINTS:-none}"
 diff_file="${DIFF_FILE:-}"
+review_checkout="${REVIEW_CHECKOUT:-}"
+if [[ -n "$review_checkout" && ! -d "$review_checkout" ]]; then
+  echo "REVIEW_CHECKOUT is not a directory: $review_checkout" >&2
+  exit 1
+fi
 diff_mode="${DIFF_MODE:-auto}"
 strict_staged="${STRICT_STAGED:-0}"
 exec_timeout_sec="${EXEC_TIMEOUT_SEC:-}"
@@ -121,7 +219,16 @@ schema="${SCHEMA_PATH:-${repo_root}/.skilled-reviews/.reviews/schemas/review-v2.
 codex_bin="${CODEX_BIN:-codex}"
 model="${MODEL:-gpt-5.2-codex}"
 effort="${REASONING_EFFORT:-xhigh}"
-if ! command -v "$codex_bin" >/dev/null 2>&1; then
+codex_cassette="${CODEX_CASSETTE:-}"
+case "$codex_cassette" in
+  ""|record|replay) ;;
+  *)
+    echo "Invalid CODEX_CASSETTE: $codex_cassette (expected record|replay)" >&2
+    exit 1
+    ;;
+esac
+# Replay serves recorded answers, so codex itself is not needed.
+if [[ "$codex_cassette" != "replay" ]] && ! command -v "$codex_bin" >/dev/null 2>&1; then
   echo "codex not found: $codex_bin" >&2
   exit 1
 fi
@@ -143,14 +250,22 @@ if [[ -z "$run_id" ]]; then
   if [[ -f "$run_id_file" ]]; then
     candidate="$(cat "$run_id_file")"
     if [[ "$candidate" =~ ^[A-Za-z0-9._-]+$ && "$candidate" != "." && "$candidate" != ".." ]]; then
+      # Deliberate: a run without a run-id continues the scope's current run (review cycle).
+      # Overlapping runs must pass distinct run-ids.
       run_id="$candidate"
+      echo "Reusing run-id from .current_run: $run_id (pass a run-id or RUN_ID for a separate run)" >&2
     else
       echo "Invalid .current_run detected; generating a new run-id" >&2
       run_id=""
     fi
   fi
   if [[ -z "$run_id" ]]; then
-    run_id="$(date +"%Y%m%d_%H%M%S")"
+    if [[ "$dry_run" != "1" ]] && command -v python3 >/dev/null 2>&1; then
+      # Claimed with an exclusive mkdir: runs started in the same second get -02, -03, ...
+      run_id="$(python3 "$cli" run-alloc alloc "$run_root")"
+    else
+      run_id="$(date +"%Y%m%d_%H%M%S")"
+    fi
   fi
 fi
 
@@ -218,6 +333,9 @@ if [[ "$dry_run" == "1" ]]; then
 
   echo "Plan:" >&2
   printf -- '- repo_root: %s\n' "$repo_root" >&2
+  if [[ -n "$review_checkout" ]]; then
+    printf -- '- review_checkout: %s\n' "$review_checkout" >&2
+  fi
   printf -- '- scope_id: %s\n' "$scope_id" >&2
   printf -- '- run_id: %s\n' "$run_id" >&2
   printf -- '- schema: %s\n' "$schema" >&2
@@ -238,7 +356,9 @@ if [[ "$dry_run" == "1" ]]; then
   exit 0
 fi
 
+trace_now t_stage
 bash "$ensure_script"
+trace_span schemas "$t_stage"
 
 if [[ ! -f "$schema" ]]; then
   echo "Schema not found: $schema" >&2
@@ -247,8 +367,16 @@ fi
 
 mkdir -p "$run_root"
 mkdir -p "$out_dir"
+if [[ "${PROGRESS:-1}" != "0" ]]; then
+  progress_file="${out_dir}/progress.ndjson"
+fi
+progress_event run-start scope="$scope_id"
+# SKILLED_REVIEWS_PROFILE=1: the Python stages dump cProfile stats into the run dir.
+if [[ "${SKILLED_REVIEWS_PROFILE:-}" == "1" ]]; then
+  export SKILLED_REVIEWS_PROFILE_DIR="$out_dir"
+fi
 
-tmp_diff=""
+diff_fingerprint=""
 cleanup() {
   status=$?
   end_epoch=$(date +%s)
@@ -259,12 +387,19 @@ cleanup() {
   else
     echo "End: $end_ts (exit=${status})" >&2
   fi
-  if [[ -n "$tmp_diff" && -f "$tmp_diff" ]]; then
-    rm -f "$tmp_diff"
+  run_ended="${EPOCHREALTIME:-$end_epoch}"
+  if [[ -d "${out_dir:-}" ]]; then
+    # Run record for the history index (`skilled_reviews_cli.py index`).
+    printf '{"runner":"code-review","start":%s,"end":%s,"exit":%s,"diff":"%s"}\n' \
+      "${run_started/,/.}" "${run_ended/,/.}" "$status" "$diff_fingerprint" >>"${out_dir}/timings.ndjson"
   fi
+  progress_event run-end exit="$status"
+  trace_span run "$run_t0" scope="$scope_id" run="$run_id" exit="$status"
 }
 trap cleanup EXIT
 
+# The diff is captured once into <run-dir>/diff.patch; the prompt reads that file.
+trace_now t_stage
 diff_source=""
 if [[ -n "$diff_file" ]]; then
   if [[ ! -f "$diff_file" ]]; then
@@ -272,26 +407,26 @@ if [[ -n "$diff_file" ]]; then
     exit 1
   fi
 else
-  tmp_diff="$(mktemp)"
+  captured_diff="${out_dir}/diff.patch"
   case "$diff_mode" in
     staged)
-      git -C "$repo_root" diff --no-color --staged > "$tmp_diff"
+      git -C "$repo_root" diff --no-color --staged > "$captured_diff"
       diff_source="staged"
       ;;
     worktree)
-      git -C "$repo_root" diff --no-color > "$tmp_diff"
+      git -C "$repo_root" diff --no-color > "$captured_diff"
       diff_source="worktree"
       ;;
     auto|"")
-      git -C "$repo_root" diff --no-color --staged > "$tmp_diff"
-      if [[ -s "$tmp_diff" ]]; then
+      git -C "$repo_root" diff --no-color --staged > "$captured_diff"
+      if [[ -s "$captured_diff" ]]; then
         diff_source="staged"
       else
         if [[ "$strict_staged" == "1" ]]; then
           echo "STRICT_STAGED=1 and staged diff is empty" >&2
           exit 1
         fi
-        git -C "$repo_root" diff --no-color > "$tmp_diff"
+        git -C "$repo_root" diff --no-color > "$captured_diff"
         diff_source="worktree"
       fi
       ;;
@@ -300,7 +435,7 @@ else
       exit 1
       ;;
   esac
-  diff_file="$tmp_diff"
+  diff_file="$captured_diff"
 fi
 
 if [[ -n "$diff_source" ]]; then
@@ -311,8 +446,22 @@ if [[ ! -s "$diff_file" ]]; then
   echo "Diff is empty: $diff_file" >&2
   exit 1
 fi
+trace_span diff "$t_stage" source="${diff_source:-file}"
+
+# Diff snapshot (diff.patch + diff-manifest.json + diff-summary.txt); prints the git blob id.
+if command -v python3 >/dev/null 2>&1; then
+  trace_now t_stage
+  diff_fingerprint="$(python3 "$cli" diff-snapshot snapshot "$diff_file" --out-dir "$out_dir" \
+    --source "${diff_source:-file}")"
+  diff_file="${out_dir}/diff.patch"
+  trace_span diff-snapshot "$t_stage"
+else
+  diff_fingerprint="$(git hash-object -- "$diff_file" 2>/dev/null || true)"
+fi
 
+progress_event queued facet=overall
 {
+  trace_now t_prompt
   cat <<'PROMPT'
 Use code-review. Output JSON only using the schema.
 
@@ -348,7 +497,9 @@ PROMPT
   printf 'Expectations: review-only; read-only; do not edit\n'
   printf 'Diff:\n'
   cat "$diff_file"
+  trace_span prompt "$t_prompt" facet=overall
 } | {
+  trace_now t_codex
   cmd=(
     "$codex_bin" exec
     --sandbox read-only
@@ -358,10 +509,30 @@ PROMPT
     --output-schema "$schema"
     -
   )
+  if [[ -n "$review_checkout" ]]; then
+    # The reviewer reads files from this checkout (e.g. the commit under review), not the cwd.
+    cmd=("${cmd[@]:0:2}" -C "$review_checkout" "${cmd[@]:2}")
+  fi
   if [[ -n "$exec_timeout_sec" && -n "$timeout_bin" ]]; then
     cmd=("$timeout_bin" "$exec_timeout_sec" "${cmd[@]}")
   fi
-  "${cmd[@]}"
+  if [[ -n "${CODEX_MAX_CONCURRENT:-}${CODEX_RPM:-}" ]]; then
+    cmd=(python3 "$cli" codex-limit --tag "${scope_id}/overall" --metrics "${out_dir}/codex-queue.ndjson" -- "${cmd[@]}")
+  fi
+  if [[ -n "$codex_cassette" ]]; then
+    cmd=(python3 "$cli" codex-cassette --repo-root "$repo_root" --run-id "$run_id" -- "${cmd[@]}")
+  fi
+  progress_event started facet=overall tier=full model="$model" effort="$effort"
+  codex_rc=0
+  "${cmd[@]}" || codex_rc="$?"
+  if [[ "$codex_cassette" == "replay" && "$codex_rc" == "0" ]]; then
+    progress_event cached facet=overall tier=full
+  else
+    progress_event finished facet=overall tier=full exit="$codex_rc"
+  fi
+  progress_event done facet=overall exit="$codex_rc"
+  trace_span codex "$t_codex" facet=overall exit="$codex_rc"
+  exit "$codex_rc"
 }
 
 if [[ "$validate" != "0" ]]; then
@@ -370,34 +541,31 @@ if [[ "$validate" != "0" ]]; then
     exit 1
   fi
 
-  local_validate="${script_dir}/validate_review_fragments.py"
-  shared_validate="${skills_root}/review-parallel/scripts/validate_review_fragments.py"
-  shared_validate_impl="${skills_root}/review-parallel (impl)/scripts/validate_review_fragments.py"
-
-  validate_script=""
-  if [[ -f "$local_validate" ]]; then
-    validate_script="$local_validate"
-  elif [[ -f "$shared_validate_impl" ]]; then
-    validate_script="$shared_validate_impl"
-  elif [[ -f "$shared_validate" ]]; then
-    validate_script="$shared_validate"
-  else
-    echo "validate_review_fragments.py not found: $local_validate (or $shared_validate_impl or $shared_validate)" >&2
-    exit 1
-  fi
-
   format_arg=()
   if [[ "$format_json" != "0" ]]; then
     format_arg+=(--format)
   fi
 
-  validate_cmd=(python3 "$validate_script" "$scope_id" "$run_id" --facets "" --schema "$schema" --extra-file "$out" --extra-slug "overall")
+  validate_cmd=(python3 "$cli" validate-fragments "$scope_id" "$run_id" --facets "" --schema "$schema" --extra-file "$out" --extra-slug "overall")
   if (( ${#format_arg[@]} > 0 )); then
     validate_cmd+=("${format_arg[@]}")
   fi
-  (cd "$repo_root" && "${validate_cmd[@]}")
+  trace_now t_stage
+  validate_rc=0
+  (cd "$repo_root" && "${validate_cmd[@]}") || validate_rc="$?"
+  trace_span validate "$t_stage"
+  if (( validate_rc != 0 )); then
+    progress_event validated status=failed
+    exit "$validate_rc"
+  fi
+  progress_event validated status=ok facets=1
 fi
 
-tmp_run_file="${run_id_file}.tmp"
-printf '%s' "$run_id" > "$tmp_run_file"
-mv "$tmp_run_file" "$run_id_file"
+# Concurrent runs of one scope: the run that started last owns .current_run (see run_alloc.py).
+if command -v python3 >/dev/null 2>&1; then
+  python3 "$cli" run-alloc publish "$run_root" "$run_id" --started "$run_started"
+else
+  tmp_run_file="${run_id_file}.$$.tmp"
+  printf '%s' "$run_id" > "$tmp_run_file"
+  mv "$tmp_run_file" "$run_id_file"
+fi
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the Python helpers used by the review and implementation scripts.
+
+Usage:
+  skilled_reviews_cli.py <command> [args...]
+  skilled_reviews_cli.py --help
+
+Every pipeline stage starts one interpreter and runs one command (commands may chain
+several helpers in-process, e.g. `check-patch` = extract + repair + validate). Helper
+modules are imported on dispatch only, so a command never pays for modules it does not use.
+
+The same file ships in review-parallel/, code-review/ and implementation/ scripts (kept
+identical by scripts/self_test.sh). A command whose module is not installed next to this
+file exits 2.
+
+Env:
+  SKILLED_REVIEWS_TRACE=<file>   append a trace span (`py:<command>`) per command; see trace-report
+  SKILLED_REVIEWS_PROFILE=1      run the command under cProfile and write
+                                 profile-<command>-<pid>.pstats to SKILLED_REVIEWS_PROFILE_DIR
+"""
+import os
+import sys
+
+# command -> (module or None for commands defined here, function, summary)
+COMMANDS = {
+    "validate-fragments": ("validate_review_fragments", "main", "Validate review-v2 fragments of a run"),
+    "prepare-aggregate": (None, "cmd_prepare_aggregate", "Validate facet fragments and print them as one JSON array"),
+    "finalize-aggregate": (None, "cmd_finalize_aggregate", "Stamp scope_id/key order on an aggregate JSON, then validate it"),
+    "scan-hard-triggers": ("scan_hard_triggers", "main", "Scan a diff for hard-trigger paths/patterns"),
+    "diff-snapshot": ("diff_manifest", "main", "Capture a diff once: diff.patch + diff-manifest.json + diff-summary.txt in the run dir"),
+    "select-facets": ("select_facets", "main", "Choose the review-parallel facets for a diff (FACET_SELECT)"),
+    "facets": ("facet_registry", "main", "Facet registry: list | slice (per-facet diff slices)"),
+    "cascade": ("review_cascade", "main", "Effort cascade (CASCADE=1): check | summary"),
+    "hedge": ("review_hedge", "main", "Request hedging (HEDGE=1): delays | valid"),
+    "extract-patch": (None, "cmd_extract_patch", "Extract the first unified diff block of a model answer"),
+    "repair-patch": ("repair_patch", "main", "Mechanically repair a model patch in place"),
+    "validate-patch": ("validate_implementation_patch", "main", "Validate a patch against impl-guardrails.toml"),
+    "check-patch": (None, "cmd_check_patch", "extract-patch + repair-patch + validate-patch in one process"),
+    "review-feedback": ("extract_review_feedback", "main", "Render review JSON(s) as fix-focused prompt text"),
+    "write-worktree-record": (None, "cmd_write_worktree_record", "Write worktree.json for a worktree-mode run"),
+    "review-status": (None, "cmd_review_status", "Print `<path>\\t<status>` for each review-v2 JSON (empty status if unreadable)"),
+    "write-cycle-record": (None, "cmd_write_cycle_record", "Write cycle.json for an implement-cycle run from its timings"),
+    "codex-cassette": ("codex_cassette", "main", "Record/replay a `codex exec` call (CODEX_CASSETTE=record|replay)"),
+    "codex-limit": ("codex_limiter", "main", "Run a `codex exec` call under CODEX_MAX_CONCURRENT / CODEX_RPM (machine-wide)"),
+    "workers": ("worker_pool", "main", "Run facet codex calls on SSH workers (WORKERS): run -- <cmd> | status"),
+    "run-alloc": ("run_alloc", "main", "Allocate a run dir exclusively | publish .current_run (latest-started run wins)"),
+    "watch": ("review_watch", "main", "Render a run's progress events (progress.ndjson); --follow to stream"),
+    "trace-report": ("trace_report", "main", "Summarize a SKILLED_REVIEWS_TRACE file (optionally convert to Chrome JSON)"),
+    "index": ("review_index", "index_main", "Incrementally index run dirs into .skilled-reviews/.index/runs.sqlite3"),
+    "query": ("review_index", "query_main", "Query the run index: findings | runs | stats | sql"),
+    "prune": ("run_retention", "prune_main", "Archive/delete old run dirs (keep-last-N, max-age, max-bytes)"),
+    "archive": ("run_retention", "archive_main", "Read archived runs: list | cat | restore"),
+}
+
+# Not worth profiling: a wrapper around a model call and the trace reader itself.
+UNPROFILED = {"codex-cassette", "trace-report"}
+
+# check-patch exit code when the model answer holds no unified diff (treated as QUESTION).
+EXIT_NO_DIFF = 3
+
+
+def _call(module_name, func_name, argv):
+    """Run `module.func(argv)` in-process; SystemExit is turned into a return code."""
+    import importlib
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as exc:
+        print(f"{module_name}.py is not available next to this CLI: {exc}", file=sys.stderr)
+        return 2
+    try:
+        rc = getattr(module, func_name)(argv)
+    except SystemExit as exc:
+        rc = exc.code
+    if rc is None:
+        return 0
+    if isinstance(rc, int):
+        return rc
+    print(rc, file=sys.stderr)
+    return 1
+
+
+def cmd_prepare_aggregate(argv):
+    import argparse
+    import contextlib
+    import json
+    import os
+
+    ap = argparse.ArgumentParser(prog="skilled_reviews_cli.py prepare-aggregate")
+    ap.add_argument("scope_id")
+    ap.add_argument("run_id")
+    ap.add_argument("--run-dir", required=True)
+    ap.add_argument("--facets", required=True, help="Comma-separated facet slugs")
+    ap.add_argument("--schema", required=True)
+    ap.add_argument("--code-review", default="", help="Optional code-review.json (slug: overall)")
+    ap.add_argument("--format", action="store_true", help="Pretty-format validated fragments")
+    ap.add_argument("--no-validate", action="store_true")
+    args = ap.parse_args(argv)
+
+    slugs = [s for s in args.facets.split(",") if s]
+    if not slugs:
+        print("No facets provided", file=sys.stderr)
+        return 1
+    code_review_path = args.code_review.strip()
+
+    if not args.no_validate:
+        validate_argv = [args.scope_id, args.run_id, "--facets", args.facets, "--schema", args.schema]
+        if code_review_path and os.path.isfile(code_review_path):
+            validate_argv += ["--extra-file", code_review_path, "--extra-slug", "overall"]
+        if args.format:
+            validate_argv.append("--format")
+        # stdout carries the fragments array; keep the validator's summary on stderr.
+        with contextlib.redirect_stdout(sys.stderr):
+            rc = _call("validate_review_fragments", "main", validate_argv)
+        if rc != 0:
+            return rc
+
+    data = []
+    missing = []
+    for slug in slugs:
+        path = os.path.join(args.run_dir, f"{slug}.json")
+        if not os.path.isfile(path):
+            missing.append(slug)
+            continue
+        with open(path, "r", encoding="utf-8") as fh:
+            data.append(json.load(fh))
+
+    if missing:
+        print(f"Missing review fragments: {missing}", file=sys.stderr)
+        return 1
+
+    if code_review_path and os.path.isfile(code_review_path):
+        try:
+            with open(code_review_path, "r", encoding="utf-8") as fh:
+                extra = json.load(fh)
+        except Exception as exc:
+            print(f"Invalid code-review JSON: {exc}", file=sys.stderr)
+            return 1
+        required = {"facet", "facet_slug", "status", "findings", "uncertainty", "questions"}
+        if not isinstance(extra, dict) or not required.issubset(extra.keys()):
+            print("code-review JSON missing required keys", file=sys.stderr)
+            return 1
+        data.append(extra)
+
+    print(json.dumps(data))
+    return 0
+
+
+AGGREGATE_KEY_ORDER = [
+    "schema_version",
+    "scope_id",
+    "facet",
+    "facet_slug",
+    "status",
+    "questions",
+    "uncertainty",
+    "findings",
+    "overall_correctness",
+    "overall_explanation",
+    "overall_confidence_score",
+]
+
+
+def cmd_finalize_aggregate(argv):
+    import argparse
+    import json
+
+    ap = argparse.ArgumentParser(prog="skilled_reviews_cli.py finalize-aggregate")
+    ap.add_argument("out", help="Aggregate JSON written by codex (rewritten in place)")
+    ap.add_argument("scope_id")
+    ap.add_argument("--run-id", default="", help="Run id for validation")
+    ap.add_argument("--schema", default="", help="Schema path for validation")
+    ap.add_argument("--slug", default="aggregate", help="Expected facet_slug")
+    ap.add_argument("--format", action="store_true", help="Pretty-format the JSON")
+    ap.add_argument("--no-validate", action="store_true")
+    args = ap.parse_args(argv)
+
+    with open(args.out, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+
+    data["scope_id"] = args.scope_id
+
+    ordered = {}
+    for key in AGGREGATE_KEY_ORDER:
+        if key in data:
+            ordered[key] = data[key]
+    for key, value in data.items():
+        if key not in ordered:
+            ordered[key] = value
+
+    with open(args.out, "w", encoding="utf-8") as fh:
+        if args.format:
+            json.dump(ordered, fh, ensure_ascii=False, indent=2)
+        else:
+            json.dump(ordered, fh, ensure_ascii=False)
+        fh.write("\n")
+
+    if args.no_validate:
+        return 0
+    if not args.run_id or not args.schema:
+        print("--run-id and --schema are required unless --no-validate is set", file=sys.stderr)
+        return 2
+    validate_argv = [
+        args.scope_id,
+        args.run_id,
+        "--facets",
+        "",
+        "--schema",
+        args.schema,
+        "--extra-file",
+        args.out,
+        "--extra-slug",
+        args.slug,
+    ]
+    if args.format:
+        validate_argv.append("--format")
+    return _call("validate_review_fragments", "main", validate_argv)
+
+
+def _extract_patch(raw_path, patch_path):
+    """Write the first `diff --git` block of raw_path (up to a closing fence); False if none."""
+    with open(raw_path, "r", encoding="utf-8", errors="replace") as fh:
+        lines = fh.read().splitlines(True)
+
+    start = None
+    for i, line in enumerate(lines):
+        if line.startswith("diff --git "):
+            start = i
+            break
+    if start is None:
+        return False
+
+    end = None
+    for j in range(start, len(lines)):
+        if lines[j].startswith("```"):
+            end = j
+            break
+
+    patch_lines = lines[start:] if end is None else lines[start:end]
+    if patch_lines and not patch_lines[-1].endswith("\n"):
+        patch_lines[-1] += "\n"
+    with open(patch_path, "w", encoding="utf-8") as out:
+        out.writelines(patch_lines)
+    return True
+
+
+def cmd_extract_patch(argv):
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="skilled_reviews_cli.py extract-patch")
+    ap.add_argument("raw", help="Model answer")
+    ap.add_argument("patch", help="Output patch path (not written when no diff is found)")
+    args = ap.parse_args(argv)
+    _extract_patch(args.raw, args.patch)
+    return 0
+
+
+def cmd_check_patch(argv):
+    import argparse
+
+    ap = argparse.ArgumentParser(
+        prog="skilled_reviews_cli.py check-patch",
+        description=(
+            "Extract the patch from a model answer, repair it and validate it. "
+            f"Exit: 0 valid, 1 invalid, {EXIT_NO_DIFF} no unified diff in the answer."
+        ),
+    )
+    ap.add_argument("--raw", required=True, help="Model answer")
+    ap.add_argument("--patch", required=True, help="Extracted (and repaired) patch path")
+    ap.add_argument("--repo-root", required=True)
+    ap.add_argument("--repair-log", default="", help="Append repair steps here")
+    ap.add_argument("--no-repair", action="store_true")
+    args, validate_argv = ap.parse_known_args(argv)
+    if validate_argv[:1] == ["--"]:
+        validate_argv = validate_argv[1:]
+
+    if not _extract_patch(args.raw, args.patch):
+        print("Model output did not contain a unified diff.", file=sys.stderr)
+        return EXIT_NO_DIFF
+    with open(args.patch, "r", encoding="utf-8", errors="replace") as fh:
+        first = next((line for line in fh if line.strip()), "")
+    if not first.startswith("diff --git "):
+        print("Extracted patch is not a unified diff.", file=sys.stderr)
+        return EXIT_NO_DIFF
+
+    if not args.no_repair:
+        repair_argv = ["--repo-root", args.repo_root, "--patch", args.patch]
+        if args.repair_log:
+            repair_argv += ["--log", args.repair_log]
+        # An unrepairable patch is left for the validator to reject with the real error.
+        _call("repair_patch", "main", repair_argv)
+
+    return _call(
+        "validate_implementation_patch",
+        "main",
+        ["--repo-root", args.repo_root, *validate_argv, "--patch", args.patch],
+    )
+
+
+def cmd_write_worktree_record(argv):
+    import json
+
+    if len(argv) != 7:
+        print(
+            "usage: skilled_reviews_cli.py write-worktree-record <out> <path> <branch> <base> <commit> <test-cmd> <test-exit>",
+            file=sys.stderr,
+        )
+        return 2
+    out, path, branch, base, commit, test_cmd, test_exit = argv
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(
+            {
+                "path": path,
+                "branch": branch,
+                "base": base,
+                "commit": commit,
+                "test_cmd": test_cmd or None,
+                "test_exit": int(test_exit) if test_exit else None,
+            },
+            fh,
+            indent=2,
+        )
+        fh.write("\n")
+    return 0
+
+
+def cmd_review_status(argv):
+    import json
+
+    if not argv:
+        print("usage: skilled_reviews_cli.py review-status <review.json>...", file=sys.stderr)
+        return 2
+    for path in argv:
+        status = ""
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if isinstance(data, dict) and isinstance(data.get("status"), str):
+                status = data["status"]
+        except (OSError, ValueError):
+            pass
+        print(f"{path}\t{status}")
+    return 0
+
+
+def cmd_write_cycle_record(argv):
+    import json
+
+    if len(argv) != 8:
+        print(
+            "usage: skilled_reviews_cli.py write-cycle-record <out> <scope-id> <cycle-id> <base> <head> <branch> <outcome> <timings>",
+            file=sys.stderr,
+        )
+        return 2
+    out, scope_id, cycle_id, base, head, branch, outcome, timings_path = argv
+    stages = []
+    with open(timings_path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                stages.append(json.loads(line))
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(
+            {
+                "scope_id": scope_id,
+                "cycle_id": cycle_id,
+                "base": base,
+                "head": head,
+                "branch": branch or None,
+                "outcome": outcome,
+                "iterations": max([s["iteration"] for s in stages] + [0]),
+                "stages": stages,
+            },
+            fh,
+            indent=2,
+        )
+        fh.write("\n")
+    return 0
+
+
+def _write_trace_span(name, start, end, args):
+    """The command's own `py:<command>` span (trace_report.write_span); skipped if the module is missing."""
+    try:
+        import trace_report
+    except ImportError as exc:
+        print(f"trace: trace_report.py is not available next to this CLI: {exc}", file=sys.stderr)
+        return
+    trace_report.write_span(name, start, end, args)
+
+
+def _profiled(command, run):
+    """Run `run()` under cProfile and dump the stats into SKILLED_REVIEWS_PROFILE_DIR (default: cwd)."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(run)
+    finally:
+        out_dir = os.environ.get("SKILLED_REVIEWS_PROFILE_DIR") or "."
+        path = os.path.join(out_dir, f"profile-{command}-{os.getpid()}.pstats")
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            profiler.dump_stats(path)
+            print(f"Profile: {path} (python3 -m pstats {path})", file=sys.stderr)
+        except OSError as exc:
+            print(f"profile: cannot write {path}: {exc}", file=sys.stderr)
+
+
+def _dispatch(command, module_name, func_name, rest):
+    if module_name is None:
+        return globals()[func_name](rest)
+    # Helpers build their own argparse usage from argv[0].
+    sys.argv = [f"skilled_reviews_cli.py {command}", *rest]
+    return _call(module_name, func_name, rest)
+
+
+def usage(stream):
+    stream.write("usage: skilled_reviews_cli.py <command> [args...]\n\ncommands:\n")
+    for name, (_module, _func, summary) in COMMANDS.items():
+        stream.write(f"  {name:<22} {summary}\n")
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in {"-h", "--help"}:
+        usage(sys.stdout if argv else sys.stderr)
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    entry = COMMANDS.get(command)
+    if entry is None:
+        print(f"unknown command: {command}", file=sys.stderr)
+        usage(sys.stderr)
+        return 2
+    module_name, func_name, _summary = entry
+    tracing = bool(os.environ.get("SKILLED_REVIEWS_TRACE"))
+    profiling = os.environ.get("SKILLED_REVIEWS_PROFILE") == "1" and command not in UNPROFILED
+    if not tracing and not profiling:
+        return _dispatch(command, module_name, func_name, rest)
+
+    import time
+
+    start = time.time()
+    rc = "error"
+    try:
+        if profiling:
+            rc = _profiled(command, lambda: _dispatch(command, module_name, func_name, rest))
+        else:
+            rc = _dispatch(command, module_name, func_name, rest)
+        return rc
+    finally:
+        if tracing:
+            _write_trace_span(f"py:{command}", start, time.time(), {"exit": rc})
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,452 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+dry_run="0"
+positional_args=()
+while (($#)); do
+  case "$1" in
+    --dry-run)
+      dry_run="1"
+      shift
+      ;;
+    --)
+      shift
+      while (($#)); do
+        positional_args+=("$1")
+        shift
+      done
+      ;;
+    --*)
+      echo "Unknown option: $1" >&2
+      exit 1
+      ;;
+    *)
+      positional_args+=("$1")
+      shift
+      ;;
+  esac
+done
+
+if (( ${#positional_args[@]} < 1 || ${#positional_args[@]} > 2 )); then
+  echo "Usage: $0 <scope-id> [cycle-id] [--dry-run]" >&2
+  echo "Required env: SOT, ESTIMATION_FILE" >&2
+  echo "Optional env: CYCLE_ID, TEST_CMD, TESTS, REVIEW_MODE, MAX_ITERATIONS, CYCLE_BASE, PLAN_FILE, CONSTRAINTS, POLICY_FILE, ALLOW_LARGE_PATCH, CANDIDATES, CANDIDATE_POLICY, CODEX_BIN, CODEX_CASSETTE, CODEX_CASSETTE_DIR, CODEX_MAX_CONCURRENT, CODEX_RPM, CODEX_RPM_BURST, CODEX_LIMIT_DIR, MODEL, REASONING_EFFORT, EXEC_TIMEOUT_SEC, SKILLED_REVIEWS_TRACE, SKILLED_REVIEWS_TRACE_FORMAT, SKILLED_REVIEWS_PROFILE" >&2
+  echo "(the implementation/review scripts read their own optional env as usual)" >&2
+  exit 1
+fi
+
+scope_id="${positional_args[0]}"
+cycle_id="${positional_args[1]-}"
+if [[ -z "$cycle_id" ]]; then
+  cycle_id="${CYCLE_ID:-}"
+fi
+
+if [[ ! "$scope_id" =~ ^[A-Za-z0-9._-]+$ || "$scope_id" == "." || "$scope_id" == ".." ]]; then
+  echo "Invalid scope-id: $scope_id (allowed: [A-Za-z0-9._-]+, not '.' or '..')" >&2
+  exit 1
+fi
+
+sot="${SOT:-}"
+estimation_file="${ESTIMATION_FILE:-}"
+if [[ -z "$sot" || -z "$estimation_file" ]]; then
+  echo "SOT and ESTIMATION_FILE must be set" >&2
+  exit 1
+fi
+
+test_cmd="${TEST_CMD:-}"
+tests_static="${TESTS:-- not run}"
+review_mode="${REVIEW_MODE:-single}"
+max_iterations="${MAX_ITERATIONS:-3}"
+cycle_base="${CYCLE_BASE:-HEAD}"
+
+case "$review_mode" in
+  single|parallel) ;;
+  *)
+    echo "Invalid REVIEW_MODE: $review_mode (expected single|parallel)" >&2
+    exit 1
+    ;;
+esac
+if [[ ! "$max_iterations" =~ ^[1-9][0-9]*$ ]]; then
+  echo "Invalid MAX_ITERATIONS: $max_iterations (expected a positive integer)" >&2
+  exit 1
+fi
+
+repo_root="$(git rev-parse --show-toplevel 2>/dev/null || true)"
+if [[ -z "$repo_root" ]]; then
+  echo "Not in a git repository; cannot locate repo root." >&2
+  exit 1
+fi
+
+base_commit="$(git -C "$repo_root" rev-parse --verify --quiet "${cycle_base}^{commit}" || true)"
+if [[ -z "$base_commit" ]]; then
+  echo "CYCLE_BASE does not name a commit: $cycle_base" >&2
+  exit 1
+fi
+
+script_dir="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+skills_root="$(cd "$script_dir/../.." && pwd)"
+
+# Skills are installed side by side; accept both repo names and installed names.
+find_skill_script() {
+  local rel="$1"
+  shift
+  local name
+  for name in "$@"; do
+    if [[ -f "${skills_root}/${name}/${rel}" ]]; then
+      printf '%s\n' "${skills_root}/${name}/${rel}"
+      return 0
+    fi
+  done
+  return 1
+}
+
+impl_script="$(find_skill_script scripts/run_implementation.sh "implementation" "implementation (impl)" || true)"
+code_review_script="$(find_skill_script scripts/run_code_review.sh "code-review" "code-review (impl, single-review)" || true)"
+review_parallel_script="$(find_skill_script scripts/run_review_parallel.sh "review-parallel" "review-parallel (impl)" || true)"
+pr_review_script="$(find_skill_script scripts/run_pr_review.sh "pr-review" || true)"
+
+if [[ -z "$impl_script" ]]; then
+  echo "implementation skill not found under: $skills_root" >&2
+  exit 1
+fi
+if [[ "$review_mode" == "single" && -z "$code_review_script" ]]; then
+  echo "code-review skill not found under: $skills_root" >&2
+  exit 1
+fi
+if [[ "$review_mode" == "parallel" && ( -z "$review_parallel_script" || -z "$pr_review_script" ) ]]; then
+  echo "review-parallel/pr-review skills not found under: $skills_root" >&2
+  exit 1
+fi
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "python3 not found (required for review status parsing)" >&2
+  exit 1
+fi
+cli="$(dirname "$impl_script")/skilled_reviews_cli.py"
+
+if [[ -z "$cycle_id" ]]; then
+  if [[ "$dry_run" == "1" ]]; then
+    cycle_id="$(date +"%Y%m%d_%H%M%S")"
+  else
+    # Claimed with an exclusive mkdir: cycles started in the same second get -02, -03, ...
+    cycle_id="$(python3 "$cli" run-alloc alloc "${repo_root}/.skilled-reviews/.implementation/cycle-runs/${scope_id}")"
+  fi
+fi
+if [[ ! "$cycle_id" =~ ^[A-Za-z0-9._-]+$ || "$cycle_id" == "." || "$cycle_id" == ".." ]]; then
+  echo "Invalid cycle-id: $cycle_id (allowed: [A-Za-z0-9._-]+, not '.' or '..')" >&2
+  exit 1
+fi
+
+cycle_dir="${repo_root}/.skilled-reviews/.implementation/cycle-runs/${scope_id}/${cycle_id}"
+timings="${cycle_dir}/timings.ndjson"
+test_worktree="${cycle_dir}/test-worktree"
+review_worktree="${cycle_dir}/review-worktree"
+
+echo "Repo: $repo_root" >&2
+echo "Scope ID: $scope_id" >&2
+echo "Cycle ID: $cycle_id" >&2
+echo "Cycle dir: $cycle_dir" >&2
+printf -- '- base: %s\n' "$base_commit" >&2
+printf -- '- review_mode: %s\n' "$review_mode" >&2
+printf -- '- max_iterations: %s\n' "$max_iterations" >&2
+printf -- '- test_cmd: %s\n' "${test_cmd:-<none>}" >&2
+printf -- '- implementation: %s\n' "$impl_script" >&2
+
+if [[ "$dry_run" == "1" ]]; then
+  echo "--dry-run: prerequisites OK (no implementation/test/review will run)" >&2
+  exit 0
+fi
+
+mkdir -p "$cycle_dir"
+
+trace_cat="implement-cycle"
+# Tracing: SKILLED_REVIEWS_TRACE=<file> appends one Chrome trace-event "X" span per stage
+# (NDJSON; SKILLED_REVIEWS_TRACE_FORMAT=chrome streams a JSON array instead).
+trace_file="${SKILLED_REVIEWS_TRACE:-}"
+trace_sep=""
+if [[ -n "$trace_file" ]]; then
+  case "${SKILLED_REVIEWS_TRACE_FORMAT:-ndjson}" in
+    ndjson) ;;
+    chrome)
+      trace_sep=","
+      if [[ ! -s "$trace_file" ]]; then
+        (set -C; printf '[\n' >"$trace_file") 2>/dev/null || true
+      fi
+      ;;
+    *)
+      echo "Invalid SKILLED_REVIEWS_TRACE_FORMAT: ${SKILLED_REVIEWS_TRACE_FORMAT} (expected ndjson|chrome)" >&2
+      exit 1
+      ;;
+  esac
+  if [[ "$trace_file" != /* ]]; then
+    trace_file="${PWD}/${trace_file}"
+  fi
+  export SKILLED_REVIEWS_TRACE="$trace_file" SKILLED_REVIEWS_TRACE_PID="$$"
+fi
+trace_now() {
+  # Sets variable $1 to the current time in microseconds (0 when tracing is off).
+  if [[ -z "$trace_file" ]]; then
+    printf -v "$1" '0'
+  elif [[ -n "${EPOCHREALTIME:-}" ]]; then
+    local trace_t="${EPOCHREALTIME/,/.}"
+    printf -v "$1" '%s%s' "${trace_t%.*}" "${trace_t#*.}"
+  else
+    printf -v "$1" '%s000000' "$(date +%s)"
+  fi
+}
+trace_span() {
+  # trace_span <name> <start-us> [key=value ...]
+  [[ -n "$trace_file" ]] || return 0
+  local name="$1" start="$2" end kv value args="" sep=""
+  shift 2
+  trace_now end
+  for kv in "$@"; do
+    value="${kv#*=}"
+    value="${value//\\/\\\\}"
+    value="${value//\"/\\\"}"
+    args+="${sep}\"${kv%%=*}\":\"${value}\""
+    sep=","
+  done
+  printf '{"name":"%s","cat":"%s","ph":"X","ts":%s,"dur":%s,"pid":%s,"tid":%s,"args":{%s}}%s\n' \
+    "$name" "$trace_cat" "$start" "$((end - start))" "$SKILLED_REVIEWS_TRACE_PID" "${BASHPID:-$$}" "$args" "$trace_sep" \
+    >>"$trace_file"
+}
+
+now() {
+  # Sub-second resolution on bash 5 (EPOCHREALTIME); whole seconds elsewhere.
+  if [[ -n "${EPOCHREALTIME:-}" ]]; then
+    printf '%s\n' "${EPOCHREALTIME/,/.}"
+  else
+    date +%s
+  fi
+}
+
+# Appends one timing record: record_stage <iteration> <stage> <start> <end> <exit>
+record_stage() {
+  local duration
+  duration="$(awk -v a="$3" -v b="$4" 'BEGIN { printf "%.3f", b - a }')"
+  printf '{"iteration":%s,"stage":"%s","start":%s,"end":%s,"duration_sec":%s,"exit":%s}\n' \
+    "$1" "$2" "$3" "$4" "$duration" "$5" >>"$timings"
+  printf '[iter %s] %s: exit=%s (%ss)\n' "$1" "$2" "$5" "$duration" >&2
+  if [[ -n "$trace_file" ]]; then
+    local start_us
+    if [[ "$3" == *.* ]]; then
+      start_us="${3%.*}${3#*.}"
+    else
+      start_us="${3}000000"
+    fi
+    trace_span "$2" "$start_us" iteration="$1" exit="$5"
+  fi
+}
+
+cleanup() {
+  local tree
+  for tree in "$test_worktree" "$review_worktree"; do
+    if [[ -d "$tree" ]]; then
+      git -C "$repo_root" worktree remove --force "$tree" >/dev/null 2>&1 || true
+    fi
+  done
+}
+trap cleanup EXIT
+
+# Detached checkout reused across iterations: checkout_at <dir> <commit>
+checkout_at() {
+  if [[ ! -d "$1" ]]; then
+    git -C "$repo_root" worktree add -q --detach "$1" "$2"
+  else
+    git -C "$1" reset -q --hard
+    git -C "$1" clean -q -fd
+    git -C "$1" checkout -q --detach "$2"
+  fi
+}
+
+# Waits for the background tests and records them (sets test_exit and tests_summary).
+wait_tests() {
+  wait "$tests_pid" || true
+  tests_pid=""
+  test_exit="$(cat "${iter_dir}/test.exit" 2>/dev/null || echo 1)"
+  record_stage "$iter" tests "$tests_t0" "$(now)" "$test_exit"
+  if [[ "$test_exit" == "0" ]]; then
+    tests_summary="- ${test_cmd}: passed"
+  else
+    tests_summary="- ${test_cmd}: FAILED (exit ${test_exit}; log: ${iter_dir}/test.log)"
+  fi
+}
+
+cycle_start="$(now)"
+head_commit="$base_commit"
+head_branch=""
+review_file=""
+clarifications="${CLARIFICATIONS:-}"
+outcome="max-iterations"
+final_exit=1
+
+for ((iter = 1; iter <= max_iterations; iter++)); do
+  iter_dir="${cycle_dir}/iter-${iter}"
+  run_id="${cycle_id}-i${iter}"
+  branch="skilled-reviews/impl/${scope_id}/${run_id}"
+  mkdir -p "$iter_dir"
+
+  # 1) Implement on top of the previous iteration (pooled worktree, result on a branch).
+  t0="$(now)"
+  set +e
+  (
+    export WORKTREE=1 WORKTREE_BASE="$head_commit" WORKTREE_BRANCH="$branch"
+    unset WORKTREE_TEST_CMD
+    if [[ -n "$review_file" ]]; then
+      export REVIEW_FILE="$review_file"
+    else
+      unset REVIEW_FILE
+    fi
+    if [[ -n "$clarifications" ]]; then
+      export CLARIFICATIONS="$clarifications"
+    else
+      unset CLARIFICATIONS
+    fi
+    cd "$repo_root" && bash "$impl_script" "$scope_id" "$run_id"
+  ) 2>"${iter_dir}/implementation.log"
+  impl_exit="$?"
+  set -e
+  record_stage "$iter" implement "$t0" "$(now)" "$impl_exit"
+  if [[ "$impl_exit" == "2" ]]; then
+    echo "Implementation stopped with QUESTION (see ${iter_dir}/implementation.log)" >&2
+    outcome="question"
+    final_exit=2
+    break
+  fi
+  if [[ "$impl_exit" != "0" ]]; then
+    echo "Implementation failed (see ${iter_dir}/implementation.log)" >&2
+    tail -n 20 "${iter_dir}/implementation.log" >&2 || true
+    outcome="implementation-failed"
+    final_exit=1
+    break
+  fi
+  head_commit="$(git -C "$repo_root" rev-parse "${branch}^{commit}")"
+  head_branch="$branch"
+  diff_file="${iter_dir}/diff.patch"
+  git -C "$repo_root" diff --no-color --no-ext-diff "$base_commit" "$head_commit" >"$diff_file"
+
+  # 2) Tests (background, detached worktree at the new commit) and 3) review. The main tree
+  # still sits at the base, so the reviewers read a second detached checkout of the new commit.
+  checkout_at "$review_worktree" "$head_commit"
+  tests_pid=""
+  tests_t0="$(now)"
+  tests_summary="$tests_static"
+  test_exit=""
+  if [[ -n "$test_cmd" ]]; then
+    checkout_at "$test_worktree" "$head_commit"
+    (
+      cd "$test_worktree"
+      set +e
+      bash -c "$test_cmd" >"${iter_dir}/test.log" 2>&1
+      echo "$?" >"${iter_dir}/test.exit"
+    ) &
+    tests_pid="$!"
+  fi
+
+  set +e
+  if [[ "$review_mode" == "single" ]]; then
+    # code-review has no later step to hand the result to, so it waits for the tests.
+    if [[ -n "$tests_pid" ]]; then
+      wait_tests
+    fi
+    review_t0="$(now)"
+    (cd "$repo_root" && SOT="$sot" TESTS="$tests_summary" DIFF_FILE="$diff_file" REVIEW_CHECKOUT="$review_worktree" \
+      bash "$code_review_script" "$scope_id" "$run_id") >"${iter_dir}/review.log" 2>&1
+    review_exit="$?"
+  else
+    review_t0="$(now)"
+    facet_tests="$tests_summary"
+    if [[ -n "$tests_pid" ]]; then
+      facet_tests="- ${test_cmd}: running concurrently with this review (the aggregate gets the result)"
+    fi
+    (cd "$repo_root" && SOT="$sot" TESTS="$facet_tests" DIFF_FILE="$diff_file" REVIEW_CHECKOUT="$review_worktree" \
+      bash "$review_parallel_script" "$scope_id" "$run_id") >"${iter_dir}/review.log" 2>&1
+    review_exit="$?"
+  fi
+  set -e
+  record_stage "$iter" "review-${review_mode}" "$review_t0" "$(now)" "$review_exit"
+
+  if [[ -n "$tests_pid" ]]; then
+    wait_tests
+  fi
+
+  review_run_dir="${repo_root}/.skilled-reviews/.reviews/reviewed_scopes/${scope_id}/${run_id}"
+  if [[ "$review_mode" == "single" ]]; then
+    review_json="${review_run_dir}/code-review.json"
+  else
+    # The aggregate step only reads fragments + summary, so it runs once the tests are known.
+    agg_t0="$(now)"
+    set +e
+    if [[ "$review_exit" == "0" ]]; then
+      (cd "$repo_root" && SOT="$sot" TESTS="$tests_summary" \
+        bash "$pr_review_script" "$scope_id" "$run_id") >>"${iter_dir}/review.log" 2>&1
+      review_exit="$?"
+    fi
+    set -e
+    record_stage "$iter" review-aggregate "$agg_t0" "$(now)" "$review_exit"
+    review_json="${review_run_dir}/aggregate/pr-review.json"
+  fi
+  printf '%s\n' "$tests_summary" >"${iter_dir}/tests.txt"
+
+  if [[ "$review_exit" != "0" ]]; then
+    echo "Review failed (see ${iter_dir}/review.log)" >&2
+    tail -n 20 "${iter_dir}/review.log" >&2 || true
+    outcome="review-failed"
+    final_exit=1
+    break
+  fi
+
+  # One lookup for the review JSON and (parallel) every facet fragment: "<path>\t<status>" lines.
+  status_files=("$review_json")
+  if [[ "$review_mode" == "parallel" ]]; then
+    for fragment in "${review_run_dir}"/*.json; do
+      [[ -f "$fragment" ]] && status_files+=("$fragment")
+    done
+  fi
+  statuses="$(python3 "$cli" review-status "${status_files[@]}")"
+  status="$(head -n 1 <<<"$statuses" | cut -f 2)"
+  printf '[iter %s] review: %s; tests: %s\n' "$iter" "${status:-<unknown>}" "$tests_summary" >&2
+
+  tests_ok="1"
+  if [[ -n "$test_exit" && "$test_exit" != "0" ]]; then
+    tests_ok="0"
+  fi
+
+  if [[ "$tests_ok" == "1" && ( "$status" == "Approved" || "$status" == "Approved with nits" ) ]]; then
+    outcome="approved"
+    final_exit=0
+    break
+  fi
+
+  # Feed the result straight into the next implementation run.
+  review_file=""
+  clarifications="${CLARIFICATIONS:-}"
+  if [[ "$status" == "Blocked" || "$status" == "Question" ]]; then
+    review_file="$review_json"
+    if [[ "$review_mode" == "parallel" ]]; then
+      # Facet fragments carry findings the aggregate may have summarized away; the
+      # extractor deduplicates them and keeps P0/P1 within the feedback budget.
+      while IFS=$'\t' read -r fragment fragment_status; do
+        [[ "$fragment" != "$review_json" && -n "$fragment_status" ]] || continue
+        review_file="${review_file},${fragment}"
+      done <<<"$statuses"
+    fi
+  fi
+  if [[ "$tests_ok" == "0" ]]; then
+    clarifications="${clarifications:+${clarifications}
+}Tests failed after the previous iteration (${test_cmd}; exit ${test_exit}). Last lines of the test log:
+$(tail -n 40 "${iter_dir}/test.log" 2>/dev/null || true)"
+  fi
+done
+
+record_stage 0 cycle "$cycle_start" "$(now)" "$final_exit"
+
+python3 "$cli" write-cycle-record "${cycle_dir}/cycle.json" "$scope_id" "$cycle_id" \
+  "$base_commit" "$head_commit" "$head_branch" "$outcome" "$timings"
+
+echo "Outcome: $outcome (head: $head_commit)" >&2
+if [[ -n "$head_branch" ]]; then
+  echo "Result branch: $head_branch" >&2
+fi
+echo "Summary: ${cycle_dir}/cycle.json" >&2
+exit "$final_exit"
@@ -80,94 +80,210 @@ def _is_review_fragment(obj: Any) -> bool:
     )
 
 
-def _format_review_fragment(obj: dict[str, Any], *, max_findings: int) -> list[str]:
-    lines: list[str] = []
-    status = _as_str(obj.get("status")).strip()
-    facet_slug = _as_str(obj.get("facet_slug")).strip()
-    if facet_slug:
-        lines.append(f"Facet: {facet_slug}")
-    if status:
-        lines.append(f"Status: {status}")
-
-    findings = obj.get("findings") or []
-    if isinstance(findings, list) and findings:
-        lines.append("Findings (prioritize blocker/major; ignore nits unless needed):")
-        for finding in findings[:max_findings]:
-            if not isinstance(finding, dict):
-                continue
+_PRIORITY_LABELS = ("P0", "P1", "P2", "P3")
+# Findings at or above this priority are never dropped for budget reasons.
+_MUST_KEEP_PRIORITY = 1
+_UNKNOWN_PRIORITY = len(_PRIORITY_LABELS)
+
+
+class _Finding:
+    __slots__ = ("priority", "confidence", "order", "title", "location", "body", "sources")
+
+    def __init__(self, finding: dict[str, Any], *, source: str, order: int) -> None:
+        title = _as_str(finding.get("title")).strip()
+        body = _clip(_as_str(finding.get("body")), max_chars=900)
+        priority = _priority_int(finding.get("priority"))
+        if priority is None or not 0 <= priority <= 3:
+            priority = _UNKNOWN_PRIORITY
+        confidence = finding.get("confidence_score")
+
+        self.priority = priority
+        self.confidence = float(confidence) if _is_number(confidence) else 0.0
+        self.order = order
+        self.title = _strip_priority_prefix(title) or title or (_clip(body, max_chars=240) if body else "Finding")
+        self.location = _format_location(finding.get("code_location"))
+        self.body = body
+        self.sources = [source] if source else []
+
+    def key(self) -> tuple[str, str]:
+        return (self.location, " ".join(self.title.lower().split()))
+
+    def sort_key(self) -> tuple[int, float, int]:
+        return (self.priority, -self.confidence, self.order)
+
+    def render(self) -> list[str]:
+        line = "- "
+        if self.priority < _UNKNOWN_PRIORITY:
+            line += f"[{_PRIORITY_LABELS[self.priority]}] "
+        line += self.title
+        if self.location:
+            line += f" ({self.location})"
+        if len(self.sources) > 1:
+            line += f" [from: {', '.join(self.sources)}]"
+        lines = [line]
+        if self.body:
+            lines.append(f"  {self.body}")
+        return lines
+
+
+def _load_fragment(path: str) -> dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        obj = json.load(fh)
+    if not _is_review_fragment(obj):
+        raise SystemExit(
+            f"Unrecognized review JSON shape in {path}; expected review-v2 output (code-review/review-parallel/pr-review)."
+        )
+    return obj
 
-            # review-v2 shape.
-            title = _as_str(finding.get("title")).strip()
-            body = _clip(_as_str(finding.get("body")), max_chars=900)
-            priority = _priority_int(finding.get("priority"))
-            location = _format_location(finding.get("code_location"))
-
-            title_clean = _strip_priority_prefix(title) if title else ""
-            line = "- "
-            if priority is not None and 0 <= priority <= 3:
-                line += f"[P{priority}] "
-            if title_clean:
-                line += title_clean
-            elif title:
-                line += title
-            elif body:
-                line += _clip(body, max_chars=240)
+
+def _collect(fragments: list[dict[str, Any]]) -> list[_Finding]:
+    """Flatten findings across fragments, merging duplicates (same location + title)."""
+    merged: dict[tuple[str, str], _Finding] = {}
+    order = 0
+    for obj in fragments:
+        source = _as_str(obj.get("facet_slug")).strip()
+        for raw in obj.get("findings") or []:
+            if not isinstance(raw, dict):
+                continue
+            finding = _Finding(raw, source=source, order=order)
+            order += 1
+            existing = merged.get(finding.key())
+            if existing is None:
+                merged[finding.key()] = finding
+                continue
+            if finding.sort_key() < existing.sort_key():
+                finding.sources = existing.sources + [s for s in finding.sources if s not in existing.sources]
+                merged[finding.key()] = finding
+            else:
+                existing.sources += [s for s in finding.sources if s not in existing.sources]
+    return sorted(merged.values(), key=_Finding.sort_key)
+
+
+def _text_len(lines: list[str]) -> int:
+    return sum(len(line) + 1 for line in lines)
+
+
+def build_feedback(fragments: list[dict[str, Any]], *, max_findings: int, max_chars: int) -> tuple[str, dict[str, Any]]:
+    """
+    Render prompt feedback for one or more review-v2 fragments.
+
+    P0/P1 findings are always kept. Lower priorities fill the remaining character budget
+    greedily in priority order (at most `max_findings` of them); questions/uncertainty use
+    what is left. Returns the text plus a report of what was dropped.
+    """
+    header: list[str] = []
+    for obj in fragments:
+        facet_slug = _as_str(obj.get("facet_slug")).strip() or "?"
+        status = _as_str(obj.get("status")).strip() or "?"
+        header.append(f"Review: {facet_slug} (Status: {status})")
+
+    findings = _collect(fragments)
+    must_keep = [f for f in findings if f.priority <= _MUST_KEEP_PRIORITY]
+    optional = [f for f in findings if f.priority > _MUST_KEEP_PRIORITY]
+
+    body: list[str] = []
+    if findings:
+        body.append("Findings (sorted P0→P3; P0/P1 must be fixed):")
+    for finding in must_keep:
+        body.extend(finding.render())
+
+    used = _text_len(header) + _text_len(body)
+    dropped: list[_Finding] = []
+    kept_optional = 0
+    for finding in optional:
+        rendered = finding.render()
+        if kept_optional < max_findings and used + _text_len(rendered) <= max_chars:
+            body.extend(rendered)
+            used += _text_len(rendered)
+            kept_optional += 1
+        else:
+            dropped.append(finding)
+
+    extras: list[tuple[str, list[str]]] = []
+    for label, field in (("Questions:", "questions"), ("Uncertainty:", "uncertainty")):
+        items: list[str] = []
+        for obj in fragments:
+            for item in obj.get(field) or []:
+                item_s = _clip(_as_str(item), max_chars=240)
+                if item_s and f"- {item_s}" not in items:
+                    items.append(f"- {item_s}")
+        if items:
+            extras.append((label, items))
+
+    dropped_notes = 0
+    for label, items in extras:
+        kept_items = []
+        for item in items:
+            if used + len(label) + 1 + _text_len(kept_items) + len(item) + 1 <= max_chars:
+                kept_items.append(item)
             else:
-                line += "Finding"
-            if location:
-                line += f" ({location})"
-            lines.append(line)
-            if body:
-                lines.append(f"  {body}")
-        if len(findings) > max_findings:
-            lines.append(f"...(truncated: {len(findings) - max_findings} more findings)")
-
-    questions = obj.get("questions") or []
-    if isinstance(questions, list) and questions:
-        lines.append("Questions:")
-        for q in questions:
-            q_s = _clip(_as_str(q), max_chars=240)
-            if q_s:
-                lines.append(f"- {q_s}")
-
-    uncertainty = obj.get("uncertainty") or []
-    if isinstance(uncertainty, list) and uncertainty:
-        lines.append("Uncertainty:")
-        for u in uncertainty:
-            u_s = _clip(_as_str(u), max_chars=240)
-            if u_s:
-                lines.append(f"- {u_s}")
-
-    return lines
-
-
-def main() -> int:
+                dropped_notes += 1
+        if kept_items:
+            body.append(label)
+            body.extend(kept_items)
+            used += _text_len([label] + kept_items)
+
+    counts: dict[str, int] = {}
+    for finding in dropped:
+        label = _PRIORITY_LABELS[finding.priority] if finding.priority < _UNKNOWN_PRIORITY else "unprioritized"
+        counts[label] = counts.get(label, 0) + 1
+    if dropped or dropped_notes:
+        parts = [f"{label}×{n}" for label, n in sorted(counts.items())]
+        if dropped_notes:
+            parts.append(f"questions/uncertainty×{dropped_notes}")
+        body.append(f"...(omitted for budget: {', '.join(parts)}; see the review JSON files)")
+
+    report = {
+        "findings_total": len(findings),
+        "findings_kept": len(findings) - len(dropped),
+        "must_keep": len(must_keep),
+        "dropped": [
+            {"priority": f.priority if f.priority < _UNKNOWN_PRIORITY else None, "title": f.title, "location": f.location}
+            for f in dropped
+        ],
+        "dropped_notes": dropped_notes,
+        "over_budget": used > max_chars,
+    }
+    return "\n".join(header + body).strip() + "\n", report
+
+
+def main(argv=None) -> int:
     parser = argparse.ArgumentParser(
         description="Extract concise fix-focused text from code-review/pr-review JSON for implementation reruns."
     )
-    parser.add_argument("review_json", help="Path to code-review.json or pr-review.json")
-    parser.add_argument("--max-findings", type=int, default=20)
+    parser.add_argument(
+        "review_json",
+        nargs="+",
+        help="One or more review-v2 JSON files (pr-review.json, code-review.json, facet fragments)",
+    )
+    parser.add_argument("--max-findings", type=int, default=20, help="Cap on P2/P3 findings (P0/P1 are never capped)")
     parser.add_argument(
         "--max-chars",
         type=int,
         default=int(os.environ.get("MAX_REVIEW_FEEDBACK_CHARS", "12000")),
     )
-    args = parser.parse_args()
-
-    path = args.review_json
-    with open(path, "r", encoding="utf-8") as fh:
-        obj = json.load(fh)
-
-    if _is_review_fragment(obj):
-        lines = _format_review_fragment(obj, max_findings=max(1, args.max_findings))
-    else:
-        raise SystemExit(
-            "Unrecognized review JSON shape; expected review-v2 output (code-review/review-parallel/pr-review)."
+    parser.add_argument("--report", help="Write a JSON report of kept/dropped findings here")
+    args = parser.parse_args(argv)
+
+    fragments = [_load_fragment(path) for path in args.review_json]
+    text, report = build_feedback(fragments, max_findings=max(0, args.max_findings), max_chars=args.max_chars)
+
+    if report["dropped"] or report["dropped_notes"]:
+        print(
+            f"Review feedback: kept {report['findings_kept']}/{report['findings_total']} findings "
+            f"(dropped {len(report['dropped'])} P2/P3, {report['dropped_notes']} questions/uncertainty) "
+            f"to fit --max-chars={args.max_chars}",
+            file=sys.stderr,
         )
-
-    text = "\n".join(lines).strip() + "\n"
-    if len(text) > args.max_chars:
-        text = text[: args.max_chars].rstrip() + "\n...(truncated)\n"
+    if report["over_budget"]:
+        print(
+            f"Review feedback: P0/P1 findings alone exceed --max-chars={args.max_chars}; kept them anyway",
+            file=sys.stderr,
+        )
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+            fh.write("\n")
 
     sys.stdout.write(text)
     return 0
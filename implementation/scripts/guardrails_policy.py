@@ -0,0 +1,388 @@
+import ast
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bump when the cached layout or policy semantics change.
+POLICY_CACHE_VERSION = 1
+
+DEFAULT_MAX_LINES_CHANGED = 600
+DEFAULT_MAX_FILES_CHANGED = 15
+DEFAULT_MAX_SUBSYSTEMS = 2
+
+_INT_KEYS = ("max_lines_changed", "max_files_changed", "max_subsystems")
+
+
+def normalize_repo_relpath(value: str) -> str:
+    value = value.strip()
+    while value.startswith("./"):
+        value = value[2:]
+    if value.startswith("/"):
+        value = value[1:]
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Fallback parser (no tomllib/tomli): string arrays and integer scalars only.
+# ---------------------------------------------------------------------------
+
+
+def _strip_toml_comment(line: str) -> str:
+    in_string = False
+    escape = False
+    out = []
+    for ch in line:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+            continue
+
+        if ch == "#":
+            break
+
+        out.append(ch)
+    return "".join(out)
+
+
+def _extract_toml_array(text: str, key: str) -> Optional[str]:
+    m = re.search(rf"(?m)^[ \t]*{re.escape(key)}[ \t]*=", text)
+    if not m:
+        return None
+    idx = m.end()
+    while idx < len(text) and text[idx] in " \t":
+        idx += 1
+    if idx >= len(text) or text[idx] != "[":
+        raise ValueError(f"{key} must be an array (expected '[' after '=')")
+
+    depth = 0
+    in_string = False
+    escape = False
+    start = idx
+    for j in range(idx, len(text)):
+        ch = text[j]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            continue
+
+        if ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+            if depth == 0:
+                return text[start : j + 1]
+
+    raise ValueError(f"Unterminated array for key: {key}")
+
+
+def _fallback_loads(raw: str) -> Dict[str, Any]:
+    text = "".join(_strip_toml_comment(line) for line in raw.splitlines(True))
+    if re.search(r"(?m)^[ \t]*\[", text):
+        raise ValueError("policy tables (e.g. [path_max_lines]) require Python 3.11+ (tomllib) or the tomli package")
+
+    data: Dict[str, Any] = {}
+    for key in ("write_allow", "write_deny"):
+        array_raw = _extract_toml_array(text, key)
+        if array_raw is None:
+            continue
+        try:
+            data[key] = ast.literal_eval(array_raw)
+        except Exception as exc:
+            raise ValueError(f"Failed to parse policy arrays: {exc}") from exc
+    for key in _INT_KEYS:
+        m = re.search(rf"(?m)^[ \t]*{re.escape(key)}[ \t]*=[ \t]*(\S+)[ \t]*$", text)
+        if m:
+            try:
+                data[key] = int(m.group(1).replace("_", ""))
+            except ValueError as exc:
+                raise ValueError(f"{key} must be an integer") from exc
+    return data
+
+
+def _loads(raw: str) -> Dict[str, Any]:
+    # Imported lazily: a policy-cache hit never needs a TOML parser.
+    try:
+        import tomllib as _toml  # Python 3.11+
+    except ImportError:  # pragma: no cover - depends on interpreter
+        try:
+            import tomli as _toml  # type: ignore[no-redef]
+        except ImportError:
+            return _fallback_loads(raw)
+    try:
+        return _toml.loads(raw)
+    except _toml.TOMLDecodeError as exc:
+        raise ValueError(f"Invalid TOML: {exc}") from exc
+
+
+# ---------------------------------------------------------------------------
+# Compiled path matcher
+# ---------------------------------------------------------------------------
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+class PathMatcher:
+    """
+    fnmatchcase-equivalent matcher for a list of policy globs, compiled once.
+
+    Literal patterns become a set lookup and `<literal>*` patterns a prefix lookup
+    (fnmatch's `*` also matches `/`). Remaining globs are bucketed by their literal
+    directory prefix (`services/api/` for `services/api/*.py`) and each bucket is one
+    alternation regex with a named group per rule, so a path only runs the regexes
+    of the directories it lives under. `match()` reports the first matching rule in
+    policy order, so denials can name the rule that fired.
+    """
+
+    def __init__(self, patterns: List[str], label: str = "") -> None:
+        self.patterns = list(patterns)
+        self.label = label
+        self._exact: Dict[str, int] = {}
+        self._prefixes: Dict[int, Dict[str, int]] = {}
+        self._bucket_sources: Dict[str, str] = {}
+        bucket_globs: Dict[str, List[str]] = {}
+        for idx, pat in enumerate(self.patterns):
+            first_meta = next((i for i, ch in enumerate(pat) if ch in _GLOB_CHARS), -1)
+            if first_meta == -1:
+                self._exact.setdefault(pat, idx)
+            elif first_meta == len(pat) - 1 and pat.endswith("*"):
+                self._prefixes.setdefault(len(pat) - 1, {}).setdefault(pat[:-1], idx)
+            else:
+                literal_dir = pat[: pat.rfind("/", 0, first_meta) + 1]
+                bucket_globs.setdefault(literal_dir, []).append(f"(?P<r{idx}>{fnmatch.translate(pat)})")
+        self._bucket_sources = {prefix: "|".join(globs) for prefix, globs in bucket_globs.items()}
+        self._finish()
+
+    def _finish(self) -> None:
+        self._prefix_lengths = sorted(self._prefixes, reverse=True)
+        # Bucket regexes compile on first use; most paths only touch a few directories.
+        self._buckets: Dict[str, "re.Pattern[str]"] = {}
+
+    def _bucket(self, prefix: str) -> Optional["re.Pattern[str]"]:
+        regex = self._buckets.get(prefix)
+        if regex is None:
+            source = self._bucket_sources.get(prefix)
+            if source is None:
+                return None
+            regex = self._buckets[prefix] = re.compile(source)
+        return regex
+
+    def match(self, path: str) -> Optional[Tuple[int, str]]:
+        """Return (rule index, rule) for the first rule that matches `path`, else None."""
+        hits = []
+        idx = self._exact.get(path)
+        if idx is not None:
+            hits.append(idx)
+        for length in self._prefix_lengths:
+            if length <= len(path):
+                idx = self._prefixes[length].get(path[:length])
+                if idx is not None:
+                    hits.append(idx)
+        if self._bucket_sources:
+            slash = -1
+            while True:
+                regex = self._bucket(path[: slash + 1])
+                if regex is not None:
+                    m = regex.match(path)
+                    if m is not None:
+                        hits.append(int(m.lastgroup[1:]))
+                slash = path.find("/", slash + 1)
+                if slash == -1:
+                    break
+        if not hits:
+            return None
+        idx = min(hits)
+        return idx, self.patterns[idx]
+
+    def describe(self, path: str) -> str:
+        """Human-readable rule reference (e.g. `write_deny[2] "secrets/**"`), or "" when nothing matches."""
+        hit = self.match(path)
+        if hit is None:
+            return ""
+        idx, pat = hit
+        return f'{self.label}[{idx}] "{pat}"'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "patterns": self.patterns,
+            "label": self.label,
+            "exact": self._exact,
+            "prefixes": {str(length): table for length, table in self._prefixes.items()},
+            "buckets": self._bucket_sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PathMatcher":
+        matcher = cls.__new__(cls)
+        matcher.patterns = list(data["patterns"])
+        matcher.label = data["label"]
+        matcher._exact = dict(data["exact"])
+        matcher._prefixes = {int(length): dict(table) for length, table in data["prefixes"].items()}
+        matcher._bucket_sources = dict(data["buckets"])
+        matcher._finish()
+        return matcher
+
+
+# ---------------------------------------------------------------------------
+# Policy
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Policy:
+    write_allow: List[str]
+    write_deny: List[str]
+    max_lines_changed: int = DEFAULT_MAX_LINES_CHANGED
+    max_files_changed: int = DEFAULT_MAX_FILES_CHANGED
+    max_subsystems: int = DEFAULT_MAX_SUBSYSTEMS
+    # Per-path `lines_changed` ceilings ([path_max_lines] table), first match in file order wins.
+    path_max_lines: List[Tuple[str, int]] = field(default_factory=list)
+    allow_matcher: PathMatcher = field(init=False, repr=False)
+    deny_matcher: PathMatcher = field(init=False, repr=False)
+    path_max_lines_matcher: PathMatcher = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.allow_matcher = PathMatcher(self.write_allow, "write_allow")
+        self.deny_matcher = PathMatcher(self.write_deny, "write_deny")
+        self.path_max_lines_matcher = PathMatcher([pat for pat, _ in self.path_max_lines], "path_max_lines")
+
+    def max_lines_for(self, path: str) -> Optional[Tuple[str, int]]:
+        """Return (rule, limit) of the [path_max_lines] entry covering `path`, if any."""
+        hit = self.path_max_lines_matcher.match(path)
+        if hit is None:
+            return None
+        return self.path_max_lines[hit[0]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "write_allow": self.write_allow,
+            "write_deny": self.write_deny,
+            "max_lines_changed": self.max_lines_changed,
+            "max_files_changed": self.max_files_changed,
+            "max_subsystems": self.max_subsystems,
+            "path_max_lines": [[pat, limit] for pat, limit in self.path_max_lines],
+            "matchers": {
+                "allow": self.allow_matcher.to_dict(),
+                "deny": self.deny_matcher.to_dict(),
+                "path_max_lines": self.path_max_lines_matcher.to_dict(),
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Policy":
+        policy = cls.__new__(cls)
+        policy.write_allow = list(data["write_allow"])
+        policy.write_deny = list(data["write_deny"])
+        policy.max_lines_changed = int(data["max_lines_changed"])
+        policy.max_files_changed = int(data["max_files_changed"])
+        policy.max_subsystems = int(data["max_subsystems"])
+        policy.path_max_lines = [(pat, int(limit)) for pat, limit in data["path_max_lines"]]
+        matchers = data["matchers"]
+        policy.allow_matcher = PathMatcher.from_dict(matchers["allow"])
+        policy.deny_matcher = PathMatcher.from_dict(matchers["deny"])
+        policy.path_max_lines_matcher = PathMatcher.from_dict(matchers["path_max_lines"])
+        return policy
+
+
+def _string_list(data: Dict[str, Any], key: str, required: bool) -> List[str]:
+    if key not in data:
+        if required:
+            raise ValueError(f"Missing required key: {key}")
+        return []
+    value = data[key]
+    if not isinstance(value, list) or not all(isinstance(x, str) for x in value):
+        raise ValueError(f"{key} must be an array of strings")
+    return [normalize_repo_relpath(p) for p in value if p.strip()]
+
+
+def _non_negative_int(data: Dict[str, Any], key: str, default: int) -> int:
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{key} must be a non-negative integer")
+    return value
+
+
+def parse_policy_text(raw: str) -> Policy:
+    data = _loads(raw)
+
+    allow = _string_list(data, "write_allow", required=True)
+    deny = _string_list(data, "write_deny", required=True)
+    if not allow:
+        raise ValueError("write_allow must not be empty (fail-closed)")
+
+    path_max_lines: List[Tuple[str, int]] = []
+    table = data.get("path_max_lines", {})
+    if not isinstance(table, dict):
+        raise ValueError("path_max_lines must be a table of \"<glob>\" = <max lines>")
+    for pat, limit in table.items():
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 0:
+            raise ValueError(f"path_max_lines.{pat} must be a non-negative integer")
+        pat = normalize_repo_relpath(pat)
+        if pat:
+            path_max_lines.append((pat, limit))
+
+    return Policy(
+        write_allow=allow,
+        write_deny=deny,
+        max_lines_changed=_non_negative_int(data, "max_lines_changed", DEFAULT_MAX_LINES_CHANGED),
+        max_files_changed=_non_negative_int(data, "max_files_changed", DEFAULT_MAX_FILES_CHANGED),
+        max_subsystems=_non_negative_int(data, "max_subsystems", DEFAULT_MAX_SUBSYSTEMS),
+        path_max_lines=path_max_lines,
+    )
+
+
+def load_policy(policy_path: str, cache_dir: Optional[str] = None) -> Policy:
+    """
+    Load and compile a guardrails policy.
+
+    With `cache_dir`, the compiled policy is stored as `<sha256>.json` keyed by the policy
+    file content, so repeated runs against an unchanged policy skip TOML parsing and glob
+    translation. Cache read/write failures fall back to a fresh parse.
+    """
+    with open(policy_path, "rb") as fh:
+        raw_bytes = fh.read()
+
+    cache_path = ""
+    if cache_dir:
+        digest = hashlib.sha256(raw_bytes + f"\0v{POLICY_CACHE_VERSION}".encode()).hexdigest()
+        cache_path = os.path.join(cache_dir, f"{digest}.json")
+        try:
+            with open(cache_path, "r", encoding="utf-8") as fh:
+                return Policy.from_dict(json.load(fh))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    policy = parse_policy_text(raw_bytes.decode("utf-8"))
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".policy.", suffix=".tmp", dir=cache_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(policy.to_dict(), fh)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return policy
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Mechanical repair of a model-generated patch before validation.
+
+A patch that passes `git apply --check` as given is left untouched. Otherwise (each step
+is logged, the patch is only rewritten when a step changes it):
+1. normalize: CRLF/trailing blank lines, missing final newline
+2. dedupe: drop exact-duplicate `diff --git` blocks
+3. recount: rewrite `@@ -a,b +c,d @@` counts from the hunk bodies
+4. apply modes: `git apply --check` again, then whitespace-tolerant, reduced-context and
+   3-way application into a scratch index; a tolerant success is turned back into a
+   clean patch with `git diff --cached`.
+
+Exit codes: 0 = patch applies (possibly repaired), 1 = not repairable (patch left as
+the best text-level repair so the validator reports the real error), 2 = usage error.
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional, Tuple
+
+HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@(.*)$")
+
+# (label, extra `git apply` flags) tried in a scratch index after a plain check fails.
+APPLY_MODES: List[Tuple[str, List[str]]] = [
+    ("ignore-whitespace", ["--ignore-whitespace"]),
+    ("reduced-context", ["--ignore-whitespace", "-C1"]),
+    ("3way", ["--3way"]),
+]
+
+
+def split_blocks(text: str) -> Tuple[str, List[str]]:
+    """Split into (preamble, [`diff --git` blocks]); each block ends with a newline."""
+    starts = [m.start() for m in re.finditer(r"(?m)^diff --git ", text)]
+    if not starts:
+        return text, []
+    preamble = text[: starts[0]]
+    blocks = [text[s:e] for s, e in zip(starts, starts[1:] + [len(text)])]
+    return preamble, blocks
+
+
+def normalize(text: str) -> str:
+    text = text.replace("\r\n", "\n")
+    preamble, blocks = split_blocks(text)
+    # Blank lines between blocks (e.g. before a closing fence) are not hunk content.
+    blocks = [block.rstrip("\n") + "\n" for block in blocks]
+    return preamble + "".join(blocks)
+
+
+def drop_duplicate_blocks(text: str) -> Tuple[str, int]:
+    preamble, blocks = split_blocks(text)
+    seen = set()
+    kept = []
+    for block in blocks:
+        if block in seen:
+            continue
+        seen.add(block)
+        kept.append(block)
+    return preamble + "".join(kept), len(blocks) - len(kept)
+
+
+def _is_hunk_line(lines: List[str], j: int) -> bool:
+    """Whether lines[j] can be hunk content; a `---`/`+++` pair starts the next file."""
+    line = lines[j]
+    if line.startswith("@@ ") or line.startswith("diff --git "):
+        return False
+    if line.startswith("--- ") and j + 1 < len(lines) and lines[j + 1].startswith("+++ "):
+        return False
+    # "" is a context line whose leading space was lost.
+    return line == "" or line[0] in " +-\\"
+
+
+def _recount_block(block: str) -> Tuple[str, int]:
+    lines = block.split("\n")
+    out: List[str] = []
+    fixed = 0
+    i = 0
+    while i < len(lines):
+        m = HUNK_HEADER_RE.match(lines[i])
+        if not m:
+            out.append(lines[i])
+            i += 1
+            continue
+        # The hunk ends at the first line that cannot be hunk content (trailing prose, the
+        # next file's header); blank lines before that point are not part of it.
+        j = i + 1
+        while j < len(lines) and _is_hunk_line(lines, j):
+            j += 1
+        while j > i + 1 and lines[j - 1] == "":
+            j -= 1
+        body = lines[i + 1 : j]
+        old_count = new_count = 0
+        for line in body:
+            if line.startswith("-"):
+                old_count += 1
+            elif line.startswith("+"):
+                new_count += 1
+            elif line.startswith("\\"):
+                continue
+            else:
+                old_count += 1
+                new_count += 1
+        old_start, new_start, section = m.group(1), m.group(3), m.group(5)
+        # An omitted count means 1; headers whose counts already match are kept byte for byte.
+        header_counts = (
+            int(m.group(2)) if m.group(2) is not None else 1,
+            int(m.group(4)) if m.group(4) is not None else 1,
+        )
+        if header_counts == (old_count, new_count):
+            out.append(lines[i])
+        else:
+            out.append(f"@@ -{old_start},{old_count} +{new_start},{new_count} @@{section}")
+            fixed += 1
+        out.extend(body)
+        i = j
+    return "\n".join(out), fixed
+
+
+def recount_hunks(text: str) -> Tuple[str, int]:
+    preamble, blocks = split_blocks(text)
+    fixed = 0
+    out = []
+    for block in blocks:
+        new_block, n = _recount_block(block)
+        fixed += n
+        out.append(new_block)
+    return preamble + "".join(out), fixed
+
+
+def run_git(repo_root: str, args: List[str], env: Optional[dict] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args],
+        cwd=repo_root,
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+
+
+def first_error(proc: subprocess.CompletedProcess) -> str:
+    for line in proc.stderr.splitlines():
+        if line.strip():
+            return line.strip()
+    return f"exit {proc.returncode}"
+
+
+def apply_in_scratch_index(repo_root: str, patch_path: str, flags: List[str]) -> Tuple[Optional[str], str]:
+    """Apply onto a scratch copy of HEAD's index; return (regenerated patch, error)."""
+    scratch = tempfile.mkdtemp(prefix="repair-index.")
+    try:
+        env = dict(os.environ)
+        env["GIT_INDEX_FILE"] = os.path.join(scratch, "index")
+        proc = run_git(repo_root, ["read-tree", "HEAD"], env=env)
+        if proc.returncode != 0:
+            return None, f"read-tree HEAD failed: {first_error(proc)}"
+        proc = run_git(repo_root, ["apply", "--cached", *flags, patch_path], env=env)
+        if proc.returncode != 0:
+            return None, first_error(proc)
+        proc = run_git(repo_root, ["diff", "--cached", "--no-color", "--no-renames", "--no-ext-diff", "HEAD"], env=env)
+        if proc.returncode != 0 or not proc.stdout.strip():
+            return None, "empty diff after apply"
+        return proc.stdout, ""
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repo-root", required=True)
+    ap.add_argument("--patch", required=True, help="Patch to repair in place")
+    ap.add_argument("--log", help="Append step results here (default: stderr only)")
+    args = ap.parse_args(argv)
+
+    repo_root = os.path.abspath(args.repo_root)
+    patch_path = os.path.abspath(args.patch)
+    if not os.path.isfile(patch_path) or os.path.getsize(patch_path) == 0:
+        print(f"patch is missing or empty: {patch_path}", file=sys.stderr)
+        return 2
+
+    log_lines: List[str] = []
+
+    def log(msg: str) -> None:
+        log_lines.append(msg)
+        print(f"repair: {msg}", file=sys.stderr)
+
+    with open(patch_path, "r", encoding="utf-8", errors="replace") as fh:
+        original = fh.read()
+
+    def finish(code: int) -> int:
+        if args.log and log_lines:
+            with open(args.log, "a", encoding="utf-8") as fh:
+                fh.write("".join(f"{line}\n" for line in log_lines))
+        return code
+
+    # A patch git already accepts is left untouched: the text-level steps below only guess.
+    if run_git(repo_root, ["apply", "--check", patch_path]).returncode == 0:
+        return finish(0)
+
+    text = normalize(original)
+    if text != original:
+        log("normalize: fixed line endings / trailing blank lines / final newline")
+    text, dropped = drop_duplicate_blocks(text)
+    if dropped:
+        log(f"dedupe: dropped {dropped} duplicate file block(s)")
+    text, fixed = recount_hunks(text)
+    if fixed:
+        log(f"recount: rewrote {fixed} hunk header(s)")
+
+    current = original
+
+    def write_patch(content: str) -> None:
+        nonlocal current
+        if content == current:
+            return
+        backup = os.path.join(os.path.dirname(patch_path), "patch.orig.diff")
+        if not os.path.exists(backup):
+            with open(backup, "w", encoding="utf-8") as fh:
+                fh.write(original)
+        with open(patch_path, "w", encoding="utf-8") as fh:
+            fh.write(content)
+        current = content
+
+    write_patch(text)
+
+    chk = run_git(repo_root, ["apply", "--check", patch_path])
+    if chk.returncode == 0:
+        if text != original:
+            log("check: repaired patch applies")
+        return finish(0)
+    log(f"check: git apply --check failed: {first_error(chk)}")
+
+    for label, flags in APPLY_MODES:
+        regenerated, err = apply_in_scratch_index(repo_root, patch_path, flags)
+        if regenerated is None:
+            log(f"{label}: failed: {err}")
+            continue
+        write_patch(regenerated)
+        chk = run_git(repo_root, ["apply", "--check", patch_path])
+        if chk.returncode != 0:
+            log(f"{label}: regenerated patch does not apply: {first_error(chk)}")
+            write_patch(text)
+            continue
+        log(f"{label}: applied in scratch index; patch regenerated from it")
+        return finish(0)
+
+    log("giving up: patch needs regeneration")
+    return finish(1)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
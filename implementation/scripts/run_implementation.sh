@@ -30,7 +30,7 @@ done
 if (( ${#positional_args[@]} < 1 || ${#positional_args[@]} > 2 )); then
   echo "Usage: $0 <scope-id> [run-id] [--dry-run]" >&2
   echo "Required env: SOT, ESTIMATION_FILE" >&2
-  echo "Optional env: RUN_ID, PLAN_FILE, REVIEW_FILE, CLARIFICATIONS, CONSTRAINTS, POLICY_FILE, APPLY, ALLOW_LARGE_PATCH, CODEX_BIN, MODEL, REASONING_EFFORT, EXEC_TIMEOUT_SEC" >&2
+  echo "Optional env: RUN_ID, PLAN_FILE, REVIEW_FILE, CLARIFICATIONS, CONSTRAINTS, POLICY_FILE, APPLY, ALLOW_LARGE_PATCH, REPAIR_PATCH, CANDIDATES, CANDIDATE_POLICY, WORKTREE, WORKTREE_BASE, WORKTREE_BRANCH, WORKTREE_ROOT, WORKTREE_TEST_CMD, CODEX_BIN, CODEX_CASSETTE, CODEX_CASSETTE_DIR, CODEX_MAX_CONCURRENT, CODEX_RPM, CODEX_RPM_BURST, CODEX_LIMIT_DIR, MODEL, REASONING_EFFORT, EXEC_TIMEOUT_SEC, SKILLED_REVIEWS_TRACE, SKILLED_REVIEWS_TRACE_FORMAT, SKILLED_REVIEWS_PROFILE" >&2
   exit 1
 fi
 
@@ -61,6 +61,25 @@ policy_file="${POLICY_FILE:-}"
 apply_changes="${APPLY:-1}"
 allow_large_patch="${ALLOW_LARGE_PATCH:-0}"
 exec_timeout_sec="${EXEC_TIMEOUT_SEC:-}"
+repair_patch="${REPAIR_PATCH:-1}"
+candidates="${CANDIDATES:-1}"
+candidate_policy="${CANDIDATE_POLICY:-first}"
+worktree_mode="${WORKTREE:-0}"
+worktree_base="${WORKTREE_BASE:-HEAD}"
+worktree_branch="${WORKTREE_BRANCH:-}"
+worktree_test_cmd="${WORKTREE_TEST_CMD:-}"
+
+if [[ ! "$candidates" =~ ^[1-9][0-9]*$ ]]; then
+  echo "Invalid CANDIDATES: $candidates (expected a positive integer)" >&2
+  exit 1
+fi
+case "$candidate_policy" in
+  first|smallest) ;;
+  *)
+    echo "Invalid CANDIDATE_POLICY: $candidate_policy (expected first|smallest)" >&2
+    exit 1
+    ;;
+esac
 
 repo_root="$(git rev-parse --show-toplevel 2>/dev/null || true)"
 if [[ -z "$repo_root" ]]; then
@@ -68,6 +87,61 @@ if [[ -z "$repo_root" ]]; then
   exit 1
 fi
 
+trace_cat="implementation"
+# Tracing: SKILLED_REVIEWS_TRACE=<file> appends one Chrome trace-event "X" span per stage
+# (NDJSON; SKILLED_REVIEWS_TRACE_FORMAT=chrome streams a JSON array instead).
+trace_file="${SKILLED_REVIEWS_TRACE:-}"
+trace_sep=""
+if [[ -n "$trace_file" ]]; then
+  case "${SKILLED_REVIEWS_TRACE_FORMAT:-ndjson}" in
+    ndjson) ;;
+    chrome)
+      trace_sep=","
+      if [[ ! -s "$trace_file" ]]; then
+        (set -C; printf '[\n' >"$trace_file") 2>/dev/null || true
+      fi
+      ;;
+    *)
+      echo "Invalid SKILLED_REVIEWS_TRACE_FORMAT: ${SKILLED_REVIEWS_TRACE_FORMAT} (expected ndjson|chrome)" >&2
+      exit 1
+      ;;
+  esac
+  if [[ "$trace_file" != /* ]]; then
+    trace_file="${PWD}/${trace_file}"
+  fi
+  export SKILLED_REVIEWS_TRACE="$trace_file" SKILLED_REVIEWS_TRACE_PID="$$"
+fi
+trace_now() {
+  # Sets variable $1 to the current time in microseconds (0 when tracing is off).
+  if [[ -z "$trace_file" ]]; then
+    printf -v "$1" '0'
+  elif [[ -n "${EPOCHREALTIME:-}" ]]; then
+    local trace_t="${EPOCHREALTIME/,/.}"
+    printf -v "$1" '%s%s' "${trace_t%.*}" "${trace_t#*.}"
+  else
+    printf -v "$1" '%s000000' "$(date +%s)"
+  fi
+}
+trace_span() {
+  # trace_span <name> <start-us> [key=value ...]
+  [[ -n "$trace_file" ]] || return 0
+  local name="$1" start="$2" end kv value args="" sep=""
+  shift 2
+  trace_now end
+  for kv in "$@"; do
+    value="${kv#*=}"
+    value="${value//\\/\\\\}"
+    value="${value//\"/\\\"}"
+    args+="${sep}\"${kv%%=*}\":\"${value}\""
+    sep=","
+  done
+  printf '{"name":"%s","cat":"%s","ph":"X","ts":%s,"dur":%s,"pid":%s,"tid":%s,"args":{%s}}%s\n' \
+    "$name" "$trace_cat" "$start" "$((end - start))" "$SKILLED_REVIEWS_TRACE_PID" "${BASHPID:-$$}" "$args" "$trace_sep" \
+    >>"$trace_file"
+}
+trace_now run_t0
+run_started="${EPOCHREALTIME:-$(date +%s)}"
+
 if [[ "$estimation_file" != /* ]]; then
   estimation_file="${repo_root}/${estimation_file}"
 fi
@@ -86,12 +160,24 @@ if [[ -n "$plan_file" ]]; then
   fi
 fi
 
+# REVIEW_FILE may list several review JSON files (comma-separated), e.g. the aggregate
+# pr-review.json plus code-review.json; findings are merged and deduplicated.
+review_files=()
 if [[ -n "$review_file" ]]; then
-  if [[ "$review_file" != /* ]]; then
-    review_file="${repo_root}/${review_file}"
-  fi
-  if [[ ! -f "$review_file" || ! -s "$review_file" ]]; then
-    echo "Review file not found or empty: $review_file" >&2
+  IFS=',' read -r -a review_file_items <<<"$review_file"
+  for item in "${review_file_items[@]}"; do
+    [[ -n "$item" ]] || continue
+    if [[ "$item" != /* ]]; then
+      item="${repo_root}/${item}"
+    fi
+    if [[ ! -f "$item" || ! -s "$item" ]]; then
+      echo "Review file not found or empty: $item" >&2
+      exit 1
+    fi
+    review_files+=("$item")
+  done
+  if [[ "${#review_files[@]}" -eq 0 ]]; then
+    echo "REVIEW_FILE is set but lists no files: $review_file" >&2
     exit 1
   fi
 fi
@@ -108,12 +194,25 @@ if [[ ! -f "$policy_file" || ! -s "$policy_file" ]]; then
 fi
 
 script_dir="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# All Python helpers run through one entry point (one interpreter start per stage).
+cli="${script_dir}/skilled_reviews_cli.py"
+if [[ ! -f "$cli" ]]; then
+  echo "CLI entry point not found: $cli" >&2
+  exit 1
+fi
+
 validator="${script_dir}/validate_implementation_patch.py"
 if [[ ! -f "$validator" ]]; then
   echo "Validator script not found: $validator" >&2
   exit 1
 fi
 
+patch_repairer="${script_dir}/repair_patch.py"
+if [[ "$repair_patch" != "0" && ! -f "$patch_repairer" ]]; then
+  echo "Patch repair script not found: $patch_repairer" >&2
+  exit 1
+fi
+
 review_extractor="${script_dir}/extract_review_feedback.py"
 if [[ -n "$review_file" && ! -f "$review_extractor" ]]; then
   echo "Review feedback extractor not found: $review_extractor" >&2
@@ -123,7 +222,16 @@ fi
 codex_bin="${CODEX_BIN:-codex}"
 model="${MODEL:-gpt-5.2-codex}"
 effort="${REASONING_EFFORT:-high}"
-if ! command -v "$codex_bin" >/dev/null 2>&1; then
+codex_cassette="${CODEX_CASSETTE:-}"
+case "$codex_cassette" in
+  ""|record|replay) ;;
+  *)
+    echo "Invalid CODEX_CASSETTE: $codex_cassette (expected record|replay)" >&2
+    exit 1
+    ;;
+esac
+# Replay serves recorded answers, so codex itself is not needed.
+if [[ "$codex_cassette" != "replay" ]] && ! command -v "$codex_bin" >/dev/null 2>&1; then
   echo "codex not found: $codex_bin" >&2
   exit 1
 fi
@@ -145,17 +253,25 @@ if [[ -n "$exec_timeout_sec" ]]; then
 fi
 
 # Safety: avoid applying onto a dirty index or worktree (untracked files are OK).
-if ! git -C "$repo_root" diff --quiet; then
-  echo "Unstaged changes detected; aborting to avoid mixing scopes." >&2
-  exit 1
-fi
-if ! git -C "$repo_root" diff --cached --quiet; then
-  echo "Staged changes detected; aborting to avoid mixing scopes." >&2
-  exit 1
+# WORKTREE=1 applies in a dedicated git worktree instead, so the main tree may be dirty.
+if [[ "$worktree_mode" != "1" ]]; then
+  if ! git -C "$repo_root" diff --quiet; then
+    echo "Unstaged changes detected; aborting to avoid mixing scopes." >&2
+    exit 1
+  fi
+  if ! git -C "$repo_root" diff --cached --quiet; then
+    echo "Staged changes detected; aborting to avoid mixing scopes." >&2
+    exit 1
+  fi
 fi
 
 if [[ -z "$run_id" ]]; then
-  run_id="$(date +"%Y%m%d_%H%M%S")"
+  if [[ "$dry_run" == "1" ]]; then
+    run_id="$(date +"%Y%m%d_%H%M%S")"
+  else
+    # Claimed with an exclusive mkdir: runs started in the same second get -02, -03, ...
+    run_id="$(python3 "$cli" run-alloc alloc "${repo_root}/.skilled-reviews/.implementation/impl-runs/${scope_id}")"
+  fi
 fi
 if [[ ! "$run_id" =~ ^[A-Za-z0-9._-]+$ || "$run_id" == "." || "$run_id" == ".." ]]; then
   echo "Invalid run-id: $run_id (allowed: [A-Za-z0-9._-]+, not '.' or '..')" >&2
@@ -165,6 +281,30 @@ fi
 run_dir="${repo_root}/.skilled-reviews/.implementation/impl-runs/${scope_id}/${run_id}"
 raw_out="${run_dir}/raw.txt"
 patch_out="${run_dir}/patch.diff"
+candidates_dir="${run_dir}/candidates"
+worktree_pool="${WORKTREE_ROOT:-${repo_root}/.skilled-reviews/.implementation/worktrees}"
+work_root="$repo_root"
+worktree_slot=""
+worktree_base_commit=""
+
+if [[ "$worktree_mode" == "1" ]]; then
+  if [[ -z "$worktree_branch" ]]; then
+    worktree_branch="skilled-reviews/impl/${scope_id}/${run_id}"
+  fi
+  if ! git check-ref-format --branch "$worktree_branch" >/dev/null 2>&1; then
+    echo "Invalid WORKTREE_BRANCH: $worktree_branch" >&2
+    exit 1
+  fi
+  if git -C "$repo_root" show-ref --verify --quiet "refs/heads/${worktree_branch}"; then
+    echo "WORKTREE_BRANCH already exists: $worktree_branch (delete it or pick another branch/run-id)" >&2
+    exit 1
+  fi
+  worktree_base_commit="$(git -C "$repo_root" rev-parse --verify --quiet "${worktree_base}^{commit}" || true)"
+  if [[ -z "$worktree_base_commit" ]]; then
+    echo "WORKTREE_BASE does not name a commit: $worktree_base" >&2
+    exit 1
+  fi
+fi
 
 echo "Repo: $repo_root" >&2
 echo "Scope ID: $scope_id" >&2
@@ -174,6 +314,12 @@ echo "Raw out: $raw_out" >&2
 echo "Patch out: $patch_out" >&2
 printf -- '- model: %s\n' "$model" >&2
 printf -- '- reasoning_effort: %s\n' "$effort" >&2
+if (( candidates > 1 )); then
+  printf -- '- candidates: %s (policy: %s)\n' "$candidates" "$candidate_policy" >&2
+fi
+if [[ "$worktree_mode" == "1" ]]; then
+  printf -- '- worktree: pool=%s base=%s branch=%s\n' "$worktree_pool" "$worktree_base_commit" "$worktree_branch" >&2
+fi
 
 if [[ "$dry_run" == "1" ]]; then
   echo "--dry-run: prerequisites OK (no patch will be generated/applied)" >&2
@@ -181,17 +327,95 @@ if [[ "$dry_run" == "1" ]]; then
 fi
 
 mkdir -p "$run_dir"
+prompt_file="${run_dir}/prompt.txt"
+# SKILLED_REVIEWS_PROFILE=1: the Python stages dump cProfile stats into the run dir.
+if [[ "${SKILLED_REVIEWS_PROFILE:-}" == "1" ]]; then
+  export SKILLED_REVIEWS_PROFILE_DIR="$run_dir"
+fi
+
+# Worktree pool: slots are <pool>/wt-<n>, each guarded by a <slot>.lock directory holding
+# the owner's pid. A free slot is reset to the base commit (ignored files such as build
+# caches survive); otherwise a new slot is added. The slot is released on exit.
+release_worktree() {
+  if [[ -n "$worktree_slot" ]]; then
+    git -C "$worktree_slot" checkout -q --detach 2>/dev/null || true
+    rm -rf "${worktree_slot}.lock"
+    worktree_slot=""
+  fi
+}
+
+acquire_worktree() {
+  local n=1 slot lock pid
+  mkdir -p "$worktree_pool"
+  while :; do
+    slot="${worktree_pool}/wt-${n}"
+    lock="${slot}.lock"
+    if mkdir "$lock" 2>/dev/null; then
+      echo "$$" >"${lock}/pid"
+      break
+    fi
+    # A stale lock is taken over under <slot>.lock.takeover (mkdir is atomic) and only if it
+    # still holds the dead pid, so two runs cannot both remove it and recycle the slot.
+    pid="$(cat "${lock}/pid" 2>/dev/null || true)"
+    if [[ -n "$pid" ]] && ! kill -0 "$pid" 2>/dev/null && mkdir "${lock}.takeover" 2>/dev/null; then
+      if [[ "$(cat "${lock}/pid" 2>/dev/null || true)" == "$pid" ]]; then
+        echo "Removing stale worktree lock (pid $pid): $lock" >&2
+        rm -rf "$lock"
+      fi
+      rmdir "${lock}.takeover"
+      continue
+    fi
+    n=$((n + 1))
+  done
+  worktree_slot="$slot"
+
+  if [[ -d "$slot" ]] && [[ "$(git -C "$slot" rev-parse --show-toplevel 2>/dev/null || true)" == "$(cd "$slot" && pwd -P)" ]]; then
+    git -C "$slot" reset -q --hard
+    git -C "$slot" clean -q -fd
+    git -C "$slot" checkout -q --detach "$worktree_base_commit"
+    echo "Reusing worktree: $slot" >&2
+  else
+    rm -rf "$slot"
+    git -C "$repo_root" worktree prune
+    git -C "$repo_root" worktree add -q --detach "$slot" "$worktree_base_commit"
+    echo "Created worktree: $slot" >&2
+  fi
+  work_root="$slot"
+}
+
+finish() {
+  local status=$? run_ended="${EPOCHREALTIME:-$(date +%s)}" patch_fingerprint=""
+  release_worktree
+  # Run record for the history index (`skilled_reviews_cli.py index`); the diff is the
+  # `git hash-object` id of patch.diff, empty when the run stopped before producing one.
+  if [[ -s "$patch_out" ]]; then
+    patch_fingerprint="$(git hash-object -- "$patch_out" 2>/dev/null || true)"
+  fi
+  printf '{"runner":"implementation","start":%s,"end":%s,"exit":%s,"diff":"%s"}\n' \
+    "${run_started/,/.}" "${run_ended/,/.}" "$status" "$patch_fingerprint" >>"${run_dir}/timings.ndjson"
+  trace_span run "$run_t0" scope="$scope_id" run="$run_id" exit="$status"
+}
+trap finish EXIT
+
+if [[ "$worktree_mode" == "1" ]]; then
+  trace_now t_stage
+  acquire_worktree
+  trace_span worktree-acquire "$t_stage" slot="${worktree_slot##*/}"
+fi
 
 review_feedback=""
 if [[ -n "$review_file" ]]; then
-  review_feedback="$(python3 "$review_extractor" "$review_file")"
+  trace_now t_stage
+  review_feedback="$(python3 "$cli" review-feedback --report "${run_dir}/review-feedback.json" "${review_files[@]}")"
+  trace_span review-feedback "$t_stage" files="${#review_files[@]}"
   if ! grep -q '[^[:space:]]' <<<"$review_feedback"; then
-    echo "Review feedback extractor returned empty output for: $review_file" >&2
+    echo "Review feedback extractor returned empty output for: ${review_files[*]}" >&2
     echo "Fail-closed: REVIEW_FILE is set but extracted guidance is empty." >&2
     exit 1
   fi
 fi
 
+trace_now t_stage
 {
   cat <<'PROMPT'
 You are an implementation agent operating in a git repository.
@@ -231,9 +455,11 @@ PROMPT
 	    printf 'Plan file: %s\n' "$plan_file"
 	  fi
 	  if [[ -n "$review_file" ]]; then
-	    printf 'Review file (review-v2 JSON; MUST READ): %s\n' "$review_file"
+	    for item in "${review_files[@]}"; do
+	      printf 'Review file (review-v2 JSON; MUST READ): %s\n' "$item"
+	    done
 	    printf 'Review feedback summary (parsed; convenience only):\n%s\n' "$review_feedback"
-	    printf 'Note: review JSON is not inlined; read the file at the path above.\n'
+	    printf 'Note: review JSON is not inlined; read the file(s) at the path(s) above.\n'
 	  fi
 	  if [[ -n "$clarifications" ]]; then
 	    printf 'Clarifications:\n%s\n' "$clarifications"
@@ -249,93 +475,278 @@ Task:
 - Implement the described scope.
 - Output a unified diff patch only.
 PROMPT
-} | {
-  cmd=(
+} >"$prompt_file"
+trace_span prompt "$t_stage"
+
+# Runs one codex generation: run_codex <raw-out>
+run_codex() {
+  local cmd=(
     "$codex_bin" exec
     --sandbox read-only
-    -C "$repo_root"
+    -C "$work_root"
     -m "$model"
     -c "reasoning.effort=\"${effort}\""
-    --output-last-message "$raw_out"
+    --output-last-message "$1"
     -
   )
   if [[ -n "$exec_timeout_sec" && -n "$timeout_bin" ]]; then
     cmd=("$timeout_bin" "$exec_timeout_sec" "${cmd[@]}")
   fi
-  "${cmd[@]}"
+  if [[ -n "${CODEX_MAX_CONCURRENT:-}${CODEX_RPM:-}" ]]; then
+    cmd=(python3 "$cli" codex-limit --tag "${scope_id}/implementation" --metrics "${run_dir}/codex-queue.ndjson" -- "${cmd[@]}")
+  fi
+  if [[ -n "$codex_cassette" ]]; then
+    cmd=(python3 "$cli" codex-cassette --repo-root "$repo_root" --run-id "$run_id" -- "${cmd[@]}")
+  fi
+  local t_codex codex_rc=0
+  trace_now t_codex
+  "${cmd[@]}" <"$prompt_file" || codex_rc="$?"
+  trace_span codex "$t_codex" output="${1#"${run_dir}/"}" exit="$codex_rc"
+  return "$codex_rc"
 }
 
-if [[ ! -s "$raw_out" ]]; then
-  echo "codex output is empty: $raw_out" >&2
-  exit 1
+# Extract + repair + validate in one interpreter: check_cmd --raw <raw> --patch <patch> --repair-log <log>
+# Exit: 0 valid, 1 invalid, 3 no unified diff in the answer (QUESTION).
+check_cmd=(
+  python3 "$cli" check-patch --repo-root "$work_root"
+)
+if [[ "$repair_patch" == "0" ]]; then
+  check_cmd+=(--no-repair)
 fi
-
-first_non_empty="$(grep -m1 -v '^[[:space:]]*$' "$raw_out" || true)"
-if [[ -z "$first_non_empty" ]]; then
-  echo "codex output contains only whitespace: $raw_out" >&2
-  exit 1
+check_cmd+=(
+  --policy "$policy_file"
+  --policy-cache-dir "${repo_root}/.skilled-reviews/.implementation/.policy-cache"
+)
+if [[ "$allow_large_patch" == "1" ]]; then
+  check_cmd+=(--allow-large-patch)
 fi
 
-if [[ "$first_non_empty" == QUESTION:* ]]; then
-  echo "Model stopped with QUESTION (no patch applied):" >&2
-  cat "$raw_out" >&2
-  exit 2
-fi
+# Descendants of a pid, from one ps snapshot (breadth-first).
+proc_tree() {
+  ps -A -o pid= -o ppid= 2>/dev/null | awk -v root="$1" '
+    { kids[$2] = kids[$2] " " $1 }
+    END {
+      n = split(kids[root], q, " ")
+      for (i = 1; i <= n; i++) {
+        print q[i]
+        m = split(kids[q[i]], c, " ")
+        for (j = 1; j <= m; j++) q[++n] = c[j]
+      }
+    }'
+}
 
-python3 - "$raw_out" "$patch_out" <<'PY'
-import sys
+# Terminate a process and all its descendants. The tree is stopped first so it cannot fork
+# between the snapshot and the signal; `timeout` runs codex in its own process group, so a
+# process-group kill alone would miss it.
+kill_tree() {
+  local tree
+  kill -STOP "$1" 2>/dev/null || return 0
+  tree="$(proc_tree "$1")"
+  kill -STOP $tree 2>/dev/null || true
+  kill -TERM "$1" $tree 2>/dev/null || true
+  kill -CONT "$1" $tree 2>/dev/null || true
+}
 
-raw_path = sys.argv[1]
-patch_path = sys.argv[2]
+# Generates, extracts and validates one candidate in candidates/<i>/ (CANDIDATES>1).
+# The status file is written last: ok | invalid | question | failed.
+run_candidate() {
+  local dir="${candidates_dir}/$1"
+  local raw="${dir}/raw.txt"
+  local patch="${dir}/patch.diff"
+  local first_line lines
+  mkdir -p "$dir"
+
+  if ! run_codex "$raw" >"${dir}/codex.log" 2>&1 || [[ ! -s "$raw" ]]; then
+    echo "failed" >"${dir}/status"
+    return 0
+  fi
 
-with open(raw_path, "r", encoding="utf-8", errors="replace") as fh:
-    lines = fh.read().splitlines(True)
+  first_line="$(grep -m1 -v '^[[:space:]]*$' "$raw" || true)"
+  if [[ -z "$first_line" ]]; then
+    echo "failed" >"${dir}/status"
+    return 0
+  fi
+  if [[ "$first_line" == QUESTION:* ]]; then
+    echo "question" >"${dir}/status"
+    return 0
+  fi
 
-start = None
-end = None
-for i, line in enumerate(lines):
-    if line.startswith("diff --git "):
-        start = i
-        break
+  local check_exit=0 t_check
+  trace_now t_check
+  "${check_cmd[@]}" --raw "$raw" --patch "$patch" --repair-log "${dir}/repair.log" >"${dir}/validate.log" 2>&1 \
+    || check_exit="$?"
+  trace_span check-patch "$t_check" candidate="$1" exit="$check_exit"
+  case "$check_exit" in
+    0)
+      lines="$(sed -n 's/^Patch OK: lines_changed=\([0-9]*\).*/\1/p' "${dir}/validate.log" | head -n 1)"
+      echo "${lines:-0}" >"${dir}/lines_changed"
+      echo "ok" >"${dir}/status"
+      ;;
+    3) echo "question" >"${dir}/status" ;;
+    *) echo "invalid" >"${dir}/status" ;;
+  esac
+  return 0
+}
 
-if start is None:
-    sys.exit(0)
+if (( candidates > 1 )); then
+  mkdir -p "$candidates_dir"
+  cand_pids=()
+  for ((i = 1; i <= candidates; i++)); do
+    run_candidate "$i" &
+    cand_pids+=("$!")
+  done
+
+  # Poll candidate status files; "first" stops at the first valid patch, "smallest"
+  # waits for every candidate and picks the fewest lines_changed (lowest index on ties).
+  winner=""
+  while :; do
+    running=0
+    best=""
+    best_lines=""
+    for ((i = 1; i <= candidates; i++)); do
+      status_file="${candidates_dir}/${i}/status"
+      if [[ ! -s "$status_file" ]]; then
+        running=$((running + 1))
+        continue
+      fi
+      [[ "$(cat "$status_file")" == "ok" ]] || continue
+      lines="$(cat "${candidates_dir}/${i}/lines_changed")"
+      if [[ -z "$best" ]] || (( lines < best_lines )); then
+        best="$i"
+        best_lines="$lines"
+      fi
+    done
+    if [[ -n "$best" && ( "$candidate_policy" == "first" || "$running" == "0" ) ]]; then
+      winner="$best"
+      break
+    fi
+    if [[ "$running" == "0" ]]; then
+      break
+    fi
+    sleep 0.2
+  done
+
+  # Cancel candidates that are still generating/validating, with their whole process tree
+  # (codex, timeout, limiter/cassette wrappers) so none of them writes into candidates/<i>/ later.
+  for ((i = 1; i <= candidates; i++)); do
+    status_file="${candidates_dir}/${i}/status"
+    [[ -s "$status_file" ]] && continue
+    kill_tree "${cand_pids[$((i - 1))]}"
+    echo "cancelled" >"$status_file"
+  done
+  for pid in "${cand_pids[@]}"; do
+    wait "$pid" 2>/dev/null || true
+  done
+
+  for ((i = 1; i <= candidates; i++)); do
+    printf 'Candidate %s: %s\n' "$i" "$(cat "${candidates_dir}/${i}/status")" >&2
+  done
+
+  if [[ -z "$winner" ]]; then
+    for ((i = 1; i <= candidates; i++)); do
+      if [[ "$(cat "${candidates_dir}/${i}/status")" == "invalid" ]]; then
+        echo "No valid candidate patch (validator output of candidate ${i}):" >&2
+        cat "${candidates_dir}/${i}/validate.log" >&2
+        exit 1
+      fi
+    done
+    for ((i = 1; i <= candidates; i++)); do
+      if [[ "$(cat "${candidates_dir}/${i}/status")" == "question" ]]; then
+        echo "Model stopped with QUESTION or without a unified diff in every candidate (no patch applied):" >&2
+        cat "${candidates_dir}/${i}/raw.txt" >&2
+        exit 2
+      fi
+    done
+    echo "All candidates failed (see ${candidates_dir}/<i>/codex.log)" >&2
+    exit 1
+  fi
 
-for j in range(start, len(lines)):
-    if lines[j].startswith("```"):
-        end = j
-        break
+  echo "$winner" >"${candidates_dir}/winner"
+  cp "${candidates_dir}/${winner}/raw.txt" "$raw_out"
+  cp "${candidates_dir}/${winner}/patch.diff" "$patch_out"
+  echo "Selected candidate ${winner} (policy: ${candidate_policy})" >&2
+  cat "${candidates_dir}/${winner}/validate.log" >&2
+else
+  run_codex "$raw_out"
 
-patch_lines = lines[start:] if end is None else lines[start:end]
-if patch_lines and not patch_lines[-1].endswith("\n"):
-    patch_lines[-1] += "\n"
-with open(patch_path, "w", encoding="utf-8") as out:
-    out.writelines(patch_lines)
-PY
+  if [[ ! -s "$raw_out" ]]; then
+    echo "codex output is empty: $raw_out" >&2
+    exit 1
+  fi
 
-if [[ ! -s "$patch_out" ]]; then
-  echo "Model output did not contain a unified diff; treating as QUESTION and stopping (no patch applied)." >&2
-  cat "$raw_out" >&2
-  exit 2
-fi
+  first_non_empty="$(grep -m1 -v '^[[:space:]]*$' "$raw_out" || true)"
+  if [[ -z "$first_non_empty" ]]; then
+    echo "codex output contains only whitespace: $raw_out" >&2
+    exit 1
+  fi
 
-first_patch_line="$(grep -m1 -v '^[[:space:]]*$' "$patch_out" || true)"
-if [[ "$first_patch_line" != diff\ --git\ * ]]; then
-  echo "Extracted patch is not a unified diff; stopping (no patch applied)." >&2
-  cat "$raw_out" >&2
-  exit 2
-fi
+  if [[ "$first_non_empty" == QUESTION:* ]]; then
+    echo "Model stopped with QUESTION (no patch applied):" >&2
+    cat "$raw_out" >&2
+    exit 2
+  fi
 
-validate_cmd=(python3 "$validator" --repo-root "$repo_root" --patch "$patch_out" --policy "$policy_file")
-if [[ "$allow_large_patch" == "1" ]]; then
-  validate_cmd+=(--allow-large-patch)
+  check_exit=0
+  trace_now t_stage
+  "${check_cmd[@]}" --raw "$raw_out" --patch "$patch_out" --repair-log "${run_dir}/repair.log" || check_exit="$?"
+  trace_span check-patch "$t_stage" exit="$check_exit"
+  if [[ "$check_exit" == "3" ]]; then
+    echo "Treating as QUESTION and stopping (no patch applied)." >&2
+    cat "$raw_out" >&2
+    exit 2
+  fi
+  if [[ "$check_exit" != "0" ]]; then
+    exit "$check_exit"
+  fi
 fi
-"${validate_cmd[@]}"
 
 if [[ "$apply_changes" == "0" ]]; then
   echo "APPLY=0: patch generated and validated, but not applied." >&2
   exit 0
 fi
 
-git -C "$repo_root" apply "$patch_out"
-echo "Applied patch: $patch_out" >&2
+if [[ "$worktree_mode" != "1" ]]; then
+  trace_now t_stage
+  git -C "$repo_root" apply "$patch_out"
+  trace_span apply "$t_stage"
+  echo "Applied patch: $patch_out" >&2
+  exit 0
+fi
+
+# Worktree mode: commit the patch on its own branch, then run the tests there.
+trace_now t_stage
+git -C "$work_root" apply --index "$patch_out"
+# -b, not -B: a branch created since the check above must not be reset to this result.
+if ! git -C "$work_root" checkout -q -b "$worktree_branch"; then
+  echo "Could not create WORKTREE_BRANCH (it already exists?): $worktree_branch" >&2
+  exit 1
+fi
+commit_cmd=(git -C "$work_root")
+if [[ -z "$(git -C "$work_root" config user.email || true)" ]]; then
+  commit_cmd+=(-c user.name=skilled-reviews -c user.email=skilled-reviews@localhost)
+fi
+"${commit_cmd[@]}" commit -q --no-verify -m "[${scope_id}] implementation run ${run_id}"
+worktree_commit="$(git -C "$work_root" rev-parse HEAD)"
+trace_span apply "$t_stage" branch="$worktree_branch"
+echo "Applied patch in worktree: $work_root" >&2
+echo "Branch: $worktree_branch ($worktree_commit)" >&2
+
+test_exit=""
+if [[ -n "$worktree_test_cmd" ]]; then
+  echo "Running tests in worktree: $worktree_test_cmd" >&2
+  trace_now t_stage
+  set +e
+  (cd "$work_root" && bash -c "$worktree_test_cmd") >"${run_dir}/test.log" 2>&1
+  test_exit="$?"
+  set -e
+  trace_span tests "$t_stage" exit="$test_exit"
+  echo "Tests exit=${test_exit} (log: ${run_dir}/test.log)" >&2
+fi
+
+python3 "$cli" write-worktree-record "${run_dir}/worktree.json" "$work_root" "$worktree_branch" \
+  "$worktree_base_commit" "$worktree_commit" "$worktree_test_cmd" "$test_exit"
+
+if [[ -n "$test_exit" && "$test_exit" != "0" ]]; then
+  echo "Tests failed in worktree (branch kept: $worktree_branch)" >&2
+  exit 1
+fi
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+SKILLED_REVIEWS_TRACE spans written from Python, and the trace reader.
+
+write_span  append one Chrome trace-event "X" span (same record format as the shell runners'
+            trace_span; pid = the calling runner, tid = this process). skilled_reviews_cli.py
+            writes one `py:<command>` span per command while tracing is on
+main        per-span totals of a trace file (NDJSON, or a possibly unterminated Chrome JSON
+            array/object); --chrome also writes {"traceEvents": [...]} for chrome://tracing /
+            Perfetto
+
+Usage:
+  trace_report.py <trace> [--chrome OUT] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+
+def write_span(name: str, start: float, end: float, args: dict) -> None:
+    """Append a span (times in epoch seconds) to SKILLED_REVIEWS_TRACE; no-op when unset."""
+    path = os.environ.get("SKILLED_REVIEWS_TRACE", "")
+    if not path:
+        return
+    chrome = os.environ.get("SKILLED_REVIEWS_TRACE_FORMAT", "ndjson") == "chrome"
+    event = {
+        "name": name,
+        "cat": "python",
+        "ph": "X",
+        "ts": int(start * 1_000_000),
+        "dur": int((end - start) * 1_000_000),
+        "pid": int(os.environ.get("SKILLED_REVIEWS_TRACE_PID") or os.getppid()),
+        "tid": os.getpid(),
+        "args": args,
+    }
+    line = json.dumps(event, separators=(",", ":")) + (",\n" if chrome else "\n")
+    try:
+        if chrome and not os.path.exists(path):
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                pass
+            else:
+                os.write(fd, b"[\n")
+                os.close(fd)
+        # One O_APPEND write per span keeps concurrent writers from interleaving.
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError as exc:
+        print(f"trace: cannot write {path}: {exc}", file=sys.stderr)
+
+
+def load_trace(path: str) -> list:
+    """Read an NDJSON trace or a (possibly unterminated) Chrome JSON array/object."""
+    with open(path, "r", encoding="utf-8") as fh:
+        text = fh.read()
+    stripped = text.strip()
+    if stripped.startswith("{") and "\n{" not in stripped:
+        data = json.loads(stripped)
+        return data.get("traceEvents", [data]) if isinstance(data, dict) else []
+    if stripped.startswith("["):
+        body = stripped[1:].rstrip().rstrip("]").rstrip().rstrip(",")
+        return json.loads(f"[{body}]")
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Per-span totals of a SKILLED_REVIEWS_TRACE file (NDJSON or Chrome format).",
+    )
+    parser.add_argument("trace")
+    parser.add_argument("--chrome", default="", help="Also write {\"traceEvents\": [...]} for chrome://tracing / Perfetto")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        events = [e for e in load_trace(args.trace) if isinstance(e, dict) and e.get("ph") == "X"]
+    except (OSError, ValueError) as exc:
+        print(f"cannot read trace {args.trace}: {exc}", file=sys.stderr)
+        return 1
+
+    rows = {}
+    for event in events:
+        key = (event.get("cat", ""), event.get("name", ""))
+        row = rows.setdefault(key, {"cat": key[0], "name": key[1], "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        dur_ms = float(event.get("dur", 0)) / 1000.0
+        row["count"] += 1
+        row["total_ms"] += dur_ms
+        row["max_ms"] = max(row["max_ms"], dur_ms)
+    summary = sorted(rows.values(), key=lambda r: -r["total_ms"])
+    for row in summary:
+        row["total_ms"] = round(row["total_ms"], 3)
+        row["max_ms"] = round(row["max_ms"], 3)
+
+    if args.chrome:
+        with open(args.chrome, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+            fh.write("\n")
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    print(f"{'category':<18} {'span':<28} {'count':>6} {'total ms':>11} {'max ms':>10}")
+    for row in summary:
+        print(f"{row['cat']:<18} {row['name']:<28} {row['count']:>6} {row['total_ms']:>11.1f} {row['max_ms']:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,115 +1,12 @@
 #!/usr/bin/env python3
 import argparse
-import ast
-import fnmatch
 import os
-import re
 import subprocess
 import sys
-from typing import List, Tuple
+from typing import List, Optional
 
-
-def normalize_repo_relpath(value: str) -> str:
-    value = value.strip()
-    while value.startswith("./"):
-        value = value[2:]
-    if value.startswith("/"):
-        value = value[1:]
-    return value
-
-
-def _strip_toml_comment(line: str) -> str:
-    in_string = False
-    escape = False
-    out = []
-    for ch in line:
-        if in_string:
-            out.append(ch)
-            if escape:
-                escape = False
-            elif ch == "\\":
-                escape = True
-            elif ch == '"':
-                in_string = False
-            continue
-
-        if ch == '"':
-            in_string = True
-            out.append(ch)
-            continue
-
-        if ch == "#":
-            break
-
-        out.append(ch)
-    return "".join(out)
-
-
-def _extract_toml_array(text: str, key: str) -> str:
-    m = re.search(rf"(?m)^[ \t]*{re.escape(key)}[ \t]*=", text)
-    if not m:
-        raise ValueError(f"Missing required key: {key}")
-    idx = m.end()
-    while idx < len(text) and text[idx] in " \t":
-        idx += 1
-    if idx >= len(text) or text[idx] != "[":
-        raise ValueError(f"{key} must be an array (expected '[' after '=')")
-
-    depth = 0
-    in_string = False
-    escape = False
-    start = idx
-    for j in range(idx, len(text)):
-        ch = text[j]
-        if in_string:
-            if escape:
-                escape = False
-            elif ch == "\\":
-                escape = True
-            elif ch == '"':
-                in_string = False
-            continue
-
-        if ch == '"':
-            in_string = True
-            continue
-
-        if ch == "[":
-            depth += 1
-        elif ch == "]":
-            depth -= 1
-            if depth == 0:
-                return text[start : j + 1]
-
-    raise ValueError(f"Unterminated array for key: {key}")
-
-
-def parse_policy(policy_path: str) -> Tuple[List[str], List[str]]:
-    with open(policy_path, "r", encoding="utf-8") as fh:
-        raw_lines = fh.readlines()
-    text = "".join(_strip_toml_comment(line) for line in raw_lines)
-
-    allow_raw = _extract_toml_array(text, "write_allow")
-    deny_raw = _extract_toml_array(text, "write_deny")
-
-    try:
-        allow = ast.literal_eval(allow_raw)
-        deny = ast.literal_eval(deny_raw)
-    except Exception as exc:
-        raise ValueError(f"Failed to parse policy arrays: {exc}") from exc
-
-    if not isinstance(allow, list) or not all(isinstance(x, str) for x in allow):
-        raise ValueError("write_allow must be an array of strings")
-    if not isinstance(deny, list) or not all(isinstance(x, str) for x in deny):
-        raise ValueError("write_deny must be an array of strings")
-
-    allow = [normalize_repo_relpath(p) for p in allow if p.strip()]
-    deny = [normalize_repo_relpath(p) for p in deny if p.strip()]
-
-    if not allow:
-        raise ValueError("write_allow must not be empty (fail-closed)")
-
-    return allow, deny
+from guardrails_policy import load_policy, normalize_repo_relpath
+from unified_diff import FilePatch, PatchParseError, iter_file_patches
 
 
 def run_git(repo_root: str, args: List[str]) -> subprocess.CompletedProcess:
@@ -122,29 +19,6 @@ def run_git(repo_root: str, args: List[str]) -> subprocess.CompletedProcess:
     )
 
 
-def parse_numstat(numstat: str) -> Tuple[List[Tuple[str, str, str]], int, int, bool]:
-    entries = []
-    lines_changed = 0
-    binary_change = False
-
-    for line in [ln for ln in numstat.splitlines() if ln.strip()]:
-        parts = line.split("\t", 2)
-        if len(parts) != 3:
-            raise ValueError(f"Unexpected --numstat line: {line!r}")
-        added_s, deleted_s, path = parts[0], parts[1], parts[2]
-        entries.append((added_s, deleted_s, path))
-        if added_s == "-" or deleted_s == "-":
-            binary_change = True
-            continue
-        try:
-            lines_changed += int(added_s) + int(deleted_s)
-        except ValueError:
-            raise ValueError(f"Non-numeric --numstat values: {line!r}")
-
-    files_changed = len(entries)
-    return entries, lines_changed, files_changed, binary_change
-
-
 def subsystem_of(path: str) -> str:
     path = normalize_repo_relpath(path)
     if "/" not in path:
@@ -152,51 +26,47 @@ def subsystem_of(path: str) -> str:
     return path.split("/", 1)[0]
 
 
-def matches_any(path: str, patterns: List[str]) -> bool:
-    path = normalize_repo_relpath(path)
-    for pat in patterns:
-        if fnmatch.fnmatchcase(path, pat):
-            return True
-    return False
-
-
-def disallowed_git_mode_in_patch(patch_text: str) -> Tuple[str, str]:
+def blocking_violation(fp: FilePatch) -> str:
     """
-    Return (path, mode) if the patch touches a disallowed git file mode.
+    Return a "Blocked: ..." message when a file patch uses a v1-disallowed operation.
 
-    Rationale: `git apply --summary` does not report mode for symlink/submodule *modifications*,
-    so we must inspect the patch text for `index ... <mode>` lines.
+    Symlinks/submodules are detected from every mode header, including the `index ... <mode>`
+    line, because `git apply --summary` does not report them for *modifications*.
     """
-    current_path = ""
-    for raw_line in patch_text.splitlines():
-        line = raw_line.strip("\n")
-        if line.startswith("diff --git "):
-            # Example: diff --git a/path b/path
-            parts = line.split()
-            if len(parts) >= 4:
-                b_path = parts[3]
-                if b_path.startswith("b/"):
-                    b_path = b_path[2:]
-                current_path = normalize_repo_relpath(b_path)
-            continue
-
-        if line.startswith("index "):
-            m = re.match(r"^index [0-9a-f]{7,40}\.\.[0-9a-f]{7,40} ([0-9]{6})$", line)
-            if not m:
-                continue
-            mode = m.group(1)
-            if mode in {"120000", "160000"}:
-                return current_path or "<unknown>", mode
-    return "", ""
-
-
-def main() -> int:
+    path = normalize_repo_relpath(fp.path) or "<unknown>"
+    modes = fp.modes()
+    if "120000" in modes:
+        return f"Blocked: symlink detected in patch (mode 120000): {path}"
+    if "160000" in modes:
+        return f"Blocked: submodule gitlink detected in patch (mode 160000): {path}"
+    if fp.binary:
+        return f"Blocked: binary change detected (v1 forbids binary patches): {path}"
+    if fp.is_rename:
+        return f"Blocked: rename detected: {fp.rename_from} => {fp.rename_to}"
+    if fp.is_copy:
+        return f"Blocked: copy detected: {fp.copy_from} => {fp.copy_to}"
+    if fp.is_deleted:
+        return f"Blocked: delete detected: delete mode {fp.deleted_file_mode} {path}"
+    if fp.is_mode_change:
+        return f"Blocked: mode change detected: mode change {fp.old_mode} => {fp.new_mode} {path}"
+    if fp.is_new and fp.new_file_mode != "100644":
+        return f"Blocked: new file mode must be 100644 (got {fp.new_file_mode})"
+    return ""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--repo-root", required=True)
     ap.add_argument("--patch", required=True)
     ap.add_argument("--policy", required=True)
     ap.add_argument("--allow-large-patch", action="store_true")
-    args = ap.parse_args()
+    ap.add_argument("--policy-cache-dir", help="Compiled-policy cache (default: <repo-root>/.skilled-reviews/.implementation/.policy-cache)")
+    ap.add_argument(
+        "--no-policy-cache",
+        action="store_true",
+        help="Always re-parse the policy (default: cache the compiled policy under .skilled-reviews/.implementation/.policy-cache)",
+    )
+    args = ap.parse_args(argv)
 
     repo_root = os.path.abspath(args.repo_root)
     patch_path = os.path.abspath(args.patch)
@@ -212,100 +82,86 @@ def main() -> int:
         print(f"policy file not found: {policy_path}", file=sys.stderr)
         return 1
 
+    cache_dir = None
+    if not args.no_policy_cache:
+        cache_dir = args.policy_cache_dir or os.path.join(repo_root, ".skilled-reviews", ".implementation", ".policy-cache")
     try:
-        allow, deny = parse_policy(policy_path)
+        policy = load_policy(policy_path, cache_dir=cache_dir)
     except Exception as exc:
         print(f"Invalid policy: {exc}", file=sys.stderr)
         return 1
 
+    # Single streaming pass: structure, v1 disallows and allow/deny (deny overrides allow),
+    # stopping at the first blocking violation.
+    lines_changed = 0
+    files_changed = 0
+    subsystems_seen = set()
+    path_limit_hits: List[str] = []
     with open(patch_path, "r", encoding="utf-8", errors="replace") as fh:
         patch_text = fh.read()
+    try:
+        for fp in iter_file_patches(patch_text):
+            blocked = blocking_violation(fp)
+            if blocked:
+                print(blocked, file=sys.stderr)
+                return 1
 
-    # Enforce v1 disallows that are not reliably visible via `git apply --summary`.
-    blocked_path, blocked_mode = disallowed_git_mode_in_patch(patch_text)
-    if blocked_mode == "120000":
-        print(f"Blocked: symlink detected in patch (mode 120000): {blocked_path}", file=sys.stderr)
-        return 1
-    if blocked_mode == "160000":
-        print(f"Blocked: submodule gitlink detected in patch (mode 160000): {blocked_path}", file=sys.stderr)
-        return 1
-
-    # Patch must be applyable (structure + context).
-    chk = run_git(repo_root, ["apply", "--check", patch_path])
-    if chk.returncode != 0:
-        print("git apply --check failed:", file=sys.stderr)
-        sys.stderr.write(chk.stderr)
-        return 1
-
-    summary = run_git(repo_root, ["apply", "--summary", patch_path])
-    if summary.returncode != 0:
-        print("git apply --summary failed:", file=sys.stderr)
-        sys.stderr.write(summary.stderr)
-        return 1
+            path = normalize_repo_relpath(fp.path)
+            if not path:
+                print("Blocked: file patch without a path", file=sys.stderr)
+                return 1
+            if path == ".gitmodules":
+                print("Blocked: .gitmodules touched (v1 forbids submodules)", file=sys.stderr)
+                return 1
+            denied_by = policy.deny_matcher.describe(path)
+            if denied_by:
+                print(f"Blocked: path is denied by policy: {path} (rule: {denied_by})", file=sys.stderr)
+                return 1
+            if policy.allow_matcher.match(path) is None:
+                print(f"Blocked: path is not allowed by policy: {path}", file=sys.stderr)
+                return 1
 
-    numstat = run_git(repo_root, ["apply", "--numstat", patch_path])
-    if numstat.returncode != 0:
-        print("git apply --numstat failed:", file=sys.stderr)
-        sys.stderr.write(numstat.stderr)
+            files_changed += 1
+            file_lines = fp.added + fp.deleted
+            lines_changed += file_lines
+            path_limit = policy.max_lines_for(path)
+            if path_limit is not None and file_lines > path_limit[1]:
+                path_limit_hits.append(f'{path}={file_lines} > path_max_lines["{path_limit[0]}"]={path_limit[1]}')
+            subsystems_seen.add(subsystem_of(path))
+    except PatchParseError as exc:
+        print(f"Invalid patch: {exc}", file=sys.stderr)
         return 1
 
-    entries, lines_changed, files_changed, binary_change = parse_numstat(numstat.stdout)
-    subsystems = sorted({subsystem_of(path) for _, _, path in entries})
-
-    # Enforce v1 disallows.
-    if "GIT binary patch" in patch_text or "Binary files" in patch_text:
-        binary_change = True
-
-    if binary_change:
-        print("Blocked: binary change detected (v1 forbids binary patches)", file=sys.stderr)
+    if files_changed == 0:
+        print("Invalid patch: no file diffs found", file=sys.stderr)
         return 1
-
-    for line in [ln for ln in summary.stdout.splitlines() if ln.strip()]:
-        s = line.lstrip()
-        if s.startswith("rename "):
-            print(f"Blocked: rename detected: {s}", file=sys.stderr)
-            return 1
-        if s.startswith("copy "):
-            print(f"Blocked: copy detected: {s}", file=sys.stderr)
-            return 1
-        if s.startswith("delete mode "):
-            print(f"Blocked: delete detected: {s}", file=sys.stderr)
-            return 1
-        if s.startswith("mode change "):
-            print(f"Blocked: mode change detected: {s}", file=sys.stderr)
-            return 1
-        if s.startswith("create mode "):
-            m = re.match(r"create mode ([0-9]{6}) ", s)
-            if not m:
-                print(f"Blocked: unexpected create mode format: {s}", file=sys.stderr)
-                return 1
-            mode = m.group(1)
-            if mode != "100644":
-                print(f"Blocked: new file mode must be 100644 (got {mode})", file=sys.stderr)
-                return 1
-
-    # Allow/deny (deny overrides allow).
-    touched_paths = [normalize_repo_relpath(path) for _, _, path in entries]
-    for path in touched_paths:
-        if path == ".gitmodules":
-            print("Blocked: .gitmodules touched (v1 forbids submodules)", file=sys.stderr)
-            return 1
-        if matches_any(path, deny):
-            print(f"Blocked: path is denied by policy: {path}", file=sys.stderr)
-            return 1
-        if not matches_any(path, allow):
-            print(f"Blocked: path is not allowed by policy: {path}", file=sys.stderr)
-            return 1
+    subsystems = sorted(subsystems_seen)
 
     # Large patch guard.
-    large = lines_changed > 600 or files_changed > 15 or len(subsystems) >= 3 or binary_change
+    large = (
+        lines_changed > policy.max_lines_changed
+        or files_changed > policy.max_files_changed
+        or len(subsystems) > policy.max_subsystems
+        or bool(path_limit_hits)
+    )
     if large and not args.allow_large_patch:
         print(
             "Blocked: patch exceeds auto-apply thresholds "
-            f"(lines_changed={lines_changed}, files_changed={files_changed}, subsystems={len(subsystems)}) "
+            f"(lines_changed={lines_changed}/{policy.max_lines_changed}, "
+            f"files_changed={files_changed}/{policy.max_files_changed}, "
+            f"subsystems={len(subsystems)}/{policy.max_subsystems}) "
             "Use ALLOW_LARGE_PATCH=1 to override.",
             file=sys.stderr,
         )
+        for hit in path_limit_hits:
+            print(f"- per-path limit: {hit}", file=sys.stderr)
+        return 1
+
+    # Final gate: the patch must apply (context) onto the current tree.
+    chk = run_git(repo_root, ["apply", "--check", patch_path])
+    if chk.returncode != 0:
+        print("git apply --check failed:", file=sys.stderr)
+        sys.stderr.write(chk.stderr)
         return 1
 
     # Echo a short summary (stderr) for traceability.
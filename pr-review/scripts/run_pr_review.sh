@@ -30,7 +30,7 @@ done
 if (( ${#positional_args[@]} < 1 || ${#positional_args[@]} > 2 )); then
   echo "Usage: $0 <scope-id> [run-id] [--dry-run]" >&2
   echo "Required env: SOT, TESTS" >&2
-  echo "Optional env: RUN_ID, CONSTRAINTS, DIFF_SUMMARY_FILE, DIFF_STAT, INTENT, RISKY, ESTIMATION, CODE_REVIEW_FILE, SCHEMA_PATH, CODEX_BIN, MODEL, REASONING_EFFORT, VALIDATE, FORMAT_JSON, EXEC_TIMEOUT_SEC" >&2
+  echo "Optional env: RUN_ID, CONSTRAINTS, DIFF_SUMMARY_FILE, DIFF_STAT, INTENT, RISKY, ESTIMATION, CODE_REVIEW_FILE, FACETS_FILE, SCHEMA_PATH, CODEX_BIN, CODEX_CASSETTE, CODEX_CASSETTE_DIR, CODEX_MAX_CONCURRENT, CODEX_RPM, CODEX_RPM_BURST, CODEX_LIMIT_DIR, MODEL, REASONING_EFFORT, VALIDATE, FORMAT_JSON, EXEC_TIMEOUT_SEC, PROGRESS, SKILLED_REVIEWS_TRACE, SKILLED_REVIEWS_TRACE_FORMAT, SKILLED_REVIEWS_PROFILE" >&2
   exit 1
 fi
 
@@ -54,8 +54,85 @@ fi
 
 start_epoch=$(date +%s)
 start_ts=$(date +"%Y-%m-%dT%H:%M:%S%z")
+run_started="${EPOCHREALTIME:-$start_epoch}"
 echo "Start: $start_ts" >&2
 
+trace_cat="pr-review"
+# Tracing: SKILLED_REVIEWS_TRACE=<file> appends one Chrome trace-event "X" span per stage
+# (NDJSON; SKILLED_REVIEWS_TRACE_FORMAT=chrome streams a JSON array instead).
+trace_file="${SKILLED_REVIEWS_TRACE:-}"
+trace_sep=""
+if [[ -n "$trace_file" ]]; then
+  case "${SKILLED_REVIEWS_TRACE_FORMAT:-ndjson}" in
+    ndjson) ;;
+    chrome)
+      trace_sep=","
+      if [[ ! -s "$trace_file" ]]; then
+        (set -C; printf '[\n' >"$trace_file") 2>/dev/null || true
+      fi
+      ;;
+    *)
+      echo "Invalid SKILLED_REVIEWS_TRACE_FORMAT: ${SKILLED_REVIEWS_TRACE_FORMAT} (expected ndjson|chrome)" >&2
+      exit 1
+      ;;
+  esac
+  if [[ "$trace_file" != /* ]]; then
+    trace_file="${PWD}/${trace_file}"
+  fi
+  export SKILLED_REVIEWS_TRACE="$trace_file" SKILLED_REVIEWS_TRACE_PID="$$"
+fi
+trace_now() {
+  # Sets variable $1 to the current time in microseconds (0 when tracing is off).
+  if [[ -z "$trace_file" ]]; then
+    printf -v "$1" '0'
+  elif [[ -n "${EPOCHREALTIME:-}" ]]; then
+    local trace_t="${EPOCHREALTIME/,/.}"
+    printf -v "$1" '%s%s' "${trace_t%.*}" "${trace_t#*.}"
+  else
+    printf -v "$1" '%s000000' "$(date +%s)"
+  fi
+}
+trace_span() {
+  # trace_span <name> <start-us> [key=value ...]
+  [[ -n "$trace_file" ]] || return 0
+  local name="$1" start="$2" end kv value args="" sep=""
+  shift 2
+  trace_now end
+  for kv in "$@"; do
+    value="${kv#*=}"
+    value="${value//\\/\\\\}"
+    value="${value//\"/\\\"}"
+    args+="${sep}\"${kv%%=*}\":\"${value}\""
+    sep=","
+  done
+  printf '{"name":"%s","cat":"%s","ph":"X","ts":%s,"dur":%s,"pid":%s,"tid":%s,"args":{%s}}%s\n' \
+    "$name" "$trace_cat" "$start" "$((end - start))" "$SKILLED_REVIEWS_TRACE_PID" "${BASHPID:-$$}" "$args" "$trace_sep" \
+    >>"$trace_file"
+}
+trace_now run_t0
+
+# Progress: each step appends one event to <run-dir>/progress.ndjson (PROGRESS=0 turns it off),
+# rendered by `skilled_reviews_cli.py watch`. Events: run-start, queued, started, retried,
+# finished, cached, done, cancelled, validated, run-end.
+progress_file=""
+progress_event() {
+  # progress_event <event> [key=value ...]; integer values are written as JSON numbers
+  [[ -n "$progress_file" ]] || return 0
+  local event="$1" kv value fields="" now="${EPOCHREALTIME:-}"
+  shift
+  [[ -n "$now" ]] || now="$(date +%s)"
+  for kv in "$@"; do
+    value="${kv#*=}"
+    if [[ ! "$value" =~ ^(0|-?[1-9][0-9]*)$ ]]; then
+      value="${value//\\/\\\\}"
+      value="\"${value//\"/\\\"}\""
+    fi
+    fields+=",\"${kv%%=*}\":${value}"
+  done
+  printf '{"ts":%s,"runner":"%s","pid":%s,"run":"%s","event":"%s"%s}\n' \
+    "${now/,/.}" "$trace_cat" "$$" "$run_id" "$event" "$fields" >>"$progress_file"
+}
+
 finish() {
   status=$?
   end_epoch=$(date +%s)
@@ -66,6 +143,14 @@ finish() {
   else
     echo "End: $end_ts (exit=${status})" >&2
   fi
+  run_ended="${EPOCHREALTIME:-$end_epoch}"
+  if [[ "$dry_run" != "1" && -d "${run_dir:-}" ]]; then
+    # Run record for the history index (`skilled_reviews_cli.py index`).
+    printf '{"runner":"pr-review","start":%s,"end":%s,"exit":%s,"diff":"%s"}\n' \
+      "${run_started/,/.}" "${run_ended/,/.}" "$status" "" >>"${run_dir}/timings.ndjson"
+  fi
+  progress_event run-end exit="$status"
+  trace_span run "$run_t0" scope="$scope_id" run="$run_id" exit="$status"
 }
 trap finish EXIT
 
@@ -88,6 +173,12 @@ else
   exit 1
 fi
 
+cli="${ensure_script%ensure_review_schemas.sh}skilled_reviews_cli.py"
+if [[ ! -f "$cli" ]]; then
+  echo "skilled_reviews_cli.py not found: $cli" >&2
+  exit 1
+fi
+
 constraints="${CONSTRAINTS:-none}"
 intent="${INTENT:-}"
 risky="${RISKY:-}"
@@ -103,7 +194,16 @@ effort="${REASONING_EFFORT:-xhigh}"
 validate="${VALIDATE:-1}"
 exec_timeout_sec="${EXEC_TIMEOUT_SEC:-}"
 
-if ! command -v "$codex_bin" >/dev/null 2>&1; then
+codex_cassette="${CODEX_CASSETTE:-}"
+case "$codex_cassette" in
+  ""|record|replay) ;;
+  *)
+    echo "Invalid CODEX_CASSETTE: $codex_cassette (expected record|replay)" >&2
+    exit 1
+    ;;
+esac
+# Replay serves recorded answers, so codex itself is not needed.
+if [[ "$codex_cassette" != "replay" ]] && ! command -v "$codex_bin" >/dev/null 2>&1; then
   echo "codex not found: $codex_bin" >&2
   exit 1
 fi
@@ -153,14 +253,31 @@ fi
 out_dir="${run_dir}/aggregate"
 out="${out_dir}/pr-review.json"
 
-facets=(
-  "correctness"
-  "edge-cases"
-  "security"
-  "performance"
-  "tests-observability"
-  "design-consistency"
-)
+# Same facet registry as review-parallel: FACETS_FILE, else the repo's facets.json, else the bundled one.
+registry_list="$(python3 "$cli" facets list --repo-root "$repo_root")"
+facets=()
+while IFS=$'\t' read -r f_slug _; do
+  [[ -n "$f_slug" ]] || continue
+  facets+=("$f_slug")
+done <<< "$registry_list"
+# review-parallel records its facet selection (FACET_SELECT); only the selected fragments must exist.
+skipped_facets=""
+selection_file="${run_dir}/facet-selection.json"
+if [[ -f "$selection_file" ]]; then
+  selected_csv="$(python3 "$cli" select-facets --read "$selection_file")"
+  selected_facets=()
+  for slug in "${facets[@]}"; do
+    case ",${selected_csv}," in
+      *",${slug},"*) selected_facets+=("$slug") ;;
+      *) skipped_facets="${skipped_facets:+${skipped_facets}, }${slug}" ;;
+    esac
+  done
+  if (( ${#selected_facets[@]} == 0 )); then
+    echo "Facet selection lists no known facets: $selection_file" >&2
+    exit 1
+  fi
+  facets=("${selected_facets[@]}")
+fi
 facets_csv="$(IFS=,; echo "${facets[*]}")"
 
 missing_facets=()
@@ -216,6 +333,7 @@ if [[ "$dry_run" == "1" ]]; then
     printf -- '- diff_summary_file: %s\n' "$diff_summary_file" >&2
   fi
   printf -- '- out: %s\n' "$out" >&2
+  printf -- '- facets: %s\n' "$facets_csv" >&2
   printf -- '- validate: %s\n' "$validate" >&2
   printf -- '- codex_bin: %s\n' "$codex_bin" >&2
   printf -- '- model: %s\n' "$model" >&2
@@ -226,7 +344,9 @@ if [[ "$dry_run" == "1" ]]; then
   exit 0
 fi
 
+trace_now t_stage
 "$ensure_script"
+trace_span schemas "$t_stage"
 
 if [[ ! -f "$schema" ]]; then
   echo "Schema not found: $schema" >&2
@@ -234,26 +354,33 @@ if [[ ! -f "$schema" ]]; then
 fi
 
 mkdir -p "$out_dir"
+# Same progress file as the review-parallel run it aggregates.
+if [[ "${PROGRESS:-1}" != "0" ]]; then
+  progress_file="${run_dir}/progress.ndjson"
+fi
+progress_event run-start scope="$scope_id"
+# SKILLED_REVIEWS_PROFILE=1: the Python stages dump cProfile stats into the run dir.
+if [[ "${SKILLED_REVIEWS_PROFILE:-}" == "1" ]]; then
+  export SKILLED_REVIEWS_PROFILE_DIR="$out_dir"
+fi
 
-if [[ "$validate" != "0" ]]; then
-  validate_script="${ensure_script%ensure_review_schemas.sh}validate_review_fragments.py"
-  if [[ ! -f "$validate_script" ]]; then
-    echo "validate_review_fragments.py not found: $validate_script" >&2
-    exit 1
-  fi
-
-  format_arg=()
-  if [[ "${FORMAT_JSON:-1}" != "0" ]]; then
-    format_arg+=(--format)
-  fi
-
-  extra_args=()
-  if [[ -f "$code_review_file" ]]; then
-    extra_args+=(--extra-file "$code_review_file" --extra-slug "overall")
-  fi
-
-  (cd "$repo_root" && python3 "$validate_script" "$scope_id" "$run_id" --facets "$facets_csv" --schema "$schema" "${extra_args[@]}" "${format_arg[@]}")
+format_arg=()
+if [[ "${FORMAT_JSON:-1}" != "0" ]]; then
+  format_arg+=(--format)
 fi
+validate_arg=()
+if [[ "$validate" == "0" ]]; then
+  validate_arg+=(--no-validate)
+fi
+
+# One interpreter: validate the facet fragments (+ code-review.json), then emit them as a JSON array.
+trace_now t_stage
+fragments="$(
+  cd "$repo_root" && python3 "$cli" prepare-aggregate "$scope_id" "$run_id" --run-dir "$run_dir" \
+    --facets "$facets_csv" --schema "$schema" --code-review "$code_review_file" \
+    ${format_arg[@]+"${format_arg[@]}"} ${validate_arg[@]+"${validate_arg[@]}"}
+)"
+trace_span prepare-aggregate "$t_stage"
 
 if [[ -z "$intent" ]]; then
   intent="- not provided"
@@ -263,50 +390,6 @@ if [[ -z "$risky" ]]; then
   risky="- none"
 fi
 
-fragments="$(
-  python3 - "$run_dir" "$facets_csv" "$code_review_file" <<'PY'
-import json
-import os
-import sys
-
-run_dir = sys.argv[1]
-slugs = [s for s in sys.argv[2].split(",") if s]
-code_review_path = sys.argv[3].strip() if len(sys.argv) > 3 else ""
-if not slugs:
-    print("No facets provided", file=sys.stderr)
-    sys.exit(1)
-
-data = []
-missing = []
-for slug in slugs:
-    path = os.path.join(run_dir, f"{slug}.json")
-    if not os.path.isfile(path):
-        missing.append(slug)
-        continue
-    with open(path, "r", encoding="utf-8") as fh:
-        data.append(json.load(fh))
-
-if missing:
-    print(f"Missing review fragments: {missing}", file=sys.stderr)
-    sys.exit(1)
-
-if code_review_path and os.path.isfile(code_review_path):
-    try:
-        with open(code_review_path, "r", encoding="utf-8") as fh:
-            extra = json.load(fh)
-    except Exception as exc:
-        print(f"Invalid code-review JSON: {exc}", file=sys.stderr)
-        sys.exit(1)
-    required = {"facet", "facet_slug", "status", "findings", "uncertainty", "questions"}
-    if not isinstance(extra, dict) or not required.issubset(extra.keys()):
-        print("code-review JSON missing required keys", file=sys.stderr)
-        sys.exit(1)
-    data.append(extra)
-
-print(json.dumps(data))
-PY
-)"
-
 cmd=(
   "$codex_bin" exec
   --sandbox read-only
@@ -319,8 +402,16 @@ cmd=(
 if [[ -n "$exec_timeout_sec" && -n "$timeout_bin" ]]; then
   cmd=("$timeout_bin" "$exec_timeout_sec" "${cmd[@]}")
 fi
+if [[ -n "${CODEX_MAX_CONCURRENT:-}${CODEX_RPM:-}" ]]; then
+  cmd=(python3 "$cli" codex-limit --tag "${scope_id}/aggregate" --metrics "${run_dir}/codex-queue.ndjson" -- "${cmd[@]}")
+fi
+if [[ -n "$codex_cassette" ]]; then
+  cmd=(python3 "$cli" codex-cassette --repo-root "$repo_root" --run-id "$run_id" -- "${cmd[@]}")
+fi
 
+progress_event queued facet=aggregate
 {
+  trace_now t_prompt
   cat <<'PROMPT'
 You are the PR-level aggregator.
 
@@ -356,6 +447,9 @@ PROMPT
   printf 'Intent:\n%s\n' "$intent"
   printf 'Risky areas:\n%s\n' "$risky"
   printf -- '- Scope-id: %s\n' "$scope_id"
+  if [[ -n "$skipped_facets" ]]; then
+    printf -- '- Facets not run (facet selection judged them low-yield for this diff): %s\n' "$skipped_facets"
+  fi
   printf -- '- SoT: %s\n' "$sot"
   if [[ -n "$estimation" ]]; then
     printf -- '- Estimation: %s\n' "$estimation"
@@ -364,57 +458,31 @@ PROMPT
   printf -- '- Constraints: %s\n' "$constraints"
   printf -- '- Review fragments: %s\n' "$fragments"
   printf 'Task: Integrate fragments into a single decision.\n'
-} | "${cmd[@]}"
-
-python3 - "$out" "$scope_id" <<'PY'
-import json
-import os
-import sys
-
-path = sys.argv[1]
-scope_id = sys.argv[2]
-
-with open(path, "r", encoding="utf-8") as fh:
-    data = json.load(fh)
-
-data["scope_id"] = scope_id
-
-key_order = [
-    "schema_version",
-    "scope_id",
-    "facet",
-    "facet_slug",
-    "status",
-    "questions",
-    "uncertainty",
-    "findings",
-    "overall_correctness",
-    "overall_explanation",
-    "overall_confidence_score",
-]
-
-ordered = {}
-for key in key_order:
-    if key in data:
-        ordered[key] = data[key]
-for key, value in data.items():
-    if key not in ordered:
-        ordered[key] = value
-
-format_json = os.environ.get("FORMAT_JSON", "1") != "0"
-
-with open(path, "w", encoding="utf-8") as fh:
-    if format_json:
-        json.dump(ordered, fh, ensure_ascii=False, indent=2)
-    else:
-        json.dump(ordered, fh, ensure_ascii=False)
-    fh.write("\n")
-PY
+  trace_span prompt "$t_prompt" facet=aggregate
+} | {
+  trace_now t_codex
+  progress_event started facet=aggregate tier=full model="$model" effort="$effort"
+  codex_rc=0
+  "${cmd[@]}" || codex_rc="$?"
+  if [[ "$codex_cassette" == "replay" && "$codex_rc" == "0" ]]; then
+    progress_event cached facet=aggregate tier=full
+  else
+    progress_event finished facet=aggregate tier=full exit="$codex_rc"
+  fi
+  progress_event done facet=aggregate exit="$codex_rc"
+  trace_span codex "$t_codex" facet=aggregate exit="$codex_rc"
+  exit "$codex_rc"
+}
 
+# One interpreter: stamp scope_id + key order, then validate (unless VALIDATE=0).
+trace_now t_stage
+(cd "$repo_root" && python3 "$cli" finalize-aggregate "$out" "$scope_id" --run-id "$run_id" --schema "$schema" \
+  ${format_arg[@]+"${format_arg[@]}"} ${validate_arg[@]+"${validate_arg[@]}"}) || {
+  finalize_rc="$?"
+  progress_event validated status=failed
+  exit "$finalize_rc"
+}
+trace_span finalize-aggregate "$t_stage"
 if [[ "$validate" != "0" ]]; then
-  format_arg=()
-  if [[ "${FORMAT_JSON:-1}" != "0" ]]; then
-    format_arg+=(--format)
-  fi
-  (cd "$repo_root" && python3 "$validate_script" "$scope_id" "$run_id" --facets "" --schema "$schema" --extra-file "$out" --extra-slug "aggregate" "${format_arg[@]}")
+  progress_event validated status=ok facets=1
 fi
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Machine-wide limiter for `codex exec` calls (CODEX_MAX_CONCURRENT / CODEX_RPM).
+
+Every runner on the machine shares one state file under CODEX_LIMIT_DIR (default
+<tmp>/skilled-reviews-codex-limit-<uid>), read and rewritten under an flock on `lock`:
+  queue    FIFO of waiting callers (ticket, pid, tag)
+  running  callers holding a concurrency slot
+  tokens   requests-per-minute bucket: refilled at CODEX_RPM/60 per second up to
+           CODEX_RPM_BURST (default CODEX_RPM); each started call takes one token
+A caller starts only at the head of the queue, with a free slot and a token, so waiters are
+served in arrival order. Entries of dead processes are dropped on every pass: a killed
+runner never leaks a slot. No daemon or external service is involved.
+
+Usage (the runners wrap `[timeout N] codex exec ...` when a limit is set):
+  codex_limiter.py [--tag T] [--metrics FILE] -- <command...>   run the command under the limits
+  codex_limiter.py --status                                     print the shared state as JSON
+"""
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Iterator, List, Optional
+
+STATE_FILE = "state.json"
+LOCK_FILE = "lock"
+POLL_SEC = 0.2
+# Queue waits shorter than this are not reported on stderr.
+REPORT_WAIT_SEC = 1.0
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def default_dir() -> str:
+    return os.environ.get("CODEX_LIMIT_DIR") or os.path.join(
+        tempfile.gettempdir(), f"skilled-reviews-codex-limit-{os.getuid()}"
+    )
+
+
+def _env_number(name: str, cast=int):
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return cast(0)
+    try:
+        value = cast(raw)
+    except ValueError:
+        raise SystemExit(f"invalid {name}: {raw!r} (expected a non-negative number)") from None
+    if value < 0:
+        raise SystemExit(f"invalid {name}: {raw!r} (expected a non-negative number)")
+    return value
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Limiter:
+    def __init__(self, directory: str, max_concurrent: int, rpm: float, burst: float) -> None:
+        self.directory = directory
+        self.max_concurrent = max_concurrent
+        self.rpm = rpm
+        self.burst = burst or rpm
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    @contextlib.contextmanager
+    def state(self) -> Iterator[dict]:
+        """The shared state, locked for the duration of the block and saved afterwards."""
+        fd = os.open(os.path.join(self.directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            path = os.path.join(self.directory, STATE_FILE)
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    st = json.load(fh)
+                if not isinstance(st, dict):
+                    raise ValueError("state is not an object")
+            except (OSError, ValueError):
+                st = {}
+            st.setdefault("next_ticket", 1)
+            st.setdefault("queue", [])
+            st.setdefault("running", [])
+            st.setdefault("tokens", self.burst)
+            st.setdefault("refilled", time.time())
+            yield st
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(st, fh)
+            os.replace(tmp, path)
+        finally:
+            os.close(fd)
+
+    def _refresh(self, st: dict, now: float) -> None:
+        st["queue"] = [e for e in st["queue"] if _alive(int(e.get("pid", 0)))]
+        st["running"] = [e for e in st["running"] if _alive(int(e.get("pid", 0)))]
+        if self.rpm > 0:
+            elapsed = max(0.0, now - float(st["refilled"]))
+            st["tokens"] = min(self.burst, float(st["tokens"]) + elapsed * self.rpm / 60.0)
+        st["refilled"] = now
+
+    def acquire(self, tag: str) -> int:
+        """Wait for this caller's turn; returns its ticket (to pass to release)."""
+        entry = {"pid": os.getpid(), "tag": tag, "since": round(time.time(), 3)}
+        with self.state() as st:
+            entry["ticket"] = st["next_ticket"]
+            st["next_ticket"] += 1
+            st["queue"].append(entry)
+        while True:
+            with self.state() as st:
+                self._refresh(st, time.time())
+                tickets = [e.get("ticket") for e in st["queue"]]
+                if entry["ticket"] not in tickets:
+                    # The state file was reset under us: queue again.
+                    st["queue"].append(entry)
+                    tickets.append(entry["ticket"])
+                slot_free = self.max_concurrent <= 0 or len(st["running"]) < self.max_concurrent
+                token_free = self.rpm <= 0 or float(st["tokens"]) >= 1.0
+                if tickets[0] == entry["ticket"] and slot_free and token_free:
+                    st["queue"].pop(0)
+                    st["running"].append(entry)
+                    if self.rpm > 0:
+                        st["tokens"] = float(st["tokens"]) - 1.0
+                    return entry["ticket"]
+                wait = POLL_SEC
+                if tickets[0] == entry["ticket"] and slot_free and not token_free:
+                    wait = max(POLL_SEC, (1.0 - float(st["tokens"])) * 60.0 / self.rpm)
+            time.sleep(min(wait, 5.0))
+
+    def release(self, ticket: int) -> None:
+        with self.state() as st:
+            st["running"] = [e for e in st["running"] if e.get("ticket") != ticket]
+
+
+def run_limited(limiter: Limiter, command: List[str], tag: str, metrics: str) -> int:
+    child: Optional[subprocess.Popen] = None
+
+    def on_signal(signum, _frame):
+        # Pass the signal on to the running call; a waiting caller just leaves the queue.
+        if child is not None and child.poll() is None:
+            child.send_signal(signum)
+            return
+        raise SystemExit(128 + signum)
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, on_signal)
+
+    start = time.monotonic()
+    ticket = None
+    rc = 1
+    try:
+        ticket = limiter.acquire(tag)
+        queued = time.monotonic() - start
+        if queued >= REPORT_WAIT_SEC:
+            eprint(f"codex-limit: {tag or 'codex'} waited {queued:.1f}s in the queue")
+        started = time.monotonic()
+        try:
+            child = subprocess.Popen(command)
+        except OSError as exc:
+            eprint(f"codex-limit: cannot run {command[0]}: {exc}")
+            return 127
+        while True:
+            try:
+                rc = child.wait()
+                break
+            except InterruptedError:
+                continue
+        rc = 128 - rc if rc < 0 else rc
+        if metrics:
+            record = {"tag": tag, "queued_sec": round(queued, 3), "run_sec": round(time.monotonic() - started, 3),
+                      "exit": rc, "ts": round(time.time(), 3)}
+            with open(metrics, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return rc
+    finally:
+        if ticket is not None:
+            limiter.release(ticket)
+        else:
+            # Interrupted while queued: leave the queue now rather than on the next prune.
+            with limiter.state() as st:
+                st["queue"] = [e for e in st["queue"] if e.get("pid") != os.getpid()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a codex exec call under the machine-wide limits.")
+    parser.add_argument("--dir", default="", help="Shared state dir (default: CODEX_LIMIT_DIR or <tmp>/skilled-reviews-codex-limit-<uid>)")
+    parser.add_argument("--tag", default="", help="Label for the queue and metrics (e.g. the facet)")
+    parser.add_argument("--metrics", default="", help="Append {tag, queued_sec, run_sec, exit} to this NDJSON file")
+    parser.add_argument("--status", action="store_true", help="Print the shared state (queue, running, tokens) and exit")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+
+    limiter = Limiter(
+        args.dir or default_dir(),
+        _env_number("CODEX_MAX_CONCURRENT"),
+        _env_number("CODEX_RPM", float),
+        _env_number("CODEX_RPM_BURST", float),
+    )
+    if args.status:
+        with limiter.state() as st:
+            limiter._refresh(st, time.time())
+            print(json.dumps(st, indent=2))
+        return 0
+    if not command:
+        eprint("codex-limit: expected a command after --")
+        return 2
+    return run_limited(limiter, command, args.tag, args.metrics)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Facet registry (facets.json) for review-parallel / pr-review, and per-facet diff slicing.
+
+Registry lookup: --registry, else FACETS_FILE, else .skilled-reviews/.reviews/facets.json
+when present, else the facets.json shipped next to this script.
+
+Facet entry:
+  slug, name       required; slug matches [A-Za-z0-9._-]+
+  classes          diff classes (docs / tests / config / code) the facet is relevant to when
+                   FACET_SELECT=auto has no history (default: all)
+  slice            optional relevance filter; without it the facet gets the full diff:
+    paths          fnmatch globs ("**/" also matches at the root); a file matching one is kept
+    patterns       regexes; a file with a changed line matching one is kept
+    exclude_paths  globs that drop a file even if it matched
+                   (only exclude_paths given = every other file is kept)
+  timeout_sec      per-facet EXEC_TIMEOUT_SEC
+  model, effort    per-facet MODEL / REASONING_EFFORT
+
+Commands:
+  list   one line per facet: slug, name, timeout, model, effort (tab-separated, "-" = unset)
+  slice  write <out-dir>/<slug>.diff and <slug>.omitted.txt for facets whose slice drops files
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from scan_hard_triggers import _scoped, glob_to_regex
+from unified_diff import strip_prefix
+
+REGISTRY_NAME = "facets.json"
+REPO_REGISTRY = os.path.join(".skilled-reviews", ".reviews", REGISTRY_NAME)
+DIFF_CLASSES = ("docs", "tests", "config", "code")
+SLUG_RE = re.compile(r"^[A-Za-z0-9._-]+$")
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def registry_path(explicit: str = "", repo_root: str = ".") -> str:
+    if explicit:
+        return explicit
+    if os.environ.get("FACETS_FILE"):
+        return os.environ["FACETS_FILE"]
+    repo_file = os.path.join(repo_root, REPO_REGISTRY)
+    if os.path.isfile(repo_file):
+        return repo_file
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), REGISTRY_NAME)
+
+
+def _str_list(obj: dict, key: str, where: str) -> List[str]:
+    value = obj.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(x, str) and x for x in value):
+        raise ValueError(f"{where}.{key} must be an array of non-empty strings")
+    return list(value)
+
+
+def _validate_facet(obj: object, where: str) -> dict:
+    if not isinstance(obj, dict):
+        raise ValueError(f"{where} must be an object")
+    slug = obj.get("slug")
+    name = obj.get("name")
+    if not isinstance(slug, str) or not SLUG_RE.match(slug) or slug in {".", ".."}:
+        raise ValueError(f"{where}.slug must match [A-Za-z0-9._-]+")
+    if slug in {"overall", "aggregate"}:
+        raise ValueError(f"{where}.slug '{slug}' is reserved")
+    if not isinstance(name, str) or not name.strip() or "\t" in name or "\n" in name:
+        raise ValueError(f"{where}.name must be a non-empty single-line string")
+    classes = _str_list(obj, "classes", where) if "classes" in obj else list(DIFF_CLASSES)
+    unknown = [c for c in classes if c not in DIFF_CLASSES]
+    if unknown:
+        raise ValueError(f"{where}.classes: unknown class(es) {unknown} (use {', '.join(DIFF_CLASSES)})")
+    facet = {"slug": slug, "name": name.strip(), "classes": classes, "slice": None,
+             "timeout_sec": None, "model": None, "effort": None}
+    if obj.get("slice") is not None:
+        raw = obj["slice"]
+        if not isinstance(raw, dict):
+            raise ValueError(f"{where}.slice must be an object")
+        spec = {key: _str_list(raw, key, f"{where}.slice") for key in ("paths", "patterns", "exclude_paths")}
+        for pat in spec["patterns"]:
+            try:
+                re.compile(pat)
+            except re.error as exc:
+                raise ValueError(f"{where}.slice.patterns: invalid regex {pat!r}: {exc}") from exc
+        if any(spec.values()):
+            facet["slice"] = spec
+    timeout = obj.get("timeout_sec")
+    if timeout is not None:
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError(f"{where}.timeout_sec must be a positive number")
+        facet["timeout_sec"] = timeout
+    for key in ("model", "effort"):
+        value = obj.get(key)
+        if value is not None:
+            if not isinstance(value, str) or not re.match(r"^[A-Za-z0-9._:/-]+$", value):
+                raise ValueError(f"{where}.{key} must match [A-Za-z0-9._:/-]+")
+            facet[key] = value
+    return facet
+
+
+def load_registry(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as fh:
+        doc = json.load(fh)
+    if not isinstance(doc, dict) or not isinstance(doc.get("facets"), list) or not doc["facets"]:
+        raise ValueError("registry root must be an object with a non-empty facets array")
+    facets = [_validate_facet(f, f"facets[{i}]") for i, f in enumerate(doc["facets"])]
+    seen = set()
+    for facet in facets:
+        if facet["slug"] in seen:
+            raise ValueError(f"duplicate facet slug: {facet['slug']}")
+        seen.add(facet["slug"])
+    return facets
+
+
+class DiffFile:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lines: List[str] = []
+        self.changed: List[str] = []
+        self.added = 0
+        self.removed = 0
+
+
+def split_diff(lines: Iterable[str]) -> Tuple[List[str], List[DiffFile]]:
+    """(preamble lines, per-file blocks) of a git unified diff; blocks start at `diff --git`."""
+    preamble: List[str] = []
+    files: List[DiffFile] = []
+    current: Optional[DiffFile] = None
+    in_header = False
+    for raw in lines:
+        if raw.startswith("diff --git "):
+            parts = raw.rstrip("\n").split(" ")
+            current = DiffFile(strip_prefix(parts[3]) if len(parts) == 4 else "")
+            files.append(current)
+            in_header = True
+        if current is None:
+            preamble.append(raw)
+            continue
+        current.lines.append(raw)
+        if in_header:
+            # "+++ "/"--- " are file headers only before the first hunk.
+            if raw.startswith("@@"):
+                in_header = False
+            elif raw.startswith("+++ "):
+                path = strip_prefix(raw[4:].rstrip("\n").split("\t", 1)[0])
+                if path and path != "/dev/null":
+                    current.path = path
+            elif raw.startswith("rename to "):
+                current.path = raw.rstrip("\n").split(" ", 2)[2]
+        elif raw.startswith("+"):
+            current.added += 1
+            current.changed.append(raw[1:])
+        elif raw.startswith("-"):
+            current.removed += 1
+            current.changed.append(raw[1:])
+    return preamble, files
+
+
+class Slicer:
+    def __init__(self, spec: dict) -> None:
+        def globs(key: str) -> Optional["re.Pattern[str]"]:
+            pats = spec.get(key) or []
+            return re.compile("|".join(f"(?:{glob_to_regex(p)})" for p in pats)) if pats else None
+
+        self.paths = globs("paths")
+        self.exclude = globs("exclude_paths")
+        pats = spec.get("patterns") or []
+        self.content = re.compile("|".join(_scoped(p) for p in pats)) if pats else None
+        self.keep_rest = self.paths is None and self.content is None
+
+    def relevant(self, f: DiffFile) -> bool:
+        if self.exclude is not None and self.exclude.match(f.path):
+            return False
+        if self.keep_rest:
+            return True
+        if self.paths is not None and self.paths.match(f.path):
+            return True
+        if self.content is not None:
+            return any(self.content.search(line) for line in f.changed)
+        return False
+
+
+def manifest(omitted: List[DiffFile], kept: int, total: int) -> str:
+    out = [f"Omitted from this facet's diff (not relevant per facets.json): {len(omitted)} of {total} file(s); "
+           f"{kept} file(s) included."]
+    for f in omitted:
+        out.append(f"- {f.path} (+{f.added}/-{f.removed})")
+    return "\n".join(out) + "\n"
+
+
+def _registry(args) -> List[dict]:
+    path = registry_path(args.registry, args.repo_root)
+    try:
+        return load_registry(path)
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"invalid facet registry {path}: {exc}") from None
+
+
+def cmd_list(args) -> int:
+    for facet in _registry(args):
+        timeout = facet["timeout_sec"]
+        fields = [facet["slug"], facet["name"], "-" if timeout is None else str(int(timeout) if float(timeout).is_integer() else timeout),
+                  facet["model"] or "-", facet["effort"] or "-"]
+        print("\t".join(fields))
+    return 0
+
+
+def cmd_slice(args) -> int:
+    facets = _registry(args)
+    wanted = [s.strip() for s in args.facets.split(",") if s.strip()] if args.facets else [f["slug"] for f in facets]
+    by_slug: Dict[str, dict] = {f["slug"]: f for f in facets}
+    unknown = [s for s in wanted if s not in by_slug]
+    if unknown:
+        eprint(f"unknown facet(s): {','.join(unknown)}")
+        return 1
+    with open(args.diff_file, "r", encoding="utf-8", errors="surrogateescape") as fh:
+        preamble, files = split_diff(fh)
+    os.makedirs(args.out_dir, exist_ok=True)
+    summary = []
+    for slug in wanted:
+        for suffix in (".diff", ".omitted.txt"):
+            try:
+                os.remove(os.path.join(args.out_dir, slug + suffix))
+            except OSError:
+                pass
+        spec = by_slug[slug]["slice"]
+        if spec is None or not files:
+            continue
+        slicer = Slicer(spec)
+        kept = [f for f in files if slicer.relevant(f)]
+        # Nothing relevant: the facet still reviews the whole diff rather than an empty one.
+        if not kept or len(kept) == len(files):
+            summary.append(f"{slug}={len(files)}/{len(files)}")
+            continue
+        omitted = [f for f in files if f not in kept]
+        with open(os.path.join(args.out_dir, f"{slug}.diff"), "w", encoding="utf-8", errors="surrogateescape") as fh:
+            fh.writelines(preamble)
+            for f in kept:
+                fh.writelines(f.lines)
+        with open(os.path.join(args.out_dir, f"{slug}.omitted.txt"), "w", encoding="utf-8") as fh:
+            fh.write(manifest(omitted, len(kept), len(files)))
+        summary.append(f"{slug}={len(kept)}/{len(files)}")
+    if summary:
+        eprint(f"Diff slices (files kept): {', '.join(summary)}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--registry", default="", help="facets.json (default: FACETS_FILE, repo override, bundled)")
+    common.add_argument("--repo-root", default=".", help="Repository root for the repo override (default: cwd)")
+    parser = argparse.ArgumentParser(description="Facet registry and per-facet diff slicing.")
+    sub = parser.add_subparsers(dest="what", required=True)
+    sub.add_parser("list", parents=[common], help="Print the registry (slug, name, timeout, model, effort)")
+    p = sub.add_parser("slice", parents=[common], help="Write per-facet diff slices + omitted-file manifests")
+    p.add_argument("diff_file")
+    p.add_argument("--out-dir", required=True)
+    p.add_argument("--facets", default="", help="Only these slugs (comma-separated; default: all)")
+    args = parser.parse_args(argv)
+    if args.what == "list":
+        return cmd_list(args)
+    return cmd_slice(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
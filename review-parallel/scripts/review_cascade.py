@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Effort cascade for review-parallel (CASCADE=1): decide whether a cheap first-pass fragment can
+stand, and record which tier produced each fragment.
+
+A first-pass fragment is accepted only when codex exited 0, the fragment passes the review-v2
+validator, its status is Approved / Approved with nits and overall_confidence_score reaches
+--min-confidence. Anything else escalates the facet to the full MODEL / REASONING_EFFORT, so
+Blocked and Question always come from (or are confirmed by) the full configuration.
+
+Commands:
+  check    decide one facet's tier and append a record to <run-dir>/cascade.ndjson
+           (exit 0: accept, exit 1: escalate; the reason is printed)
+  summary  print the per-facet tiers of a run (one line; --json for the records)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from validate_review_fragments import validate_fragment
+
+CASCADE_LOG = "cascade.ndjson"
+ACCEPT_STATUSES = {"Approved", "Approved with nits"}
+DEFAULT_MIN_CONFIDENCE = 0.7
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def judge(path: str, slug: str, codex_exit: int, min_confidence: float) -> Tuple[Optional[str], dict]:
+    """(escalation reason or None, fragment facts) for a first-pass fragment."""
+    facts: dict = {"status": None, "confidence": None}
+    if codex_exit != 0:
+        return f"codex exit {codex_exit}", facts
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except OSError:
+        return "no output", facts
+    except ValueError as exc:
+        return f"invalid JSON: {exc}", facts
+    errors = validate_fragment(data, slug)
+    if isinstance(data, dict):
+        facts["status"] = data.get("status")
+        facts["confidence"] = data.get("overall_confidence_score")
+    if errors:
+        return f"invalid: {errors[0]}", facts
+    if facts["status"] not in ACCEPT_STATUSES:
+        return f"status {facts['status']}", facts
+    confidence = float(facts["confidence"])
+    if confidence < min_confidence:
+        return f"confidence {confidence:g} < {min_confidence:g}", facts
+    return None, facts
+
+
+def append_record(run_dir: str, record: dict) -> None:
+    # One short line per write: concurrent facets append to the same file.
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    fd = os.open(os.path.join(run_dir, CASCADE_LOG), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def load_records(run_dir: str) -> List[dict]:
+    records: List[dict] = []
+    try:
+        with open(os.path.join(run_dir, CASCADE_LOG), "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and rec.get("facet"):
+                    records.append(rec)
+    except OSError:
+        pass
+    return records
+
+
+def cmd_check(args) -> int:
+    reason, facts = judge(args.fragment, args.slug, args.codex_exit, args.min_confidence)
+    record = {
+        "facet": args.slug,
+        "tier": args.tier,
+        "model": args.model,
+        "effort": args.effort,
+        "status": facts["status"],
+        "confidence": facts["confidence"],
+        "exit": args.codex_exit,
+        "ts": round(time.time(), 3),
+    }
+    if args.tier == "first":
+        record["accepted"] = reason is None
+        if reason:
+            record["reason"] = reason
+    if args.run_dir:
+        append_record(args.run_dir, record)
+    if args.tier == "first" and reason:
+        print(reason)
+        return 1
+    return 0
+
+
+def cmd_summary(args) -> int:
+    # The last record per facet and tier wins (a reused run-id appends again).
+    final = {}
+    first = {}
+    for rec in load_records(args.run_dir):
+        if rec.get("tier") == "first":
+            first[rec["facet"]] = rec
+        final[rec["facet"]] = rec
+    if args.json:
+        print(json.dumps(list(final.values()), indent=2))
+        return 0
+    if not final:
+        eprint(f"no cascade records in {args.run_dir}")
+        return 1
+    parts = []
+    for facet, rec in final.items():
+        reason = first.get(facet, {}).get("reason")
+        parts.append(f"{facet}={rec.get('tier')}" + (f" ({reason})" if rec.get("tier") == "full" and reason else ""))
+    accepted = sum(1 for rec in final.values() if rec.get("tier") == "first")
+    print(f"Cascade: {accepted}/{len(final)} facet(s) kept the first pass; " + ", ".join(parts))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Effort cascade decisions for review-parallel (CASCADE=1).")
+    sub = parser.add_subparsers(dest="what", required=True)
+    p = sub.add_parser("check", help="Accept or escalate a fragment and record its tier")
+    p.add_argument("fragment", help="Fragment JSON written by this tier")
+    p.add_argument("--slug", required=True, help="Expected facet_slug")
+    p.add_argument("--tier", choices=("first", "full"), default="first",
+                   help="first: decide and record; full: record only (default: first)")
+    p.add_argument("--codex-exit", type=int, default=0, help="Exit code of the codex call for this tier")
+    p.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE,
+                   help=f"Escalate below this overall_confidence_score (default: {DEFAULT_MIN_CONFIDENCE})")
+    p.add_argument("--model", default="", help="Model of this tier (recorded)")
+    p.add_argument("--effort", default="", help="Reasoning effort of this tier (recorded)")
+    p.add_argument("--run-dir", default="", help=f"Append the record to <run-dir>/{CASCADE_LOG}")
+    p = sub.add_parser("summary", help="Print which tier produced each fragment of a run")
+    p.add_argument("run_dir")
+    p.add_argument("--json", action="store_true", help="Print the final record per facet as JSON")
+    args = parser.parse_args(argv)
+    if args.what == "check":
+        return cmd_check(args)
+    return cmd_summary(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Request hedging for review-parallel (HEDGE=1).
+
+Every facet call appends {"facet", "tier", "start", "end", "exit", "hedged"} to
+<run-dir>/facet-timings.ndjson. `delays` turns the successful calls of recent runs into a
+per-facet, per-tier hedge delay (the p90 latency, rounded up to whole seconds), written as
+<out-dir>/<slug>.<tier>.delay. A facet still running after its delay gets one duplicate
+`codex exec` (bounded by HEDGE_MAX per run); the first valid fragment wins.
+
+Commands:
+  delays  compute hedge delays from the history of past runs
+  valid   exit 0 when a fragment is valid JSON that passes the review-v2 validator
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from validate_review_fragments import validate_fragment
+
+TIMINGS_FILE = "facet-timings.ndjson"
+DEFAULT_HISTORY_RUNS = 100
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_PERCENTILE = 90.0
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def recent_runs(root: str, limit: int, exclude: str = "") -> List[str]:
+    """The newest `limit` run dirs (by facet-timings mtime) under <root>/<scope>/<run>."""
+    runs: List[Tuple[float, str]] = []
+    exclude = os.path.realpath(exclude) if exclude else ""
+    try:
+        scopes = [e.path for e in os.scandir(root) if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
+    for scope in scopes:
+        try:
+            entries = [e for e in os.scandir(scope) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                mtime = os.stat(os.path.join(entry.path, TIMINGS_FILE)).st_mtime
+            except OSError:
+                continue
+            if exclude and os.path.realpath(entry.path) == exclude:
+                continue
+            runs.append((mtime, entry.path))
+    runs.sort(reverse=True)
+    return [path for _mtime, path in runs[:limit]]
+
+
+def load_latencies(run_dirs: List[str]) -> Dict[Tuple[str, str], List[float]]:
+    """{(facet, tier): [seconds]} of the calls that exited 0."""
+    out: Dict[Tuple[str, str], List[float]] = {}
+    for run_dir in run_dirs:
+        try:
+            with open(os.path.join(run_dir, TIMINGS_FILE), "r", encoding="utf-8") as fh:
+                lines = fh.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                rec = json.loads(line)
+                facet, tier = str(rec["facet"]), str(rec.get("tier") or "full")
+                sec = float(rec["end"]) - float(rec["start"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if rec.get("exit") != 0 or sec < 0:
+                continue
+            out.setdefault((facet, tier), []).append(sec)
+    return out
+
+
+def cmd_delays(args) -> int:
+    runs = recent_runs(args.root, args.history_runs, args.exclude_run)
+    latencies = load_latencies(runs)
+    os.makedirs(args.out_dir, exist_ok=True)
+    summary = []
+    for (facet, tier), values in sorted(latencies.items()):
+        if len(values) < args.min_samples:
+            continue
+        delay = max(args.floor_sec, math.ceil(percentile(values, args.percentile)))
+        with open(os.path.join(args.out_dir, f"{facet}.{tier}.delay"), "w", encoding="utf-8") as fh:
+            fh.write(f"{delay}\n")
+        summary.append(f"{facet}/{tier}={delay}s")
+    if summary:
+        eprint(f"Hedge delays (p{args.percentile:g} of {len(runs)} past run(s)): {', '.join(summary)}")
+    else:
+        eprint(f"Hedge delays: no facet has {args.min_samples} timed call(s) yet in {len(runs)} past run(s)")
+    return 0
+
+
+def cmd_valid(args) -> int:
+    try:
+        with open(args.fragment, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError) as exc:
+        print(f"unreadable: {exc}")
+        return 1
+    errors = validate_fragment(data, args.slug)
+    if errors:
+        print(errors[0])
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Request hedging helpers for review-parallel (HEDGE=1).")
+    sub = parser.add_subparsers(dest="what", required=True)
+    p = sub.add_parser("delays", help="Write <slug>.<tier>.delay files from past facet latencies")
+    p.add_argument("--root", required=True, help="Past review runs (<root>/<scope-id>/<run-id>)")
+    p.add_argument("--out-dir", required=True)
+    p.add_argument("--exclude-run", default="", help="Run dir to leave out (the current one)")
+    p.add_argument("--history-runs", type=int, default=DEFAULT_HISTORY_RUNS,
+                   help=f"Newest runs to read (default: {DEFAULT_HISTORY_RUNS})")
+    p.add_argument("--min-samples", type=int, default=DEFAULT_MIN_SAMPLES,
+                   help=f"Calls needed before a facet is hedged (default: {DEFAULT_MIN_SAMPLES})")
+    p.add_argument("--percentile", type=float, default=DEFAULT_PERCENTILE,
+                   help=f"Latency percentile used as the delay (default: {DEFAULT_PERCENTILE:g})")
+    p.add_argument("--floor-sec", type=int, default=1, help="Minimum delay in seconds (default: 1)")
+    p = sub.add_parser("valid", help="Check that a fragment is valid (exit 0) or not (exit 1)")
+    p.add_argument("fragment")
+    p.add_argument("--slug", required=True, help="Expected facet_slug")
+    args = parser.parse_args(argv)
+    if args.what == "delays":
+        return cmd_delays(args)
+    return cmd_valid(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+Incremental SQLite index of review, implementation and cycle run directories.
+
+  index  walk .skilled-reviews and (re)ingest run dirs whose file signature changed;
+         runs whose directory is gone are dropped
+  query  canned history queries (findings, runs, stats) or read-only SQL
+
+The database (default .skilled-reviews/.index/runs.sqlite3) is a cache: deleting it only
+costs one full re-index.
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB = ".skilled-reviews/.index/runs.sqlite3"
+# kind -> run root (<root>/<scope-id>/<run-id>/)
+RUN_ROOTS = [
+    ("review", ".skilled-reviews/.reviews/reviewed_scopes"),
+    ("implementation", ".skilled-reviews/.implementation/impl-runs"),
+    ("cycle", ".skilled-reviews/.implementation/cycle-runs"),
+]
+# Sub-directories whose files take part in a run's signature / ingest.
+SIGNATURE_SUBDIRS = ("aggregate",)
+# Review-dir JSON files that are not review-v2 fragments.
+NON_FRAGMENT_JSON = {"hard-triggers.json"}
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS runs (
+  id INTEGER PRIMARY KEY,
+  kind TEXT NOT NULL,
+  scope_id TEXT NOT NULL,
+  run_id TEXT NOT NULL,
+  path TEXT NOT NULL UNIQUE,
+  signature TEXT NOT NULL,
+  status TEXT,
+  exit_code INTEGER,
+  started_at REAL,
+  ended_at REAL,
+  duration_s REAL,
+  diff_fingerprint TEXT,
+  indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_kind_time ON runs(kind, started_at);
+CREATE INDEX IF NOT EXISTS runs_scope ON runs(scope_id, run_id);
+CREATE INDEX IF NOT EXISTS runs_diff ON runs(diff_fingerprint);
+CREATE TABLE IF NOT EXISTS fragments (
+  id INTEGER PRIMARY KEY,
+  run INTEGER NOT NULL,
+  facet_slug TEXT NOT NULL,
+  facet TEXT,
+  status TEXT,
+  overall_correctness TEXT,
+  overall_confidence REAL,
+  findings INTEGER NOT NULL,
+  questions INTEGER NOT NULL,
+  file TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fragments_run ON fragments(run);
+CREATE INDEX IF NOT EXISTS fragments_facet ON fragments(facet_slug, status);
+CREATE TABLE IF NOT EXISTS findings (
+  id INTEGER PRIMARY KEY,
+  run INTEGER NOT NULL,
+  fragment INTEGER NOT NULL,
+  facet_slug TEXT NOT NULL,
+  priority INTEGER,
+  confidence REAL,
+  title TEXT,
+  path TEXT,
+  line_start INTEGER,
+  line_end INTEGER
+);
+CREATE INDEX IF NOT EXISTS findings_run ON findings(run);
+CREATE INDEX IF NOT EXISTS findings_facet ON findings(facet_slug, priority);
+CREATE INDEX IF NOT EXISTS findings_path ON findings(path);
+"""
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Same fingerprint as `git hash-object` (what the runners record for their diff)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def connect(db_path: str, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, timeout=30)
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30)
+        # WAL: queries keep working while an indexer (or a concurrent run) writes.
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SCHEMA)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None:
+            conn.execute("INSERT INTO meta(key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            conn.commit()
+        elif row[0] != str(SCHEMA_VERSION):
+            raise SystemExit(f"index schema v{row[0]} != v{SCHEMA_VERSION}; delete {db_path} and re-index")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def run_files(run_dir: str) -> List[Tuple[str, os.stat_result]]:
+    """(relative name, stat) of the files that make up a run: top level + SIGNATURE_SUBDIRS."""
+    out: List[Tuple[str, os.stat_result]] = []
+    for prefix, path in [("", run_dir)] + [(f"{d}/", os.path.join(run_dir, d)) for d in SIGNATURE_SUBDIRS]:
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                out.append((prefix + entry.name, entry.stat(follow_symlinks=False)))
+    out.sort(key=lambda item: item[0])
+    return out
+
+
+def signature(files: List[Tuple[str, os.stat_result]]) -> str:
+    h = hashlib.sha1()
+    for name, st in files:
+        h.update(f"{name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_json(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def load_timings(path: str) -> List[dict]:
+    """timings.ndjson records written by the runners on exit (missing/garbled lines skipped)."""
+    records: List[dict] = []
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict):
+                    records.append(rec)
+    except OSError:
+        pass
+    return records
+
+
+def as_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def as_int(value) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RunRecord:
+    def __init__(self, kind: str, scope_id: str, run_id: str, path: str, sig: str) -> None:
+        self.kind = kind
+        self.scope_id = scope_id
+        self.run_id = run_id
+        self.path = path
+        self.signature = sig
+        self.status: Optional[str] = None
+        self.exit_code: Optional[int] = None
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self.diff_fingerprint: Optional[str] = None
+        # (file, fragment dict)
+        self.fragments: List[Tuple[str, dict]] = []
+
+    def apply_timings(self, records: List[dict], files: List[Tuple[str, os.stat_result]]) -> None:
+        starts = [v for v in (as_float(r.get("start")) for r in records) if v is not None]
+        ends = [v for v in (as_float(r.get("end")) for r in records) if v is not None]
+        if starts and ends:
+            self.started_at, self.ended_at = min(starts), max(ends)
+        elif files:
+            # Older runs without timings.ndjson: bracket the run by its files' mtimes.
+            mtimes = [st.st_mtime for _name, st in files]
+            self.started_at, self.ended_at = min(mtimes), max(mtimes)
+        for rec in records:
+            if rec.get("diff") and not self.diff_fingerprint:
+                self.diff_fingerprint = str(rec["diff"])
+        if records:
+            self.exit_code = as_int(records[-1].get("exit"))
+
+
+def read_review_run(rec: RunRecord, run_dir: str, files: List[Tuple[str, os.stat_result]]) -> None:
+    by_slug: Dict[str, str] = {}
+    for name, _st in files:
+        if not name.endswith(".json") or os.path.basename(name) in NON_FRAGMENT_JSON:
+            continue
+        data = load_json(os.path.join(run_dir, name))
+        if not isinstance(data, dict) or not isinstance(data.get("findings"), list):
+            continue
+        slug = str(data.get("facet_slug") or os.path.splitext(os.path.basename(name))[0])
+        rec.fragments.append((name, data))
+        by_slug[slug] = str(data.get("status") or "")
+    # The most complete decision available: aggregate > code-review (overall).
+    rec.status = by_slug.get("aggregate") or by_slug.get("overall") or ("partial" if by_slug else None)
+    rec.apply_timings(load_timings(os.path.join(run_dir, "timings.ndjson")), files)
+
+
+def read_implementation_run(rec: RunRecord, run_dir: str, files: List[Tuple[str, os.stat_result]]) -> None:
+    rec.apply_timings(load_timings(os.path.join(run_dir, "timings.ndjson")), files)
+    try:
+        with open(os.path.join(run_dir, "patch.diff"), "rb") as fh:
+            rec.diff_fingerprint = git_blob_sha(fh.read())
+    except OSError:
+        pass
+    if rec.exit_code is None:
+        rec.status = "patch" if rec.diff_fingerprint else None
+    else:
+        rec.status = {0: "ok", 2: "question"}.get(rec.exit_code, "failed")
+
+
+def read_cycle_run(rec: RunRecord, run_dir: str, files: List[Tuple[str, os.stat_result]]) -> None:
+    cycle = load_json(os.path.join(run_dir, "cycle.json"))
+    stages = cycle.get("stages") if isinstance(cycle, dict) else None
+    total = [s for s in stages or [] if isinstance(s, dict) and s.get("stage") == "cycle"]
+    if total:
+        rec.started_at, rec.ended_at = as_float(total[-1].get("start")), as_float(total[-1].get("end"))
+        rec.exit_code = as_int(total[-1].get("exit"))
+    else:
+        rec.apply_timings([], files)
+    if isinstance(cycle, dict):
+        rec.status = cycle.get("outcome")
+
+
+READERS = {
+    "review": read_review_run,
+    "implementation": read_implementation_run,
+    "cycle": read_cycle_run,
+}
+
+
+def store_run(conn: sqlite3.Connection, rec: RunRecord, old_id: Optional[int]) -> None:
+    if old_id is not None:
+        delete_runs(conn, [old_id])
+    duration = None
+    if rec.started_at is not None and rec.ended_at is not None:
+        duration = round(rec.ended_at - rec.started_at, 3)
+    cur = conn.execute(
+        "INSERT INTO runs(kind, scope_id, run_id, path, signature, status, exit_code, started_at, ended_at,"
+        " duration_s, diff_fingerprint, indexed_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+        (
+            rec.kind, rec.scope_id, rec.run_id, rec.path, rec.signature, rec.status, rec.exit_code,
+            rec.started_at, rec.ended_at, duration, rec.diff_fingerprint, time.time(),
+        ),
+    )
+    run_pk = cur.lastrowid
+    for name, data in rec.fragments:
+        slug = str(data.get("facet_slug") or os.path.splitext(os.path.basename(name))[0])
+        findings = [f for f in data.get("findings", []) if isinstance(f, dict)]
+        questions = data.get("questions")
+        cur = conn.execute(
+            "INSERT INTO fragments(run, facet_slug, facet, status, overall_correctness, overall_confidence,"
+            " findings, questions, file) VALUES (?,?,?,?,?,?,?,?,?)",
+            (
+                run_pk, slug, data.get("facet"), data.get("status"), data.get("overall_correctness"),
+                as_float(data.get("overall_confidence_score")), len(findings),
+                len(questions) if isinstance(questions, list) else 0, name,
+            ),
+        )
+        frag_pk = cur.lastrowid
+        rows = []
+        for finding in findings:
+            loc = finding.get("code_location") if isinstance(finding.get("code_location"), dict) else {}
+            lines = loc.get("line_range") if isinstance(loc.get("line_range"), dict) else {}
+            rows.append(
+                (
+                    run_pk, frag_pk, slug, as_int(finding.get("priority")), as_float(finding.get("confidence_score")),
+                    finding.get("title"), loc.get("repo_relative_path"), as_int(lines.get("start")),
+                    as_int(lines.get("end")),
+                )
+            )
+        conn.executemany(
+            "INSERT INTO findings(run, fragment, facet_slug, priority, confidence, title, path, line_start, line_end)"
+            " VALUES (?,?,?,?,?,?,?,?,?)",
+            rows,
+        )
+
+
+def delete_runs(conn: sqlite3.Connection, ids: Iterable[int]) -> None:
+    for run_pk in ids:
+        conn.execute("DELETE FROM findings WHERE run = ?", (run_pk,))
+        conn.execute("DELETE FROM fragments WHERE run = ?", (run_pk,))
+        conn.execute("DELETE FROM runs WHERE id = ?", (run_pk,))
+
+
+def iter_run_dirs(repo_root: str, kinds: Iterable[str]) -> Iterable[Tuple[str, str, str, str]]:
+    """(kind, scope_id, run_id, absolute run dir) for every run directory on disk."""
+    wanted = set(kinds)
+    for kind, rel_root in RUN_ROOTS:
+        if kind not in wanted:
+            continue
+        root = os.path.join(repo_root, rel_root)
+        try:
+            scopes = [e for e in os.scandir(root) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for scope in sorted(scopes, key=lambda e: e.name):
+            try:
+                runs = [e for e in os.scandir(scope.path) if e.is_dir(follow_symlinks=False)]
+            except OSError:
+                continue
+            for run in sorted(runs, key=lambda e: e.name):
+                yield kind, scope.name, run.name, run.path
+
+
+def index_repo(conn: sqlite3.Connection, repo_root: str, full: bool = False,
+               kinds: Iterable[str] = tuple(k for k, _ in RUN_ROOTS)) -> Dict[str, int]:
+    kinds = list(kinds)
+    existing = {
+        row["path"]: (row["id"], row["signature"])
+        for row in conn.execute(
+            f"SELECT id, path, signature FROM runs WHERE kind IN ({','.join('?' * len(kinds))})", kinds
+        )
+    }
+    stats = {"runs": 0, "indexed": 0, "unchanged": 0, "removed": 0, "archived": 0}
+    seen = set()
+    with conn:
+        for kind, scope_id, run_id, run_dir in iter_run_dirs(repo_root, kinds):
+            rel = os.path.relpath(run_dir, repo_root)
+            seen.add(rel)
+            stats["runs"] += 1
+            files = run_files(run_dir)
+            sig = signature(files)
+            old = existing.get(rel)
+            if old is not None and old[1] == sig and not full:
+                stats["unchanged"] += 1
+                continue
+            rec = RunRecord(kind, scope_id, run_id, rel, sig)
+            READERS[kind](rec, run_dir, files)
+            store_run(conn, rec, old[0] if old else None)
+            stats["indexed"] += 1
+        gone = [(path, run_pk) for path, (run_pk, _sig) in existing.items() if path not in seen]
+        if gone:
+            # Runs packed by `prune` keep their rows, so history queries survive retention.
+            from run_retention import archived_run_paths
+
+            archived = archived_run_paths(repo_root)
+            stats["archived"] = sum(1 for path, _pk in gone if path in archived)
+            gone = [(path, run_pk) for path, run_pk in gone if path not in archived]
+        delete_runs(conn, [run_pk for _path, run_pk in gone])
+        stats["removed"] = len(gone)
+    return stats
+
+
+def index_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Incrementally index .skilled-reviews run directories into SQLite."
+    )
+    parser.add_argument("--repo-root", default=".", help="Repository root (default: cwd)")
+    parser.add_argument("--db", default="", help=f"Database path (default: <repo>/{DEFAULT_DB})")
+    parser.add_argument("--full", action="store_true", help="Re-ingest every run, even unchanged ones")
+    parser.add_argument(
+        "--kind",
+        action="append",
+        choices=[k for k, _ in RUN_ROOTS],
+        help="Only index this kind of run (repeatable; default: all)",
+    )
+    args = parser.parse_args(argv)
+
+    repo_root = os.path.abspath(args.repo_root)
+    db_path = args.db or os.path.join(repo_root, DEFAULT_DB)
+    start = time.monotonic()
+    conn = connect(db_path)
+    try:
+        stats = index_repo(conn, repo_root, full=args.full, kinds=args.kind or [k for k, _ in RUN_ROOTS])
+    finally:
+        conn.close()
+    archived = f", {stats['archived']} archived" if stats["archived"] else ""
+    print(
+        f"Indexed {stats['indexed']} run(s), {stats['unchanged']} unchanged, {stats['removed']} removed{archived} "
+        f"({stats['runs']} on disk, {time.monotonic() - start:.3f}s): {db_path}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def parse_since(value: str) -> float:
+    """`30d` / `12h` / `90m` (relative), `YYYY-MM-DD` or an ISO timestamp (local time)."""
+    value = value.strip()
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([dhm])", value)
+    if m:
+        unit = {"d": 86400, "h": 3600, "m": 60}[m.group(2)]
+        return time.time() - float(m.group(1)) * unit
+    for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M"):
+        try:
+            return time.mktime(time.strptime(value, fmt))
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"invalid time: {value} (use 30d, 12h, YYYY-MM-DD or ISO)")
+
+
+def iso(ts) -> str:
+    if ts is None:
+        return ""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts))
+
+
+def print_rows(rows: List[dict], as_json: bool) -> None:
+    if as_json:
+        json.dump(rows, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return
+    if not rows:
+        print("(no rows)")
+        return
+    cols = list(rows[0].keys())
+    cells = [[("" if r[c] is None else str(r[c])) for c in cols] for r in rows]
+    widths = [min(60, max(len(c), *(len(row[i]) for row in cells))) for i, c in enumerate(cols)]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)).rstrip())
+    for row in cells:
+        print("  ".join(v[:w].ljust(w) for v, w in zip(row, widths)).rstrip())
+
+
+def run_filters(args, alias: str = "r") -> Tuple[List[str], List]:
+    where: List[str] = []
+    params: List = []
+    if getattr(args, "scope", None):
+        where.append(f"{alias}.scope_id = ?")
+        params.append(args.scope)
+    if getattr(args, "since", None) is not None:
+        where.append(f"{alias}.started_at >= ?")
+        params.append(args.since)
+    if getattr(args, "until", None) is not None:
+        where.append(f"{alias}.started_at < ?")
+        params.append(args.until)
+    return where, params
+
+
+def query_findings(conn: sqlite3.Connection, args) -> List[dict]:
+    where, params = run_filters(args)
+    if args.facet:
+        where.append("f.facet_slug = ?")
+        params.append(args.facet)
+    if args.priority is not None:
+        where.append("f.priority = ?")
+        params.append(args.priority)
+    if args.max_priority is not None:
+        where.append("f.priority <= ?")
+        params.append(args.max_priority)
+    sql = (
+        "SELECT r.started_at AS started_at, r.scope_id AS scope_id, r.run_id AS run_id, f.facet_slug AS facet,"
+        " f.priority AS priority, f.confidence AS confidence, f.path AS path, f.line_start AS line_start,"
+        " f.title AS title FROM findings f JOIN runs r ON r.id = f.run"
+    )
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY r.started_at DESC, f.priority ASC, f.id ASC"
+    rows = []
+    for row in conn.execute(sql, params):
+        if args.path and not fnmatch.fnmatch(row["path"] or "", args.path):
+            continue
+        item = dict(row)
+        item["started_at"] = iso(item["started_at"])
+        rows.append(item)
+        if args.limit and len(rows) >= args.limit:
+            break
+    return rows
+
+
+def query_runs(conn: sqlite3.Connection, args) -> List[dict]:
+    where, params = run_filters(args)
+    if args.kind:
+        where.append("r.kind = ?")
+        params.append(args.kind)
+    if args.status:
+        where.append("r.status = ?")
+        params.append(args.status)
+    sql = (
+        "SELECT r.started_at AS started_at, r.kind AS kind, r.scope_id AS scope_id, r.run_id AS run_id,"
+        " r.status AS status, r.exit_code AS exit_code, r.duration_s AS duration_s,"
+        " (SELECT COUNT(*) FROM findings f WHERE f.run = r.id) AS findings,"
+        " substr(r.diff_fingerprint, 1, 12) AS diff FROM runs r"
+    )
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY r.started_at DESC, r.id DESC LIMIT ?"
+    params.append(args.limit or -1)
+    rows = [dict(row) for row in conn.execute(sql, params)]
+    for row in rows:
+        row["started_at"] = iso(row["started_at"])
+    return rows
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return round(ordered[idx], 3)
+
+
+def query_stats(conn: sqlite3.Connection, args) -> List[dict]:
+    where, params = run_filters(args)
+    clause = (" WHERE " + " AND ".join(where)) if where else ""
+    rows: List[dict] = []
+    durations: Dict[str, List[float]] = {}
+    counts: Dict[str, int] = {}
+    for row in conn.execute(f"SELECT kind, duration_s FROM runs r{clause}", params):
+        counts[row["kind"]] = counts.get(row["kind"], 0) + 1
+        if row["duration_s"] is not None:
+            durations.setdefault(row["kind"], []).append(row["duration_s"])
+    for kind in sorted(counts):
+        values = durations.get(kind, [])
+        rows.append(
+            {
+                "group": f"runs:{kind}",
+                "count": counts[kind],
+                "median_s": round(statistics.median(values), 3) if values else None,
+                "p90_s": percentile(values, 90),
+                "findings": None,
+                "p0_p1": None,
+                "findings_per_fragment": None,
+            }
+        )
+    facet_sql = (
+        "SELECT fr.facet_slug AS facet, COUNT(*) AS fragments, SUM(fr.findings) AS findings,"
+        " (SELECT COUNT(*) FROM findings f JOIN runs r2 ON r2.id = f.run WHERE f.facet_slug = fr.facet_slug"
+        f" AND f.priority <= 1{(' AND ' + ' AND '.join(w.replace('r.', 'r2.') for w in where)) if where else ''})"
+        f" AS p0_p1 FROM fragments fr JOIN runs r ON r.id = fr.run{clause} GROUP BY fr.facet_slug ORDER BY fr.facet_slug"
+    )
+    for row in conn.execute(facet_sql, params + params):
+        rows.append(
+            {
+                "group": f"facet:{row['facet']}",
+                "count": row["fragments"],
+                "median_s": None,
+                "p90_s": None,
+                "findings": row["findings"],
+                "p0_p1": row["p0_p1"],
+                "findings_per_fragment": round(row["findings"] / row["fragments"], 3) if row["fragments"] else None,
+            }
+        )
+    return rows
+
+
+def query_main(argv: Optional[List[str]] = None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--repo-root", default=".", help="Repository root (default: cwd)")
+    common.add_argument("--db", default="", help=f"Database path (default: <repo>/{DEFAULT_DB})")
+    common.add_argument("--refresh", action="store_true", help="Run an incremental index first")
+    common.add_argument("--json", action="store_true", help="Print rows as JSON")
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--scope", default="", help="Only this scope-id")
+    filters.add_argument("--since", type=parse_since, help="Runs started at/after (30d, 12h, YYYY-MM-DD, ISO)")
+    filters.add_argument("--until", type=parse_since, help="Runs started before")
+
+    parser = argparse.ArgumentParser(description="Query the run index (see `index`).")
+    sub = parser.add_subparsers(dest="what", required=True)
+    p = sub.add_parser("findings", parents=[common, filters], help="Findings, newest run first")
+    p.add_argument("--facet", default="", help="facet_slug (aggregate/overall included)")
+    p.add_argument("--priority", type=int, choices=range(4), help="Exact priority (0-3)")
+    p.add_argument("--max-priority", type=int, choices=range(4), help="Priority at most (e.g. 1 = P0+P1)")
+    p.add_argument("--path", default="", help="fnmatch pattern on the finding's repo-relative path")
+    p.add_argument("--limit", type=int, default=100)
+    p = sub.add_parser("runs", parents=[common, filters], help="Runs, newest first")
+    p.add_argument("--kind", choices=[k for k, _ in RUN_ROOTS])
+    p.add_argument("--status", default="")
+    p.add_argument("--limit", type=int, default=50)
+    sub.add_parser("stats", parents=[common, filters], help="Run durations per kind, finding yield per facet")
+    p = sub.add_parser("sql", parents=[common], help="Read-only SQL against the index")
+    p.add_argument("statement")
+    args = parser.parse_args(argv)
+
+    repo_root = os.path.abspath(args.repo_root)
+    db_path = args.db or os.path.join(repo_root, DEFAULT_DB)
+    if args.refresh:
+        conn = connect(db_path)
+        try:
+            index_repo(conn, repo_root)
+        finally:
+            conn.close()
+    if not os.path.isfile(db_path):
+        eprint(f"index not found: {db_path} (run `skilled_reviews_cli.py index` first)")
+        return 1
+
+    conn = connect(db_path, readonly=True)
+    try:
+        if args.what == "findings":
+            rows = query_findings(conn, args)
+        elif args.what == "runs":
+            rows = query_runs(conn, args)
+        elif args.what == "stats":
+            rows = query_stats(conn, args)
+        else:
+            try:
+                rows = [dict(row) for row in conn.execute(args.statement)]
+            except sqlite3.Error as exc:
+                eprint(f"sql error: {exc}")
+                return 1
+    finally:
+        conn.close()
+    print_rows(rows, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "index":
+        raise SystemExit(index_main(sys.argv[2:]))
+    if cmd == "query":
+        raise SystemExit(query_main(sys.argv[2:]))
+    eprint("usage: review_index.py index|query [args...]")
+    raise SystemExit(2)
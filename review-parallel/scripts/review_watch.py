@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Render the progress events of a review run (<run-dir>/progress.ndjson).
+
+review-parallel, code-review and pr-review append one NDJSON event per step:
+  {"ts", "runner", "pid", "run", "event", ...fields}
+  run-start / run-end (exit)       a runner invocation begins / ends
+  queued (facet)                   a facet worker was launched
+  started (facet, tier, model, effort) / finished (facet, tier, exit) / cached (facet, tier)
+                                   one codex call; cached = answered from a CODEX_CASSETTE replay
+  retried (facet, tier, reason)    cascade escalation or hedge duplicate
+  done (facet, exit) / cancelled (facet)
+                                   a facet worker ended / was stopped by an early exit or FAIL_FAST
+  validated (status)               fragment / aggregate validation result
+
+Usage:
+  watch <run-dir | progress.ndjson> [--follow] [--json]
+  watch --scope <scope-id> [--repo-root DIR] [--follow] [--json]   newest run of the scope
+--follow keeps printing new events until every runner that started has ended (or --timeout);
+--json prints the per-facet status instead of the event lines.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+PROGRESS_FILE = "progress.ndjson"
+HISTORY_ROOT = os.path.join(".skilled-reviews", ".reviews", "reviewed_scopes")
+POLL_SEC = 0.2
+TERMINAL_STATES = {"done", "cancelled"}
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def resolve(target: str, scope: str, repo_root: str) -> Optional[str]:
+    """Path of the progress file for a run dir / file / the newest run of a scope."""
+    if scope:
+        root = os.path.join(repo_root, HISTORY_ROOT, scope)
+        newest: Tuple[float, str] = (-1.0, "")
+        try:
+            entries = [e for e in os.scandir(root) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return None
+        for entry in entries:
+            path = os.path.join(entry.path, PROGRESS_FILE)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            newest = max(newest, (mtime, path))
+        return newest[1] or None
+    if os.path.isdir(target):
+        return os.path.join(target, PROGRESS_FILE)
+    return target
+
+
+class Status:
+    def __init__(self) -> None:
+        self.facets: Dict[str, dict] = {}
+        self.open_runs: Dict[Tuple[str, int], float] = {}
+        self.runs = 0
+        self.last_exit: Optional[int] = None
+
+    def apply(self, ev: dict) -> None:
+        event = ev.get("event")
+        key = (str(ev.get("runner")), int(ev.get("pid") or 0))
+        if event == "run-start":
+            self.open_runs[key] = float(ev.get("ts") or 0)
+            self.runs += 1
+            return
+        if event == "run-end":
+            self.open_runs.pop(key, None)
+            self.last_exit = ev.get("exit")
+            return
+        facet = ev.get("facet")
+        if not facet:
+            return
+        st = self.facets.setdefault(str(facet), {"state": "queued", "tier": None, "calls": 0, "retries": 0,
+                                                 "cached": False, "exit": None, "since": ev.get("ts")})
+        if event == "queued":
+            st.update(state="queued", since=ev.get("ts"), exit=None)
+        elif event == "started":
+            st.update(state="running", tier=ev.get("tier"), since=ev.get("ts"))
+            st["calls"] += 1
+        elif event in ("finished", "cached"):
+            st["exit"] = ev.get("exit", 0)
+            st["cached"] = st["cached"] or event == "cached"
+        elif event == "retried":
+            st["retries"] += 1
+        elif event == "done":
+            if st["state"] != "cancelled":
+                st.update(state="done", exit=ev.get("exit"), since=ev.get("ts"))
+        elif event == "cancelled":
+            st.update(state="cancelled", since=ev.get("ts"))
+
+    @property
+    def finished(self) -> bool:
+        return self.runs > 0 and not self.open_runs
+
+    def as_dict(self) -> dict:
+        return {"finished": self.finished, "exit": self.last_exit, "facets": self.facets}
+
+    def summary(self) -> str:
+        counts: Dict[str, int] = {}
+        for st in self.facets.values():
+            state = st["state"]
+            if state == "done" and st["exit"] not in (0, None):
+                state = "failed"
+            counts[state] = counts.get(state, 0) + 1
+        order = ("done", "failed", "cancelled", "running", "queued")
+        parts = [f"{counts[s]} {s}" for s in order if counts.get(s)]
+        tail = "finished" if self.finished else "in progress"
+        if self.finished and self.last_exit is not None:
+            tail += f" (exit {self.last_exit})"
+        return f"Facets: {', '.join(parts) or 'none yet'}; {tail}"
+
+
+def format_event(ev: dict) -> str:
+    try:
+        stamp = time.strftime("%H:%M:%S", time.localtime(float(ev.get("ts") or 0)))
+    except (TypeError, ValueError, OverflowError):
+        stamp = "--:--:--"
+    fields = {k: v for k, v in ev.items() if k not in {"ts", "runner", "pid", "run", "event", "facet"}}
+    detail = " ".join(f"{k}={v}" for k, v in fields.items())
+    facet = ev.get("facet") or ""
+    return f"{stamp}  {ev.get('runner', '?'):<15} {ev.get('event', '?'):<10} {facet:<20} {detail}".rstrip()
+
+
+def read_new(path: str, offset: int) -> Tuple[List[dict], int]:
+    """Complete event lines appended since `offset` (a partial last line is left for later)."""
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(offset)
+            data = fh.read()
+    except OSError:
+        return [], offset
+    end = data.rfind(b"\n")
+    if end == -1:
+        return [], offset
+    events = []
+    for line in data[: end + 1].splitlines():
+        try:
+            ev = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(ev, dict):
+            events.append(ev)
+    return events, offset + end + 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Show the progress events of a review run.")
+    parser.add_argument("target", nargs="?", default="", help=f"Run dir or {PROGRESS_FILE}")
+    parser.add_argument("--scope", default="", help="Watch the newest run of this scope-id instead")
+    parser.add_argument("--repo-root", default=".", help="Repository root for --scope (default: cwd)")
+    parser.add_argument("--follow", "-f", action="store_true", help="Keep printing events until the run ends")
+    parser.add_argument("--timeout", type=float, default=0.0, help="Stop following after this many seconds (0: no limit)")
+    parser.add_argument("--json", action="store_true", help="Print the per-facet status as JSON")
+    args = parser.parse_args(argv)
+    if not args.target and not args.scope:
+        parser.error("a run dir, a progress file or --scope is required")
+
+    deadline = time.monotonic() + args.timeout if args.timeout > 0 else None
+    path = resolve(args.target, args.scope, args.repo_root)
+    while path is None or not os.path.exists(path):
+        if not args.follow or (deadline is not None and time.monotonic() >= deadline):
+            eprint(f"no progress events: {path or args.scope}")
+            return 1
+        time.sleep(POLL_SEC)
+        path = resolve(args.target, args.scope, args.repo_root)
+
+    status = Status()
+    offset = 0
+    while True:
+        events, offset = read_new(path, offset)
+        for ev in events:
+            status.apply(ev)
+            if not args.json:
+                print(format_event(ev), flush=True)
+        if not args.follow or status.finished or (deadline is not None and time.monotonic() >= deadline):
+            break
+        time.sleep(POLL_SEC)
+    if args.json:
+        print(json.dumps(status.as_dict(), indent=2))
+    else:
+        print(status.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Retention for review, implementation and cycle run directories.
+
+  prune    select runs by policy (keep-last-N per scope, max age, max total bytes), pack them
+           into per-scope zip archives (or delete them with --delete) and remove the run dirs
+  archive  list archived runs, print an archived file without extracting (`cat`), or
+           `restore` a run dir
+
+Archives live in .skilled-reviews/.archive/<kind>/<scope-id>/:
+  pack-<stamp>.zip  one pack per prune, members "<run-id>/<path>" (deflate)
+  index.json        run-id -> pack, sizes, last activity, archived_at
+
+Safety against concurrent runs:
+- one prune at a time (<archive>/.lock, a mkdir lock with the owner's pid; a dead owner's lock is
+  taken over under <archive>/.lock.takeover, a lock without a pid yet counts as held)
+- runs with activity newer than --min-idle (default 1h) and the run named by a review scope's
+  .current_run are never selected
+- a selected run dir is first renamed into <archive>/.staging (atomic, same filesystem), so a runner
+  starting on the same run-id gets a fresh dir; the dir is removed only after its pack and index
+  are durably written; an interrupted prune is finished by the next one
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import zipfile
+from typing import Dict, List, Optional, Set, Tuple
+
+from review_index import RUN_ROOTS, iso, print_rows
+
+DEFAULT_ARCHIVE = ".skilled-reviews/.archive"
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+# Scopes with more packs than this are compacted into one pack (unreferenced members dropped).
+DEFAULT_MAX_PACKS = 8
+ID_RE = re.compile(r"^[A-Za-z0-9._-]+$")
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def parse_age(value: str) -> float:
+    """`30d` / `12h` / `90m` / `45s` -> seconds."""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([dhms])", value.strip())
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid age: {value} (use 30d, 12h, 90m or 45s)")
+    return float(m.group(1)) * {"d": 86400, "h": 3600, "m": 60, "s": 1}[m.group(2)]
+
+
+def parse_bytes(value: str) -> int:
+    """`500M` / `2G` / `100k` / plain bytes (binary units)."""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([kKmMgGtT]?)i?[bB]?", value.strip())
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid size: {value} (use 500M, 2G, 100k or bytes)")
+    return int(float(m.group(1)) * 1024 ** " kmgt".index((m.group(2) or " ").lower()))
+
+
+def human(n: int) -> str:
+    size = float(n)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{n} B"
+
+
+def valid_id(value: str) -> bool:
+    return bool(ID_RE.match(value)) and value not in {".", ".."}
+
+
+def run_root_of(kind: str) -> str:
+    return dict(RUN_ROOTS)[kind]
+
+
+def walk_run(run_dir: str) -> Tuple[int, float, List[str]]:
+    """(total bytes, newest mtime, sorted relative file paths) of a run dir."""
+    total = 0
+    newest = 0.0
+    files: List[str] = []
+    try:
+        newest = os.stat(run_dir).st_mtime
+    except OSError:
+        pass
+    for dirpath, dirnames, filenames in os.walk(run_dir):
+        dirnames.sort()
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            total += st.st_size
+            newest = max(newest, st.st_mtime)
+            files.append(os.path.relpath(path, run_dir))
+    files.sort()
+    return total, newest, files
+
+
+class Run:
+    def __init__(self, kind: str, scope_id: str, run_id: str, path: str) -> None:
+        self.kind = kind
+        self.scope_id = scope_id
+        self.run_id = run_id
+        self.path = path
+        self.bytes, self.last_activity, self.files = walk_run(path)
+        self.protected = ""
+        self.reasons: List[str] = []
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "scope_id": self.scope_id,
+            "run_id": self.run_id,
+            "bytes": self.bytes,
+            "last_activity": iso(self.last_activity),
+            "reasons": ",".join(self.reasons),
+        }
+
+
+def scan_runs(repo_root: str, kinds: List[str], scope: str = "") -> List[Run]:
+    runs: List[Run] = []
+    for kind in kinds:
+        root = os.path.join(repo_root, run_root_of(kind))
+        try:
+            scopes = sorted(e.name for e in os.scandir(root) if e.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+        for scope_id in scopes:
+            if scope and scope_id != scope:
+                continue
+            scope_dir = os.path.join(root, scope_id)
+            current = ""
+            if kind == "review":
+                try:
+                    with open(os.path.join(scope_dir, ".current_run"), encoding="utf-8") as fh:
+                        current = fh.read().strip()
+                except OSError:
+                    pass
+            try:
+                names = sorted(e.name for e in os.scandir(scope_dir) if e.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+            for run_id in names:
+                if not valid_id(run_id):
+                    continue
+                run = Run(kind, scope_id, run_id, os.path.join(scope_dir, run_id))
+                if run_id == current:
+                    run.protected = ".current_run"
+                runs.append(run)
+    return runs
+
+
+def select_runs(runs: List[Run], keep_last: Optional[int], max_age: Optional[float],
+                max_bytes: Optional[int], min_idle: float, now: float) -> List[Run]:
+    """Mark and return the runs any policy selects (oldest first); protected runs are never selected."""
+    for run in runs:
+        if not run.protected and now - run.last_activity < min_idle:
+            run.protected = "active"
+    by_scope: Dict[Tuple[str, str], List[Run]] = {}
+    for run in runs:
+        by_scope.setdefault((run.kind, run.scope_id), []).append(run)
+    for scope_runs in by_scope.values():
+        scope_runs.sort(key=lambda r: (r.last_activity, r.run_id), reverse=True)
+        for pos, run in enumerate(scope_runs):
+            if keep_last is not None and pos >= keep_last:
+                run.reasons.append("keep-last")
+            if max_age is not None and now - run.last_activity > max_age:
+                run.reasons.append("max-age")
+    if max_bytes is not None:
+        live = sum(r.bytes for r in runs if not (r.reasons and not r.protected))
+        for run in sorted(runs, key=lambda r: (r.last_activity, r.run_id)):
+            if live <= max_bytes:
+                break
+            if run.protected or run.reasons:
+                continue
+            run.reasons.append("max-bytes")
+            live -= run.bytes
+    selected = [r for r in runs if r.reasons and not r.protected]
+    selected.sort(key=lambda r: (r.last_activity, r.run_id))
+    return selected
+
+
+def fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    fsync_dir(os.path.dirname(path))
+
+
+def load_index(scope_dir: str) -> dict:
+    try:
+        with open(os.path.join(scope_dir, INDEX_NAME), encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        data = {}
+    if not isinstance(data, dict) or not isinstance(data.get("runs"), dict):
+        data = {"version": INDEX_VERSION, "runs": {}}
+    return data
+
+
+def save_index(scope_dir: str, data: dict) -> None:
+    data["version"] = INDEX_VERSION
+    write_atomic(os.path.join(scope_dir, INDEX_NAME), (json.dumps(data, indent=2, sort_keys=True) + "\n").encode())
+
+
+class ArchiveLock:
+    """
+    mkdir lock with the owner's pid, like the implementation worktree pool's slot locks.
+
+    A lock without a readable pid (its owner may not have written it yet) counts as held. A
+    dead owner's lock is taken over under <lock>.takeover (mkdir is atomic) and only if it
+    still names that pid, so two prunes cannot both remove it.
+    """
+
+    def __init__(self, archive_root: str) -> None:
+        self.path = os.path.join(archive_root, ".lock")
+
+    def owner(self) -> Optional[int]:
+        try:
+            with open(os.path.join(self.path, "pid"), encoding="utf-8") as fh:
+                return int(fh.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def take_over(self, pid: int) -> None:
+        guard = f"{self.path}.takeover"
+        try:
+            os.mkdir(guard)
+        except FileExistsError:
+            return
+        try:
+            if self.owner() == pid:
+                eprint(f"Removing stale archive lock (pid {pid}): {self.path}")
+                shutil.rmtree(self.path, ignore_errors=True)
+        finally:
+            os.rmdir(guard)
+
+    def __enter__(self) -> "ArchiveLock":
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        for _ in range(2):
+            try:
+                os.mkdir(self.path)
+            except FileExistsError:
+                pid = self.owner()
+                if pid is None or pid_alive(pid):
+                    raise SystemExit(f"another prune is running (pid {pid or '?'}): {self.path}")
+                self.take_over(pid)
+                continue
+            with open(os.path.join(self.path, "pid"), "w", encoding="utf-8") as fh:
+                fh.write(f"{os.getpid()}\n")
+            return self
+        raise SystemExit(f"another prune is running: {self.path}")
+
+    def __exit__(self, *exc) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def pack_runs(scope_dir: str, staged: List[Tuple[Run, str]], now: float) -> Tuple[str, int]:
+    """Write one pack holding every staged run dir; returns (pack name, compressed bytes)."""
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(now))
+    name = f"pack-{stamp}-{os.getpid()}.zip"
+    path = os.path.join(scope_dir, name)
+    tmp = f"{path}.tmp"
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for run, stage_dir in staged:
+            for rel in run.files:
+                src = os.path.join(stage_dir, rel)
+                if os.path.islink(src) or not os.path.isfile(src):
+                    continue
+                zf.write(src, f"{run.run_id}/{rel}")
+    with open(tmp, "rb") as fh:
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    fsync_dir(scope_dir)
+    return name, os.path.getsize(path)
+
+
+def compact_scope(scope_dir: str, index: dict, max_packs: int, now: float) -> int:
+    """Merge the scope's packs into one when there are more than max_packs; returns packs removed."""
+    packs = sorted(n for n in os.listdir(scope_dir) if n.startswith("pack-") and n.endswith(".zip"))
+    if len(packs) <= max_packs:
+        return 0
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(now))
+    name = f"pack-{stamp}-{os.getpid()}-c.zip"
+    path = os.path.join(scope_dir, name)
+    tmp = f"{path}.tmp"
+    runs = index["runs"]
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as out:
+        for pack in packs:
+            wanted = {rid for rid, meta in runs.items() if meta.get("pack") == pack}
+            if not wanted:
+                continue
+            with zipfile.ZipFile(os.path.join(scope_dir, pack)) as zf:
+                for info in zf.infolist():
+                    if info.filename.split("/", 1)[0] in wanted:
+                        out.writestr(info, zf.read(info), compress_type=zipfile.ZIP_DEFLATED)
+    with open(tmp, "rb") as fh:
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    for meta in runs.values():
+        if meta.get("pack") in packs:
+            meta["pack"] = name
+    save_index(scope_dir, index)
+    for pack in packs:
+        os.remove(os.path.join(scope_dir, pack))
+    fsync_dir(scope_dir)
+    return len(packs)
+
+
+def gc_packs(scope_dir: str, index: dict) -> None:
+    """Remove packs no index entry points at (all their runs were restored)."""
+    referenced = {meta.get("pack") for meta in index["runs"].values()}
+    for name in os.listdir(scope_dir):
+        if name.startswith("pack-") and name.endswith(".zip") and name not in referenced:
+            os.remove(os.path.join(scope_dir, name))
+
+
+def recover_staging(repo_root: str, archive_root: str) -> List[str]:
+    """Finish an interrupted prune: staged dirs already in an index are removed, others moved back."""
+    staging = os.path.join(archive_root, ".staging")
+    notes: List[str] = []
+    if not os.path.isdir(staging):
+        return notes
+    for kind, _rel in RUN_ROOTS:
+        kind_dir = os.path.join(staging, kind)
+        for scope_id in sorted(os.listdir(kind_dir)) if os.path.isdir(kind_dir) else []:
+            index = load_index(os.path.join(archive_root, kind, scope_id))
+            for run_id in sorted(os.listdir(os.path.join(kind_dir, scope_id))):
+                src = os.path.join(kind_dir, scope_id, run_id)
+                if run_id in index["runs"]:
+                    shutil.rmtree(src, ignore_errors=True)
+                    notes.append(f"recovered: removed staged {kind}/{scope_id}/{run_id} (already archived)")
+                    continue
+                dest = os.path.join(repo_root, run_root_of(kind), scope_id, run_id)
+                if os.path.exists(dest):
+                    notes.append(f"recovered: left {src} (run dir exists again)")
+                    continue
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.rename(src, dest)
+                notes.append(f"recovered: moved {kind}/{scope_id}/{run_id} back")
+    return notes
+
+
+def archive_root_for(repo_root: str, value: str) -> str:
+    return os.path.abspath(value) if value else os.path.join(repo_root, DEFAULT_ARCHIVE)
+
+
+def prune_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Archive (or delete) old run directories by retention policy. Policies combine: "
+        "a run is pruned when any of them selects it."
+    )
+    parser.add_argument("--repo-root", default=".", help="Repository root (default: cwd)")
+    parser.add_argument("--archive-dir", default="", help=f"Archive root (default: <repo>/{DEFAULT_ARCHIVE})")
+    parser.add_argument("--kind", action="append", choices=[k for k, _ in RUN_ROOTS],
+                        help="Only this kind of run (repeatable; default: all)")
+    parser.add_argument("--scope", default="", help="Only this scope-id")
+    parser.add_argument("--keep-last", type=int, help="Keep the newest N runs per scope")
+    parser.add_argument("--max-age", type=parse_age, help="Prune runs idle for longer than this (30d, 12h)")
+    parser.add_argument("--max-bytes", type=parse_bytes,
+                        help="Prune oldest runs until the remaining run dirs fit (500M, 2G)")
+    parser.add_argument("--min-idle", type=parse_age, default=3600.0,
+                        help="Never touch runs with activity newer than this (default: 1h)")
+    parser.add_argument("--max-packs", type=int, default=DEFAULT_MAX_PACKS,
+                        help=f"Compact a scope's packs into one above this count (default: {DEFAULT_MAX_PACKS})")
+    parser.add_argument("--delete", action="store_true", help="Delete selected runs instead of archiving them")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the runs that would be pruned")
+    parser.add_argument("--json", action="store_true", help="Print the pruned runs as JSON")
+    args = parser.parse_args(argv)
+    if args.keep_last is None and args.max_age is None and args.max_bytes is None:
+        parser.error("give at least one policy: --keep-last, --max-age or --max-bytes")
+    if args.keep_last is not None and args.keep_last < 0:
+        parser.error("--keep-last must be >= 0")
+
+    repo_root = os.path.abspath(args.repo_root)
+    archive_root = archive_root_for(repo_root, args.archive_dir)
+    kinds = args.kind or [k for k, _ in RUN_ROOTS]
+    now = time.time()
+
+    if args.dry_run:
+        runs = scan_runs(repo_root, kinds, args.scope)
+        selected = select_runs(runs, args.keep_last, args.max_age, args.max_bytes, args.min_idle, now)
+        print_rows([r.as_dict() for r in selected], args.json)
+        eprint(f"Would prune {len(selected)} of {len(runs)} run(s), {human(sum(r.bytes for r in selected))}")
+        return 0
+
+    start = time.monotonic()
+    with ArchiveLock(archive_root):
+        for note in recover_staging(repo_root, archive_root):
+            eprint(note)
+        # Scan under the lock so two prunes never pick the same runs.
+        runs = scan_runs(repo_root, kinds, args.scope)
+        selected = select_runs(runs, args.keep_last, args.max_age, args.max_bytes, args.min_idle, now)
+        by_scope: Dict[Tuple[str, str], List[Run]] = {}
+        for run in selected:
+            by_scope.setdefault((run.kind, run.scope_id), []).append(run)
+        archived_bytes = 0
+        compacted = 0
+        done: List[Run] = []
+        for (kind, scope_id), scope_runs in sorted(by_scope.items()):
+            stage_scope = os.path.join(archive_root, ".staging", kind, scope_id)
+            os.makedirs(stage_scope, exist_ok=True)
+            staged: List[Tuple[Run, str]] = []
+            for run in scope_runs:
+                stage_dir = os.path.join(stage_scope, run.run_id)
+                try:
+                    os.rename(run.path, stage_dir)
+                except OSError as exc:
+                    eprint(f"skip {kind}/{scope_id}/{run.run_id}: {exc}")
+                    continue
+                staged.append((run, stage_dir))
+            if not staged:
+                continue
+            if not args.delete:
+                scope_dir = os.path.join(archive_root, kind, scope_id)
+                os.makedirs(scope_dir, exist_ok=True)
+                pack, packed_bytes = pack_runs(scope_dir, staged, now)
+                archived_bytes += packed_bytes
+                index = load_index(scope_dir)
+                for run, _stage_dir in staged:
+                    index["runs"][run.run_id] = {
+                        "pack": pack,
+                        "bytes": run.bytes,
+                        "files": len(run.files),
+                        "last_activity": run.last_activity,
+                        "archived_at": now,
+                        "reasons": run.reasons,
+                    }
+                save_index(scope_dir, index)
+                compacted += compact_scope(scope_dir, index, args.max_packs, now)
+            for run, stage_dir in staged:
+                shutil.rmtree(stage_dir, ignore_errors=True)
+                done.append(run)
+            try:
+                os.rmdir(stage_scope)
+            except OSError:
+                pass
+
+    if args.json:
+        print_rows([r.as_dict() for r in done], True)
+    freed = sum(r.bytes for r in done)
+    verb = "deleted" if args.delete else f"archived into {human(archived_bytes)}"
+    eprint(
+        f"Pruned {len(done)} of {len(runs)} run(s), {human(freed)} {verb}"
+        f"{f', {compacted} pack(s) compacted' if compacted else ''} ({time.monotonic() - start:.3f}s)"
+        + ("" if args.delete else f": {archive_root}")
+    )
+    return 0
+
+
+def archived_run_paths(repo_root: str, archive_dir: str = "") -> Set[str]:
+    """Repo-relative run dir paths that have an archive entry (used by the run index)."""
+    archive_root = archive_root_for(repo_root, archive_dir)
+    out: Set[str] = set()
+    for kind, rel_root in RUN_ROOTS:
+        kind_dir = os.path.join(archive_root, kind)
+        try:
+            scopes = [e.name for e in os.scandir(kind_dir) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for scope_id in scopes:
+            for run_id in load_index(os.path.join(kind_dir, scope_id))["runs"]:
+                out.add(os.path.join(rel_root, scope_id, run_id))
+    return out
+
+
+def open_member(archive_root: str, kind: str, scope_id: str, run_id: str) -> Tuple[str, dict]:
+    if not (valid_id(scope_id) and valid_id(run_id)):
+        raise SystemExit(f"invalid scope-id/run-id: {scope_id}/{run_id}")
+    scope_dir = os.path.join(archive_root, kind, scope_id)
+    meta = load_index(scope_dir)["runs"].get(run_id)
+    if meta is None:
+        raise SystemExit(f"not archived: {kind}/{scope_id}/{run_id}")
+    return os.path.join(scope_dir, meta["pack"]), meta
+
+
+def archive_main(argv: Optional[List[str]] = None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--repo-root", default=".", help="Repository root (default: cwd)")
+    common.add_argument("--archive-dir", default="", help=f"Archive root (default: <repo>/{DEFAULT_ARCHIVE})")
+    common.add_argument("--kind", choices=[k for k, _ in RUN_ROOTS], default="review")
+    parser = argparse.ArgumentParser(description="Read runs archived by `prune`.")
+    sub = parser.add_subparsers(dest="what", required=True)
+    p = sub.add_parser("list", parents=[common], help="Archived runs (or the files of one run)")
+    p.add_argument("scope_id", nargs="?", default="")
+    p.add_argument("run_id", nargs="?", default="")
+    p.add_argument("--json", action="store_true")
+    p = sub.add_parser("cat", parents=[common], help="Print one archived file to stdout")
+    p.add_argument("scope_id")
+    p.add_argument("run_id")
+    p.add_argument("member", help="Path inside the run dir, e.g. security.json or aggregate/pr-review.json")
+    p = sub.add_parser("restore", parents=[common], help="Extract an archived run back into its run dir")
+    p.add_argument("scope_id")
+    p.add_argument("run_id")
+    args = parser.parse_args(argv)
+
+    repo_root = os.path.abspath(args.repo_root)
+    archive_root = archive_root_for(repo_root, args.archive_dir)
+
+    if args.what == "list":
+        if args.run_id:
+            pack, _meta = open_member(archive_root, args.kind, args.scope_id, args.run_id)
+            prefix = f"{args.run_id}/"
+            with zipfile.ZipFile(pack) as zf:
+                rows = [
+                    {"file": i.filename[len(prefix):], "bytes": i.file_size, "compressed": i.compress_size}
+                    for i in zf.infolist() if i.filename.startswith(prefix)
+                ]
+            print_rows(rows, args.json)
+            return 0
+        rows = []
+        kind_dir = os.path.join(archive_root, args.kind)
+        scopes = [args.scope_id] if args.scope_id else (sorted(os.listdir(kind_dir)) if os.path.isdir(kind_dir) else [])
+        for scope_id in scopes:
+            for run_id, meta in sorted(load_index(os.path.join(kind_dir, scope_id))["runs"].items()):
+                rows.append(
+                    {
+                        "scope_id": scope_id,
+                        "run_id": run_id,
+                        "files": meta.get("files"),
+                        "bytes": meta.get("bytes"),
+                        "last_activity": iso(meta.get("last_activity")),
+                        "archived_at": iso(meta.get("archived_at")),
+                        "pack": meta.get("pack"),
+                    }
+                )
+        print_rows(rows, args.json)
+        return 0
+
+    if args.what == "cat":
+        pack, _meta = open_member(archive_root, args.kind, args.scope_id, args.run_id)
+        try:
+            with zipfile.ZipFile(pack) as zf:
+                data = zf.read(f"{args.run_id}/{args.member}")
+        except KeyError:
+            eprint(f"not in archive: {args.kind}/{args.scope_id}/{args.run_id}/{args.member}")
+            return 1
+        sys.stdout.buffer.write(data)
+        sys.stdout.flush()
+        return 0
+
+    dest = os.path.join(repo_root, run_root_of(args.kind), args.scope_id, args.run_id)
+    with ArchiveLock(archive_root):
+        pack, _meta = open_member(archive_root, args.kind, args.scope_id, args.run_id)
+        if os.path.exists(dest):
+            eprint(f"run dir already exists: {dest}")
+            return 1
+        # Extract next to the staging area (not into the scope dir, where a half-written dir would
+        # look like a run), then rename into place.
+        tmp = os.path.join(archive_root, ".staging", f"restore-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        prefix = f"{args.run_id}/"
+        with zipfile.ZipFile(pack) as zf:
+            for info in zf.infolist():
+                rel = info.filename[len(prefix):] if info.filename.startswith(prefix) else ""
+                if not rel or rel.startswith("/") or ".." in rel.split("/"):
+                    continue
+                target = os.path.join(tmp, rel)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "wb") as fh:
+                    fh.write(zf.read(info))
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                os.utime(target, (mtime, mtime))
+        os.makedirs(tmp, exist_ok=True)
+        os.rename(tmp, dest)
+        scope_dir = os.path.join(archive_root, args.kind, args.scope_id)
+        index = load_index(scope_dir)
+        index["runs"].pop(args.run_id, None)
+        save_index(scope_dir, index)
+        gc_packs(scope_dir, index)
+    eprint(f"Restored {args.kind}/{args.scope_id}/{args.run_id}: {dest}")
+    return 0
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "prune":
+        raise SystemExit(prune_main(sys.argv[2:]))
+    if cmd == "archive":
+        raise SystemExit(archive_main(sys.argv[2:]))
+    eprint("usage: run_retention.py prune|archive [args...]")
+    raise SystemExit(2)
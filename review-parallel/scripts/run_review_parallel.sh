@@ -30,7 +30,7 @@ done
 if (( ${#positional_args[@]} < 1 || ${#positional_args[@]} > 2 )); then
   echo "Usage: $0 <scope-id> [run-id] [--dry-run]" >&2
   echo "Required env: SOT, TESTS" >&2
-  echo "Optional env: RUN_ID, CONSTRAINTS, DIFF_FILE, DIFF_MODE, STRICT_STAGED, DIFF_SUMMARY_OUT, SCHEMA_PATH, CODEX_BIN, MODEL, REASONING_EFFORT, EXEC_TIMEOUT_SEC, VALIDATE, FORMAT_JSON" >&2
+  echo "Optional env: RUN_ID, CONSTRAINTS, DIFF_FILE, REVIEW_CHECKOUT, DIFF_MODE, STRICT_STAGED, DIFF_SUMMARY_OUT, SCHEMA_PATH, CODEX_BIN, CODEX_CASSETTE, CODEX_CASSETTE_DIR, CODEX_MAX_CONCURRENT, CODEX_RPM, CODEX_RPM_BURST, CODEX_LIMIT_DIR, MODEL, REASONING_EFFORT, EXEC_TIMEOUT_SEC, VALIDATE, FORMAT_JSON, HARD_TRIGGER_SCAN, HARD_TRIGGERS_FILE, FACETS_FILE, FACET_SELECT, FACETS_MUST_RUN, FACET_MIN_YIELD, CASCADE, CASCADE_MODEL, CASCADE_EFFORT, CASCADE_MIN_CONFIDENCE, HEDGE, HEDGE_MAX, HEDGE_AFTER_SEC, FAIL_FAST, FAIL_FAST_PATTERN, WORKERS, WORKERS_SSH, WORKERS_CODEX_BIN, WORKERS_REPO_DIR, WORKERS_STATE_DIR, PROGRESS, SKILLED_REVIEWS_TRACE, SKILLED_REVIEWS_TRACE_FORMAT, SKILLED_REVIEWS_PROFILE" >&2
   exit 1
 fi
 
@@ -54,8 +54,85 @@ fi
 
 start_epoch=$(date +%s)
 start_ts=$(date +"%Y-%m-%dT%H:%M:%S%z")
+run_started="${EPOCHREALTIME:-$start_epoch}"
 echo "Start: $start_ts" >&2
 
+trace_cat="review-parallel"
+# Tracing: SKILLED_REVIEWS_TRACE=<file> appends one Chrome trace-event "X" span per stage
+# (NDJSON; SKILLED_REVIEWS_TRACE_FORMAT=chrome streams a JSON array instead).
+trace_file="${SKILLED_REVIEWS_TRACE:-}"
+trace_sep=""
+if [[ -n "$trace_file" ]]; then
+  case "${SKILLED_REVIEWS_TRACE_FORMAT:-ndjson}" in
+    ndjson) ;;
+    chrome)
+      trace_sep=","
+      if [[ ! -s "$trace_file" ]]; then
+        (set -C; printf '[\n' >"$trace_file") 2>/dev/null || true
+      fi
+      ;;
+    *)
+      echo "Invalid SKILLED_REVIEWS_TRACE_FORMAT: ${SKILLED_REVIEWS_TRACE_FORMAT} (expected ndjson|chrome)" >&2
+      exit 1
+      ;;
+  esac
+  if [[ "$trace_file" != /* ]]; then
+    trace_file="${PWD}/${trace_file}"
+  fi
+  export SKILLED_REVIEWS_TRACE="$trace_file" SKILLED_REVIEWS_TRACE_PID="$$"
+fi
+trace_now() {
+  # Sets variable $1 to the current time in microseconds (0 when tracing is off).
+  if [[ -z "$trace_file" ]]; then
+    printf -v "$1" '0'
+  elif [[ -n "${EPOCHREALTIME:-}" ]]; then
+    local trace_t="${EPOCHREALTIME/,/.}"
+    printf -v "$1" '%s%s' "${trace_t%.*}" "${trace_t#*.}"
+  else
+    printf -v "$1" '%s000000' "$(date +%s)"
+  fi
+}
+trace_span() {
+  # trace_span <name> <start-us> [key=value ...]
+  [[ -n "$trace_file" ]] || return 0
+  local name="$1" start="$2" end kv value args="" sep=""
+  shift 2
+  trace_now end
+  for kv in "$@"; do
+    value="${kv#*=}"
+    value="${value//\\/\\\\}"
+    value="${value//\"/\\\"}"
+    args+="${sep}\"${kv%%=*}\":\"${value}\""
+    sep=","
+  done
+  printf '{"name":"%s","cat":"%s","ph":"X","ts":%s,"dur":%s,"pid":%s,"tid":%s,"args":{%s}}%s\n' \
+    "$name" "$trace_cat" "$start" "$((end - start))" "$SKILLED_REVIEWS_TRACE_PID" "${BASHPID:-$$}" "$args" "$trace_sep" \
+    >>"$trace_file"
+}
+trace_now run_t0
+
+# Progress: each step appends one event to <run-dir>/progress.ndjson (PROGRESS=0 turns it off),
+# rendered by `skilled_reviews_cli.py watch`. Events: run-start, queued, started, retried,
+# finished, cached, done, cancelled, validated, run-end.
+progress_file=""
+progress_event() {
+  # progress_event <event> [key=value ...]; integer values are written as JSON numbers
+  [[ -n "$progress_file" ]] || return 0
+  local event="$1" kv value fields="" now="${EPOCHREALTIME:-}"
+  shift
+  [[ -n "$now" ]] || now="$(date +%s)"
+  for kv in "$@"; do
+    value="${kv#*=}"
+    if [[ ! "$value" =~ ^(0|-?[1-9][0-9]*)$ ]]; then
+      value="${value//\\/\\\\}"
+      value="\"${value//\"/\\\"}\""
+    fi
+    fields+=",\"${kv%%=*}\":${value}"
+  done
+  printf '{"ts":%s,"runner":"%s","pid":%s,"run":"%s","event":"%s"%s}\n' \
+    "${now/,/.}" "$trace_cat" "$$" "$run_id" "$event" "$fields" >>"$progress_file"
+}
+
 repo_root="$(git rev-parse --show-toplevel 2>/dev/null || true)"
 if [[ -z "$repo_root" ]]; then
   echo "Not in a git repository; cannot locate repo root." >&2
@@ -77,31 +154,99 @@ fi
 
 constraints="${CONSTRAINTS:-none}"
 diff_file="${DIFF_FILE:-}"
+review_checkout="${REVIEW_CHECKOUT:-}"
+if [[ -n "$review_checkout" && ! -d "$review_checkout" ]]; then
+  echo "REVIEW_CHECKOUT is not a directory: $review_checkout" >&2
+  exit 1
+fi
 diff_mode="${DIFF_MODE:-auto}"
 strict_staged="${STRICT_STAGED:-0}"
 diff_summary_out="${DIFF_SUMMARY_OUT:-}"
 exec_timeout_sec="${EXEC_TIMEOUT_SEC:-}"
 validate="${VALIDATE:-1}"
 format_json="${FORMAT_JSON:-1}"
+hard_trigger_scan="${HARD_TRIGGER_SCAN:-1}"
+hard_triggers_file="${HARD_TRIGGERS_FILE:-}"
+facets_file="${FACETS_FILE:-}"
+facet_select="${FACET_SELECT:-all}"
+facets_must_run="${FACETS_MUST_RUN:-correctness}"
+facet_min_yield="${FACET_MIN_YIELD:-}"
+cascade="${CASCADE:-0}"
+cascade_model="${CASCADE_MODEL:-}"
+cascade_effort="${CASCADE_EFFORT:-low}"
+cascade_min_confidence="${CASCADE_MIN_CONFIDENCE:-0.7}"
+case "$cascade" in
+  0|1) ;;
+  *)
+    echo "Invalid CASCADE: $cascade (expected 0|1)" >&2
+    exit 1
+    ;;
+esac
+hedge="${HEDGE:-0}"
+hedge_max="${HEDGE_MAX:-2}"
+hedge_after_sec="${HEDGE_AFTER_SEC:-}"
+if [[ "$hedge" != "0" && "$hedge" != "1" ]]; then
+  echo "Invalid HEDGE: $hedge (expected 0|1)" >&2
+  exit 1
+fi
+if [[ ! "$hedge_max" =~ ^[0-9]+$ ]]; then
+  echo "Invalid HEDGE_MAX: $hedge_max (expected a non-negative integer)" >&2
+  exit 1
+fi
+if [[ -n "$hedge_after_sec" && ! "$hedge_after_sec" =~ ^[1-9][0-9]*$ ]]; then
+  echo "Invalid HEDGE_AFTER_SEC: $hedge_after_sec (expected whole seconds > 0)" >&2
+  exit 1
+fi
+fail_fast="${FAIL_FAST:-0}"
+# Infrastructure errors (auth, quota, network, unknown model) fail every facet the same way.
+fail_fast_pattern="${FAIL_FAST_PATTERN:-not logged in|login required|unauthori[sz]ed|forbidden|invalid api key|api key|authenticat|insufficient_quota|quota exceeded|rate limit|too many requests|(^|[^0-9])(401|403|429)([^0-9]|$)|could not resolve|connection refused|connection reset|network is unreachable|ENOTFOUND|ECONNREFUSED|model .*(not found|does not exist|not supported)|unknown model|no worker reachable}"
+if [[ "$fail_fast" != "0" && "$fail_fast" != "1" ]]; then
+  echo "Invalid FAIL_FAST: $fail_fast (expected 0|1)" >&2
+  exit 1
+fi
+# WORKERS=host[:slots],...: facet calls run on these hosts over ssh (see worker_pool.py).
+workers="${WORKERS:-}"
+if [[ -z "$hard_triggers_file" && -f "${repo_root}/.skilled-reviews/.reviews/hard-triggers.json" ]]; then
+  hard_triggers_file="${repo_root}/.skilled-reviews/.reviews/hard-triggers.json"
+fi
+if [[ -z "$facets_file" ]]; then
+  if [[ -f "${repo_root}/.skilled-reviews/.reviews/facets.json" ]]; then
+    facets_file="${repo_root}/.skilled-reviews/.reviews/facets.json"
+  else
+    facets_file="${script_dir}/facets.json"
+  fi
+fi
 
 schema="${SCHEMA_PATH:-${repo_root}/.skilled-reviews/.reviews/schemas/review-v2.schema.json}"
 codex_bin="${CODEX_BIN:-codex}"
 model="${MODEL:-gpt-5.2-codex}"
 effort="${REASONING_EFFORT:-high}"
-if ! command -v "$codex_bin" >/dev/null 2>&1; then
+codex_cassette="${CODEX_CASSETTE:-}"
+case "$codex_cassette" in
+  ""|record|replay) ;;
+  *)
+    echo "Invalid CODEX_CASSETTE: $codex_cassette (expected record|replay)" >&2
+    exit 1
+    ;;
+esac
+# Replay serves recorded answers and WORKERS run codex elsewhere, so codex itself is not needed.
+if [[ "$codex_cassette" != "replay" && -z "$workers" ]] && ! command -v "$codex_bin" >/dev/null 2>&1; then
   echo "codex not found: $codex_bin" >&2
   exit 1
 fi
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "python3 not found (required for the diff snapshot, facet registry and run-id bookkeeping)" >&2
+  exit 1
+fi
 
+# Resolved even without EXEC_TIMEOUT_SEC: facets.json entries can set their own timeout_sec.
 timeout_bin=""
-if [[ -n "$exec_timeout_sec" ]]; then
-  if command -v timeout >/dev/null 2>&1; then
-    timeout_bin="timeout"
-  elif command -v gtimeout >/dev/null 2>&1; then
-    timeout_bin="gtimeout"
-  else
-    echo "EXEC_TIMEOUT_SEC set but no timeout/gtimeout found; running without timeout" >&2
-  fi
+if command -v timeout >/dev/null 2>&1; then
+  timeout_bin="timeout"
+elif command -v gtimeout >/dev/null 2>&1; then
+  timeout_bin="gtimeout"
+elif [[ -n "$exec_timeout_sec" ]]; then
+  echo "EXEC_TIMEOUT_SEC set but no timeout/gtimeout found; running without timeout" >&2
 fi
 
 run_root="${repo_root}/.skilled-reviews/.reviews/reviewed_scopes/${scope_id}"
@@ -110,14 +255,22 @@ if [[ -z "$run_id" ]]; then
   if [[ -f "$run_id_file" ]]; then
     candidate="$(cat "$run_id_file")"
     if [[ "$candidate" =~ ^[A-Za-z0-9._-]+$ && "$candidate" != "." && "$candidate" != ".." ]]; then
+      # Deliberate: a run without a run-id continues the scope's current run (review cycle).
+      # Overlapping runs must pass distinct run-ids.
       run_id="$candidate"
+      echo "Reusing run-id from .current_run: $run_id (pass a run-id or RUN_ID for a separate run)" >&2
     else
       echo "Invalid .current_run detected; generating a new run-id" >&2
       run_id=""
     fi
   fi
   if [[ -z "$run_id" ]]; then
-    run_id="$(date +"%Y%m%d_%H%M%S")"
+    if [[ "$dry_run" != "1" ]]; then
+      # Claimed with an exclusive mkdir: runs started in the same second get -02, -03, ...
+      run_id="$(python3 "$script_dir/skilled_reviews_cli.py" run-alloc alloc "$run_root")"
+    else
+      run_id="$(date +"%Y%m%d_%H%M%S")"
+    fi
   fi
 fi
 
@@ -191,6 +344,9 @@ if [[ "$dry_run" == "1" ]]; then
 
   echo "Plan:" >&2
   printf -- '- repo_root: %s\n' "$repo_root" >&2
+  if [[ -n "$review_checkout" ]]; then
+    printf -- '- review_checkout: %s\n' "$review_checkout" >&2
+  fi
   printf -- '- scope_id: %s\n' "$scope_id" >&2
   printf -- '- run_id: %s\n' "$run_id" >&2
   printf -- '- schema: %s\n' "$schema" >&2
@@ -208,10 +364,32 @@ if [[ "$dry_run" == "1" ]]; then
   if [[ -n "$exec_timeout_sec" ]]; then
     printf -- '- exec_timeout_sec: %s\n' "$exec_timeout_sec" >&2
   fi
+  printf -- '- hard_trigger_scan: %s\n' "$hard_trigger_scan" >&2
+  if [[ -n "$hard_triggers_file" ]]; then
+    printf -- '- hard_triggers_file: %s\n' "$hard_triggers_file" >&2
+  fi
+  printf -- '- facets_file: %s\n' "$facets_file" >&2
+  printf -- '- facet_select: %s\n' "$facet_select" >&2
+  if [[ "$cascade" == "1" ]]; then
+    printf -- '- cascade: first pass %s / %s, escalate below confidence %s\n' \
+      "${cascade_model:-<facet model>}" "$cascade_effort" "$cascade_min_confidence" >&2
+  fi
+  if [[ "$hedge" == "1" ]]; then
+    printf -- '- hedge: after %s, at most %s per run\n' "${hedge_after_sec:+${hedge_after_sec}s}${hedge_after_sec:-p90 latency}" "$hedge_max" >&2
+  fi
+  if [[ -n "$workers" ]]; then
+    printf -- '- workers: %s\n' "$workers" >&2
+  fi
   exit 0
 fi
 
+if [[ -n "$workers" ]] && ! python3 "$script_dir/skilled_reviews_cli.py" workers status --workers "$workers" >/dev/null; then
+  exit 1
+fi
+
+trace_now t_stage
 "$ensure_script"
+trace_span schemas "$t_stage"
 
 if [[ ! -f "$schema" ]]; then
   echo "Schema not found: $schema" >&2
@@ -220,10 +398,73 @@ fi
 
 mkdir -p "$run_root"
 mkdir -p "$out_dir"
+if [[ "${PROGRESS:-1}" != "0" ]]; then
+  progress_file="${out_dir}/progress.ndjson"
+fi
+progress_event run-start scope="$scope_id"
+# SKILLED_REVIEWS_PROFILE=1: the Python stages dump cProfile stats into the run dir.
+if [[ "${SKILLED_REVIEWS_PROFILE:-}" == "1" ]]; then
+  export SKILLED_REVIEWS_PROFILE_DIR="$out_dir"
+fi
+
+# Facet workers run in the background. Any early exit (a signal, a `set -e` failure or FAIL_FAST)
+# stops every live worker with its whole process tree (codex, timeout, limiter, cassette wrapper,
+# hedge calls) so nothing keeps using quota or writes into the run dir afterwards, and removes the
+# fragments those workers were writing.
+pids=()
+slugs=()
+outs=()
+
+# Descendants of a pid, from one ps snapshot (breadth-first).
+proc_tree() {
+  ps -A -o pid= -o ppid= 2>/dev/null | awk -v root="$1" '
+    { kids[$2] = kids[$2] " " $1 }
+    END {
+      n = split(kids[root], q, " ")
+      for (i = 1; i <= n; i++) {
+        print q[i]
+        m = split(kids[q[i]], c, " ")
+        for (j = 1; j <= m; j++) q[++n] = c[j]
+      }
+    }'
+}
+
+# Terminate a process and all its descendants. The tree is stopped first so it cannot fork
+# between the snapshot and the signal; `timeout` runs codex in its own process group, so a
+# process-group kill alone would miss it.
+kill_tree() {
+  local tree
+  kill -STOP "$1" 2>/dev/null || return 0
+  tree="$(proc_tree "$1")"
+  kill -STOP $tree 2>/dev/null || true
+  kill -TERM "$1" $tree 2>/dev/null || true
+  kill -CONT "$1" $tree 2>/dev/null || true
+}
+
+stop_workers() {
+  local i s cancelled=()
+  (( ${#pids[@]} > 0 )) || return 0
+  for i in "${!pids[@]}"; do
+    if kill -0 "${pids[$i]}" 2>/dev/null; then
+      kill_tree "${pids[$i]}"
+      cancelled+=("${slugs[$i]}")
+    fi
+  done
+  (( ${#cancelled[@]} > 0 )) || return 0
+  for i in "${!pids[@]}"; do
+    wait "${pids[$i]}" 2>/dev/null || true
+  done
+  for s in "${cancelled[@]}"; do
+    progress_event cancelled facet="$s"
+    rm -f "${out_dir}/${s}.json" "${out_dir}/${s}.json.a" "${out_dir}/${s}.json.b" "${out_dir}/cascade/${s}.first.json"
+  done
+  printf 'Cancelled facets: %s\n' "${cancelled[*]}" >&2
+}
 
-tmp_diff=""
+diff_fingerprint=""
 cleanup() {
   status=$?
+  stop_workers
   end_epoch=$(date +%s)
   end_ts=$(date +"%Y-%m-%dT%H:%M:%S%z")
   if [[ -n "${start_epoch:-}" ]]; then
@@ -232,12 +473,23 @@ cleanup() {
   else
     echo "End: $end_ts (exit=${status})" >&2
   fi
-  if [[ -n "$tmp_diff" && -f "$tmp_diff" ]]; then
-    rm -f "$tmp_diff"
+  run_ended="${EPOCHREALTIME:-$end_epoch}"
+  if [[ -d "${out_dir:-}" ]]; then
+    # Run record for the history index (`skilled_reviews_cli.py index`).
+    printf '{"runner":"review-parallel","start":%s,"end":%s,"exit":%s,"diff":"%s"}\n' \
+      "${run_started/,/.}" "${run_ended/,/.}" "$status" "$diff_fingerprint" >>"${out_dir}/timings.ndjson"
   fi
+  progress_event run-end exit="$status"
+  trace_span run "$run_t0" scope="$scope_id" run="$run_id" exit="$status"
 }
 trap cleanup EXIT
+# Ctrl-C, or TERM from a parent timeout, exits through cleanup (which stops the facet workers).
+trap 'exit 130' INT
+trap 'exit 143' TERM
+trap 'exit 129' HUP
 
+# The diff is captured once into <run-dir>/diff.patch; every later stage reads that file.
+trace_now t_stage
 diff_source=""
 if [[ -n "$diff_file" ]]; then
   if [[ ! -f "$diff_file" ]]; then
@@ -245,26 +497,26 @@ if [[ -n "$diff_file" ]]; then
     exit 1
   fi
 else
-  tmp_diff="$(mktemp)"
+  captured_diff="${out_dir}/diff.patch"
   case "$diff_mode" in
     staged)
-      git -C "$repo_root" diff --no-color --staged > "$tmp_diff"
+      git -C "$repo_root" diff --no-color --staged > "$captured_diff"
       diff_source="staged"
       ;;
     worktree)
-      git -C "$repo_root" diff --no-color > "$tmp_diff"
+      git -C "$repo_root" diff --no-color > "$captured_diff"
       diff_source="worktree"
       ;;
     auto|"")
-      git -C "$repo_root" diff --no-color --staged > "$tmp_diff"
-      if [[ -s "$tmp_diff" ]]; then
+      git -C "$repo_root" diff --no-color --staged > "$captured_diff"
+      if [[ -s "$captured_diff" ]]; then
         diff_source="staged"
       else
         if [[ "$strict_staged" == "1" ]]; then
           echo "STRICT_STAGED=1 and staged diff is empty" >&2
           exit 1
         fi
-        git -C "$repo_root" diff --no-color > "$tmp_diff"
+        git -C "$repo_root" diff --no-color > "$captured_diff"
         diff_source="worktree"
       fi
       ;;
@@ -273,7 +525,7 @@ else
       exit 1
       ;;
   esac
-  diff_file="$tmp_diff"
+  diff_file="$captured_diff"
 fi
 
 if [[ -n "$diff_source" ]]; then
@@ -284,36 +536,312 @@ if [[ ! -s "$diff_file" ]]; then
   echo "Diff is empty: $diff_file" >&2
   exit 1
 fi
+trace_span diff "$t_stage" source="${diff_source:-file}"
 
+# Diff snapshot: one parse writes diff.patch, diff-manifest.json (hashes, per-file counts, modes,
+# subsystems, hunks) and the `git apply --stat`-style summary; prints the git blob id.
 if [[ -z "$diff_summary_out" ]]; then
   diff_summary_out="${out_dir}/diff-summary.txt"
 fi
 mkdir -p "$(dirname "$diff_summary_out")"
-if ! git -C "$repo_root" apply --stat "$diff_file" > "$diff_summary_out" 2>/dev/null; then
-  echo "Failed to compute diff summary from diff file: $diff_file" >&2
-  exit 1
+trace_now t_stage
+diff_fingerprint="$(python3 "$script_dir/skilled_reviews_cli.py" diff-snapshot snapshot "$diff_file" --out-dir "$out_dir" \
+  --source "${diff_source:-file}" --summary-out "$diff_summary_out")"
+diff_file="${out_dir}/diff.patch"
+diff_manifest="${out_dir}/diff-manifest.json"
+trace_span diff-snapshot "$t_stage"
+
+# Hard-trigger scan: deterministic hints for the security facet (and review-cycle mode selection).
+hard_triggers_summary=""
+if [[ "$hard_trigger_scan" != "0" ]]; then
+  scan_cmd=(python3 "$script_dir/skilled_reviews_cli.py" scan-hard-triggers "$diff_file" --out "${out_dir}/hard-triggers.json" --summary-out "${out_dir}/hard-triggers.txt")
+  if [[ -n "$hard_triggers_file" ]]; then
+    scan_cmd+=(--config "$hard_triggers_file")
+  fi
+  trace_now t_stage
+  "${scan_cmd[@]}"
+  trace_span hard-trigger-scan "$t_stage"
+  hard_triggers_summary="${out_dir}/hard-triggers.txt"
+fi
+
+# Facets come from the facet registry (facets.json); FACET_SELECT picks the subset to run.
+# reg_* are parallel arrays indexed by registry position ("-" = use MODEL/REASONING_EFFORT/EXEC_TIMEOUT_SEC);
+# facets holds the indices to run.
+registry_list="$(python3 "$script_dir/skilled_reviews_cli.py" facets list --registry "$facets_file")"
+reg_slugs=()
+reg_names=()
+reg_timeouts=()
+reg_models=()
+reg_efforts=()
+facets=()
+while IFS=$'\t' read -r f_slug f_name f_timeout f_model f_effort; do
+  [[ -n "$f_slug" ]] || continue
+  facets+=("${#reg_slugs[@]}")
+  reg_slugs+=("$f_slug")
+  reg_names+=("$f_name")
+  reg_timeouts+=("$f_timeout")
+  reg_models+=("$f_model")
+  reg_efforts+=("$f_effort")
+done <<< "$registry_list"
+
+# The selection is recorded in the run dir so pr-review and the validator use the same set;
+# FACET_SELECT=all removes a stale one left by an earlier run with the same run-id.
+selection_file="${out_dir}/facet-selection.json"
+if [[ "$facet_select" == "all" ]]; then
+  rm -f "$selection_file"
+else
+  select_cmd=(python3 "$script_dir/skilled_reviews_cli.py" select-facets "$diff_file" --manifest "$diff_manifest"
+    --facets "$(IFS=,; echo "${reg_slugs[*]}")" --registry "$facets_file" --mode "$facet_select" --must-run "$facets_must_run"
+    --history-root "${repo_root}/.skilled-reviews/.reviews/reviewed_scopes" --exclude-run "$out_dir" --out "$selection_file")
+  if [[ -n "$facet_min_yield" ]]; then
+    select_cmd+=(--min-yield "$facet_min_yield")
+  fi
+  if [[ -f "${out_dir}/hard-triggers.json" && -n "$hard_triggers_summary" ]]; then
+    select_cmd+=(--hard-triggers "${out_dir}/hard-triggers.json")
+  fi
+  trace_now t_stage
+  selected_csv="$("${select_cmd[@]}")"
+  trace_span facet-select "$t_stage" mode="$facet_select" selected="$selected_csv"
+  selected_facets=()
+  for i in "${facets[@]}"; do
+    case ",${selected_csv}," in
+      *",${reg_slugs[$i]},"*) selected_facets+=("$i") ;;
+    esac
+  done
+  if (( ${#selected_facets[@]} == 0 )); then
+    echo "Facet selection chose no facets: $selection_file" >&2
+    exit 1
+  fi
+  facets=("${selected_facets[@]}")
 fi
 
-# Facets are fixed in this script (slug:name).
-facets=(
-  "correctness:Correctness and logic"
-  "edge-cases:Edge cases and error handling"
-  "security:Security and data safety"
-  "performance:Performance and resource use"
-  "tests-observability:Tests and observability"
-  "design-consistency:Design/consistency with project rules"
-)
+# Per-facet diff slices: facets with a `slice` in the registry get only their relevant files
+# (<slices>/<slug>.diff) plus a manifest of the omitted ones; the rest review the full diff.
+slice_dir="${out_dir}/slices"
+rm -rf "$slice_dir"
+run_slugs=()
+for i in "${facets[@]}"; do
+  run_slugs+=("${reg_slugs[$i]}")
+done
+trace_now t_stage
+python3 "$script_dir/skilled_reviews_cli.py" facets slice "$diff_file" --registry "$facets_file" \
+  --out-dir "$slice_dir" --facets "$(IFS=,; echo "${run_slugs[*]}")"
+trace_span diff-slice "$t_stage"
+
+# One codex call for the current facet: run_facet_codex <model> <effort> <out> <tier> (prompt on stdin).
+run_facet_codex() {
+  local cmd codex_rc t_codex
+  trace_now t_codex
+  cmd=(
+    "$codex_bin" exec
+    --sandbox read-only
+    -m "$1"
+    -c "reasoning.effort=\"${2}\""
+    --output-last-message "$3"
+    --output-schema "$schema"
+    -
+  )
+  if [[ -n "$review_checkout" ]]; then
+    # The reviewer reads files from this checkout (e.g. the commit under review), not the cwd.
+    cmd=("${cmd[@]:0:2}" -C "$review_checkout" "${cmd[@]:2}")
+  fi
+  if [[ -n "$workers" ]]; then
+    cmd=(python3 "$script_dir/skilled_reviews_cli.py" workers run --workers "$workers" --tag "${scope_id}/${slug}" --metrics "${out_dir}/workers.ndjson" -- "${cmd[@]}")
+  fi
+  if [[ -n "$facet_timeout" && -n "$timeout_bin" ]]; then
+    cmd=("$timeout_bin" "$facet_timeout" "${cmd[@]}")
+  fi
+  if [[ -n "${CODEX_MAX_CONCURRENT:-}${CODEX_RPM:-}" ]]; then
+    cmd=(python3 "$script_dir/skilled_reviews_cli.py" codex-limit --tag "${scope_id}/${slug}" --metrics "${out_dir}/codex-queue.ndjson" -- "${cmd[@]}")
+  fi
+  if [[ -n "$codex_cassette" ]]; then
+    cmd=(python3 "$script_dir/skilled_reviews_cli.py" codex-cassette --repo-root "$repo_root" --run-id "$run_id" -- "${cmd[@]}")
+  fi
+  progress_event started facet="$slug" tier="$4" model="$1" effort="$2"
+  codex_rc=0
+  if [[ "$fail_fast" == "1" ]]; then
+    # Keep stderr to classify a failure; it is echoed once the call ends.
+    err_log="${out_dir}/logs/${3##*/}.stderr"
+    "${cmd[@]}" 2>"$err_log" || codex_rc="$?"
+    cat "$err_log" >&2
+    if (( codex_rc != 0 )) && reason="$(infra_error "$codex_rc" "$err_log")"; then
+      printf '%s (%s): %s\n' "$slug" "$4" "$reason" >>"$fail_fast_log"
+    fi
+  else
+    "${cmd[@]}" || codex_rc="$?"
+  fi
+  if [[ "$codex_cassette" == "replay" && "$codex_rc" == "0" ]]; then
+    progress_event cached facet="$slug" tier="$4"
+  else
+    progress_event finished facet="$slug" tier="$4" exit="$codex_rc"
+  fi
+  trace_span codex "$t_codex" facet="$slug" tier="$4" exit="$codex_rc"
+  return "$codex_rc"
+}
 
-pids=()
-slugs=()
-outs=()
+# FAIL_FAST=1: print why a failed call is an infrastructure error (exit 0), or nothing (exit 1).
+infra_error() {
+  case "$1" in
+    126|127)
+      echo "codex could not be started (exit $1)"
+      return 0
+      ;;
+  esac
+  grep -Ei -m 1 -e "$fail_fast_pattern" "$2" 2>/dev/null
+}
+
+# Terminate a background call with everything it started (codex, timeout, limiter, cassette wrapper).
+kill_call() {
+  kill_tree "$1"
+  wait "$1" 2>/dev/null || true
+}
 
-for f in "${facets[@]}"; do
-  slug="${f%%:*}"
-  name="${f#*:}"
+# HEDGE=1: run_facet_codex, plus one duplicate call when the first is still running after the
+# facet's hedge delay (HEDGE_AFTER_SEC, else its p90 latency). Slots (mkdir is atomic) cap the
+# duplicates at HEDGE_MAX per run. The first valid fragment wins; the other call is killed.
+run_facet_hedged() {
+  local delay="$hedge_after_sec" prompt deadline k slot="" pid_a pid_b rc_a="" rc_b="" winner="" t_hedge
+  if [[ -z "$delay" && -f "${hedge_dir}/${slug}.${4}.delay" ]]; then
+    delay="$(cat "${hedge_dir}/${slug}.${4}.delay")"
+  fi
+  if [[ ! "$delay" =~ ^[0-9]+$ ]] || (( hedge_max == 0 )); then
+    run_facet_codex "$@"
+    return
+  fi
+  prompt="${hedge_dir}/${slug}.${4}.prompt.txt"
+  cat >"$prompt"
+  rm -f "${3}.a" "${3}.b"
+  run_facet_codex "$1" "$2" "${3}.a" "$4" <"$prompt" &
+  pid_a="$!"
+  deadline=$((SECONDS + delay))
+  while kill -0 "$pid_a" 2>/dev/null && (( SECONDS < deadline )); do
+    sleep 0.2
+  done
+  if kill -0 "$pid_a" 2>/dev/null; then
+    for ((k = 1; k <= hedge_max; k++)); do
+      if mkdir "${hedge_dir}/slot-${k}" 2>/dev/null; then
+        slot="$k"
+        break
+      fi
+    done
+  fi
+  if [[ -z "$slot" ]]; then
+    rc_a=0
+    wait "$pid_a" || rc_a="$?"
+    [[ ! -f "${3}.a" ]] || mv "${3}.a" "$3"
+    return "$rc_a"
+  fi
+  printf 'Hedge: %s (%s) still running after %ss; starting a duplicate call (%s/%s)\n' \
+    "$slug" "$4" "$delay" "$slot" "$hedge_max" >&2
+  hedge_used=1
+  progress_event retried facet="$slug" tier="$4" reason="hedge after ${delay}s"
+  trace_now t_hedge
+  run_facet_codex "$1" "$2" "${3}.b" "$4" <"$prompt" &
+  pid_b="$!"
+  while [[ -z "$winner" && ( -z "$rc_a" || -z "$rc_b" ) ]]; do
+    if [[ -z "$rc_a" ]] && ! kill -0 "$pid_a" 2>/dev/null; then
+      rc_a=0
+      wait "$pid_a" || rc_a="$?"
+      if [[ "$rc_a" == "0" ]] && python3 "$script_dir/skilled_reviews_cli.py" hedge valid "${3}.a" --slug "$slug" >/dev/null; then
+        winner=a
+      fi
+    fi
+    if [[ -z "$winner" && -z "$rc_b" ]] && ! kill -0 "$pid_b" 2>/dev/null; then
+      rc_b=0
+      wait "$pid_b" || rc_b="$?"
+      if [[ "$rc_b" == "0" ]] && python3 "$script_dir/skilled_reviews_cli.py" hedge valid "${3}.b" --slug "$slug" >/dev/null; then
+        winner=b
+      fi
+    fi
+    [[ -n "$winner" || ( -n "$rc_a" && -n "$rc_b" ) ]] || sleep 0.2
+  done
+  [[ -n "$rc_a" ]] || kill_call "$pid_a"
+  [[ -n "$rc_b" ]] || kill_call "$pid_b"
+  trace_span hedge "$t_hedge" facet="$slug" tier="$4" winner="${winner:-none}"
+  if [[ -z "$winner" ]]; then
+    # Both calls failed: keep the original call's output (if any) for the validator to report.
+    [[ ! -f "${3}.a" ]] || mv "${3}.a" "$3"
+    rm -f "${3}.b"
+    if [[ "$rc_a" != "0" ]]; then
+      return "$rc_a"
+    fi
+    return 1
+  fi
+  mv "${3}.${winner}" "$3"
+  rm -f "${3}.a" "${3}.b"
+  if [[ "$winner" == "a" ]]; then
+    printf 'Hedge: %s (%s) won by the original call\n' "$slug" "$4" >&2
+  else
+    printf 'Hedge: %s (%s) won by the duplicate call\n' "$slug" "$4" >&2
+  fi
+  return 0
+}
+
+# Every facet call is timed into facet-timings.ndjson (the history behind the hedge delays).
+run_facet_call() {
+  local t_start t_end call_rc=0
+  hedge_used=0
+  t_start="${EPOCHREALTIME:-$(date +%s)}"
+  if [[ "$hedge" == "1" ]]; then
+    run_facet_hedged "$@" || call_rc="$?"
+  else
+    run_facet_codex "$@" || call_rc="$?"
+  fi
+  t_end="${EPOCHREALTIME:-$(date +%s)}"
+  printf '{"facet":"%s","tier":"%s","start":%s,"end":%s,"exit":%s,"hedged":%s}\n' \
+    "$slug" "$4" "${t_start/,/.}" "${t_end/,/.}" "$call_rc" "$hedge_used" >>"${out_dir}/facet-timings.ndjson"
+  return "$call_rc"
+}
+
+hedge_dir="${out_dir}/hedge"
+rm -rf "$hedge_dir"
+if [[ "$hedge" == "1" ]]; then
+  mkdir -p "$hedge_dir"
+  if [[ -z "$hedge_after_sec" ]]; then
+    trace_now t_stage
+    python3 "$script_dir/skilled_reviews_cli.py" hedge delays --root "${repo_root}/.skilled-reviews/.reviews/reviewed_scopes" \
+      --out-dir "$hedge_dir" --exclude-run "$out_dir"
+    trace_span hedge-delays "$t_stage"
+  fi
+fi
+
+# CASCADE=1: each facet first runs at CASCADE_MODEL/CASCADE_EFFORT; the review-cascade check
+# escalates to the full configuration on failure, invalid output, Blocked/Question or low
+# confidence. cascade.ndjson records the tier of every fragment.
+cascade_dir="${out_dir}/cascade"
+rm -rf "$cascade_dir" "${out_dir}/cascade.ndjson"
+if [[ "$cascade" == "1" ]]; then
+  mkdir -p "$cascade_dir"
+fi
+
+fail_fast_log="${out_dir}/fail-fast.log"
+rm -f "$fail_fast_log"
+rm -rf "${out_dir}/logs"
+if [[ "$fail_fast" == "1" ]]; then
+  mkdir -p "${out_dir}/logs"
+fi
+
+trace_now t_facets
+for i in "${facets[@]}"; do
+  slug="${reg_slugs[$i]}"
+  name="${reg_names[$i]}"
   out="${out_dir}/${slug}.json"
+  facet_model="$model"
+  facet_effort="$effort"
+  facet_timeout="$exec_timeout_sec"
+  [[ "${reg_models[$i]}" == "-" ]] || facet_model="${reg_models[$i]}"
+  [[ "${reg_efforts[$i]}" == "-" ]] || facet_effort="${reg_efforts[$i]}"
+  [[ "${reg_timeouts[$i]}" == "-" ]] || facet_timeout="${reg_timeouts[$i]}"
+  facet_diff="$diff_file"
+  facet_manifest=""
+  if [[ -f "${slice_dir}/${slug}.diff" ]]; then
+    facet_diff="${slice_dir}/${slug}.diff"
+    facet_manifest="${slice_dir}/${slug}.omitted.txt"
+  fi
 
+  progress_event queued facet="$slug"
   {
+    trace_now t_prompt
     cat <<'PROMPT'
 Use review-parallel. Output JSON only using the schema.
 
@@ -345,29 +873,69 @@ PROMPT
     printf 'SoT: %s\n' "$sot"
     printf 'Tests: %s\n' "$tests"
     printf 'Constraints: %s\n' "$constraints"
+    if [[ "$slug" == "security" && -n "$hard_triggers_summary" ]]; then
+      printf 'Hard-trigger scan (local pattern match; confirm against the diff before reporting):\n'
+      cat "$hard_triggers_summary"
+    fi
+    if [[ -n "$facet_manifest" ]]; then
+      cat "$facet_manifest"
+    fi
     printf 'Diff:\n'
-    cat "$diff_file"
-  } | {
-    cmd=(
-      "$codex_bin" exec
-      --sandbox read-only
-      -m "$model"
-      -c "reasoning.effort=\"${effort}\""
-      --output-last-message "$out"
-      --output-schema "$schema"
-      -
-    )
-    if [[ -n "$exec_timeout_sec" && -n "$timeout_bin" ]]; then
-      cmd=("$timeout_bin" "$exec_timeout_sec" "${cmd[@]}")
+    cat "$facet_diff"
+    trace_span prompt "$t_prompt" facet="$slug"
+  } | (
+    # A ( ) subshell: bash skips EXIT traps set in a { } group at the end of a background pipeline.
+    trap 'progress_event done facet="$slug" exit="$?"' EXIT
+    first_model="${cascade_model:-$facet_model}"
+    # A first pass identical to the full configuration would only run the same call twice.
+    if [[ "$cascade" != "1" || ( "$first_model" == "$facet_model" && "$cascade_effort" == "$facet_effort" ) ]]; then
+      run_facet_call "$facet_model" "$facet_effort" "$out" full
+      exit
+    fi
+    prompt_file="${cascade_dir}/${slug}.prompt.txt"
+    first_out="${cascade_dir}/${slug}.first.json"
+    cat >"$prompt_file"
+    codex_rc=0
+    run_facet_call "$first_model" "$cascade_effort" "$first_out" first <"$prompt_file" || codex_rc="$?"
+    if reason="$(python3 "$script_dir/skilled_reviews_cli.py" cascade check "$first_out" --slug "$slug" \
+      --codex-exit "$codex_rc" --min-confidence "$cascade_min_confidence" \
+      --model "$first_model" --effort "$cascade_effort" --run-dir "$out_dir")"; then
+      cp "$first_out" "$out"
+      exit 0
     fi
-    "${cmd[@]}"
-  } &
+    printf 'Cascade: escalating %s (%s)\n' "$slug" "$reason" >&2
+    progress_event retried facet="$slug" tier=full reason="$reason"
+    codex_rc=0
+    run_facet_call "$facet_model" "$facet_effort" "$out" full <"$prompt_file" || codex_rc="$?"
+    python3 "$script_dir/skilled_reviews_cli.py" cascade check "$out" --slug "$slug" --tier full \
+      --codex-exit "$codex_rc" --model "$facet_model" --effort "$facet_effort" --run-dir "$out_dir" || true
+    exit "$codex_rc"
+  ) &
 
   pids+=("$!")
   slugs+=("$slug")
   outs+=("$out")
 done
 
+# FAIL_FAST=1: poll instead of waiting in order, so the first infrastructure error cancels the rest.
+if [[ "$fail_fast" == "1" ]]; then
+  while [[ ! -s "$fail_fast_log" ]]; do
+    running=0
+    for pid in "${pids[@]}"; do
+      if kill -0 "$pid" 2>/dev/null; then
+        running=1
+        break
+      fi
+    done
+    (( running )) || break
+    sleep 0.2
+  done
+  if [[ -s "$fail_fast_log" ]]; then
+    printf 'Fail-fast: infrastructure error in %s\n' "$(head -n 1 "$fail_fast_log")" >&2
+    stop_workers
+  fi
+fi
+
 failures=()
 for i in "${!pids[@]}"; do
   if ! wait "${pids[$i]}"; then
@@ -378,6 +946,13 @@ for i in "${!pids[@]}"; do
     failures+=("${slugs[$i]}")
   fi
 done
+trace_span facets "$t_facets" count="${#pids[@]}" failed="${#failures[@]}"
+# Every worker has been reaped; cleanup must not signal a recycled pid.
+pids=()
+
+if [[ -f "${out_dir}/cascade.ndjson" ]]; then
+  python3 "$script_dir/skilled_reviews_cli.py" cascade summary "$out_dir" >&2 || true
+fi
 
 if (( ${#failures[@]} > 0 )); then
   printf 'Failed facets: %s\n' "${failures[*]}" >&2
@@ -385,18 +960,21 @@ if (( ${#failures[@]} > 0 )); then
 fi
 
 if [[ "$validate" != "0" ]]; then
-  if ! command -v python3 >/dev/null 2>&1; then
-    echo "python3 not found (required for VALIDATE=1)" >&2
-    exit 1
-  fi
   facets_csv="$(IFS=,; echo "${slugs[*]}")"
-  validate_cmd=(python3 "$script_dir/validate_review_fragments.py" "$scope_id" "$run_id" --facets "$facets_csv" --schema "$schema")
+  validate_cmd=(python3 "$script_dir/skilled_reviews_cli.py" validate-fragments "$scope_id" "$run_id" --facets "$facets_csv" --schema "$schema")
   if [[ "$format_json" != "0" ]]; then
     validate_cmd+=(--format)
   fi
-  (cd "$repo_root" && "${validate_cmd[@]}")
+  trace_now t_stage
+  validate_rc=0
+  (cd "$repo_root" && "${validate_cmd[@]}") || validate_rc="$?"
+  if (( validate_rc != 0 )); then
+    progress_event validated status=failed
+    exit "$validate_rc"
+  fi
+  progress_event validated status=ok facets="${#slugs[@]}"
+  trace_span validate "$t_stage"
 fi
 
-tmp_run_file="${run_id_file}.tmp"
-printf '%s' "$run_id" > "$tmp_run_file"
-mv "$tmp_run_file" "$run_id_file"
+# Concurrent runs of one scope: the run that started last owns .current_run (see run_alloc.py).
+python3 "$script_dir/skilled_reviews_cli.py" run-alloc publish "$run_root" "$run_id" --started "$run_started"
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+import argparse
+import bisect
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from unified_diff import strip_prefix, unquote_path
+
+DEFAULT_CONFIG_PATH = ".skilled-reviews/.reviews/hard-triggers.json"
+MAX_HITS_PER_TRIGGER = 20
+MAX_EXCERPT_CHARS = 80
+
+# Hard triggers from review-cycle mode selection (authn/authz, secrets, payments,
+# migrations, destructive changes). Paths use fnmatch semantics (as in the
+# implementation guardrails); a leading "**/" also matches at the repo root.
+DEFAULT_TRIGGERS: List[dict] = [
+    {
+        "name": "authn-authz",
+        "paths": [
+            "**/auth/**",
+            "**/*auth*",
+            "**/*permission*",
+            "**/*rbac*",
+            "**/*acl*",
+            "**/*session*",
+        ],
+        "patterns": [
+            r"(?i)\b(authenticat\w*|authoriz\w*|oauth2?|openid|saml|jwt|csrf|rbac|access[_-]?control"
+            r"|permissions?|login|logout|passwords?)\b",
+        ],
+        "keywords": [
+            "authenticat", "authoriz", "oauth", "openid", "saml", "jwt", "csrf", "rbac",
+            "access", "permission", "login", "logout", "password",
+        ],
+    },
+    {
+        "name": "secrets",
+        "redact": True,
+        "paths": [
+            "**/.env",
+            "**/.env.*",
+            "**/*.pem",
+            "**/*.key",
+            "**/id_rsa*",
+            "**/*secret*",
+            "**/*credential*",
+        ],
+        "patterns": [
+            r"-----BEGIN [A-Z ]*PRIVATE KEY-----",
+            r"\bAKIA[0-9A-Z]{16}\b",
+            r"\bgh[pousr]_[A-Za-z0-9]{36,}\b",
+            r"\bxox[abprs]-[A-Za-z0-9-]{10,}\b",
+            r"(?i)(api[_-]?key|secret[_-]?key|access[_-]?token|client[_-]?secret|passw(or)?d)"
+            r"[\"']?\s*[:=]\s*[\"'][^\"'\s]{8,}[\"']",
+        ],
+        "keywords": [
+            "private key", "akia", "ghp_", "gho_", "ghu_", "ghs_", "ghr_", "xox",
+            "key", "secret", "token", "passw",
+        ],
+    },
+    {
+        "name": "payments",
+        "paths": [
+            "**/billing/**",
+            "**/payments/**",
+            "**/*payment*",
+            "**/*invoice*",
+            "**/*checkout*",
+        ],
+        "patterns": [
+            r"(?i)\b(stripe|paypal|braintree|adyen|payment[_-]?intent|refunds?|invoices?|billing|checkout)\b",
+        ],
+        "keywords": ["stripe", "paypal", "braintree", "adyen", "payment", "refund", "invoice", "billing", "checkout"],
+    },
+    {
+        "name": "migrations",
+        "paths": [
+            "**/migrations/**",
+            "**/migrate/**",
+            "**/alembic/**",
+            "**/*.sql",
+            "**/schema.rb",
+        ],
+        "patterns": [
+            r"(?i)\b(alter\s+table|create\s+table|create\s+(unique\s+)?index|add\s+column|rename\s+column)\b",
+        ],
+        "keywords": ["table", "index", "column"],
+    },
+    {
+        "name": "destructive",
+        "paths": [],
+        "patterns": [
+            r"(?i)\b(drop\s+(table|database|schema|column|index)|truncate\s+table|delete\s+from)\b",
+            r"\brm\s+-(rf|fr)\b",
+            r"\bgit\s+push\s+(-f|--force)\b",
+            r"\bshutil\.rmtree\b",
+        ],
+        "keywords": ["drop", "truncate", "delete", "-rf", "-fr", "push", "rmtree"],
+    },
+]
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+GLOBAL_FLAGS_RE = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def glob_to_regex(pattern: str) -> str:
+    translated = fnmatch.translate(pattern)
+    if pattern.startswith("**/"):
+        translated = f"(?:{translated}|{fnmatch.translate(pattern[3:])})"
+    return translated
+
+
+def _scoped(pattern: str) -> str:
+    # Leading global flags ("(?i)...") are only legal at the start of a whole regex;
+    # rewrite them as a scoped group so patterns can be joined into one alternation.
+    m = GLOBAL_FLAGS_RE.match(pattern)
+    if m:
+        return f"(?{m.group(1)}:{pattern[m.end():]})"
+    return f"(?:{pattern})"
+
+
+class TriggerSet:
+    """
+    All triggers compiled into combined matchers (one pass over paths, one over content).
+
+    Content matching is two-stage: a single alternation of each trigger's lowercase
+    `keywords` runs over the lowercased changed lines (literal alternation keeps the
+    regex engine on its fast prefix scan), and only lines it hits are re-checked with
+    the full per-trigger patterns, so overlapping triggers on one line are all reported.
+    Triggers without keywords are checked against every changed line.
+    """
+
+    def __init__(self, triggers: List[dict]) -> None:
+        self.names: List[str] = []
+        self.redact: Dict[str, bool] = {}
+        self.path_res: Dict[str, "re.Pattern[str]"] = {}
+        self.content_res: Dict[str, "re.Pattern[str]"] = {}
+        self.unfiltered: List[str] = []
+        path_alts: List[str] = []
+        keywords: List[str] = []
+
+        for trig in triggers:
+            name = trig["name"]
+            self.names.append(name)
+            self.redact[name] = bool(trig.get("redact", False))
+            paths = [p for p in trig.get("paths", []) if p]
+            patterns = [p for p in trig.get("patterns", []) if p]
+            if paths:
+                alt = "|".join(f"(?:{glob_to_regex(p)})" for p in paths)
+                self.path_res[name] = re.compile(alt)
+                path_alts.append(f"(?:{alt})")
+            if patterns:
+                self.content_res[name] = re.compile("|".join(_scoped(p) for p in patterns))
+                trig_keywords = [k.lower() for k in trig.get("keywords", []) if k]
+                if trig_keywords:
+                    keywords.extend(trig_keywords)
+                else:
+                    self.unfiltered.append(name)
+
+        self.any_path = re.compile("|".join(path_alts)) if path_alts else None
+        unique = sorted(set(keywords), key=lambda k: (-len(k), k))
+        self.keyword_re = re.compile("|".join(re.escape(k) for k in unique)) if unique else None
+
+    def match_path(self, path: str) -> List[str]:
+        if self.any_path is None or not self.any_path.match(path):
+            return []
+        return [name for name, rx in self.path_res.items() if rx.match(path)]
+
+    def candidate_lines(self, texts: List[str]) -> Iterable[int]:
+        """Yield indexes of changed lines that may match any content pattern."""
+        if self.unfiltered:
+            yield from range(len(texts))
+            return
+        if self.keyword_re is None or not texts:
+            return
+        # Offsets come from the lowercased lines: lower() can change a line's length ("İ" -> "i̇").
+        lowered = [text.lower() for text in texts]
+        blob = "\n".join(lowered)
+        starts = [0]
+        pos = 0
+        for text in lowered:
+            pos += len(text) + 1
+            starts.append(pos)
+        last = -1
+        for m in self.keyword_re.finditer(blob):
+            idx = bisect.bisect_right(starts, m.start()) - 1
+            if idx != last:
+                last = idx
+                yield idx
+
+    def match_content(self, text: str) -> List[Tuple[str, str]]:
+        hits = []
+        for name, rx in self.content_res.items():
+            m = rx.search(text)
+            if m:
+                hits.append((name, m.group(0)))
+        return hits
+
+
+def _validate_trigger(obj: object, where: str) -> dict:
+    if not isinstance(obj, dict):
+        raise ValueError(f"{where} must be an object")
+    name = obj.get("name")
+    if not isinstance(name, str) or not re.match(r"^[A-Za-z0-9._-]+$", name):
+        raise ValueError(f"{where}.name must match [A-Za-z0-9._-]+")
+    for key in ("paths", "patterns", "keywords"):
+        value = obj.get(key, [])
+        if not isinstance(value, list) or not all(isinstance(x, str) for x in value):
+            raise ValueError(f"{where}.{key} must be an array of strings")
+        for pat in value if key == "patterns" else []:
+            try:
+                re.compile(pat)
+            except re.error as exc:
+                raise ValueError(f"{where}.patterns: invalid regex {pat!r}: {exc}") from exc
+    return {
+        "name": name,
+        "paths": list(obj.get("paths", [])),
+        "patterns": list(obj.get("patterns", [])),
+        "keywords": list(obj.get("keywords", [])),
+        "redact": bool(obj.get("redact", False)),
+    }
+
+
+def load_triggers(config_path: Optional[str]) -> List[dict]:
+    """
+    Load trigger definitions.
+
+    Config (JSON): {"extend_defaults": true, "triggers": [{"name", "paths", "patterns", "keywords", "redact"}]}
+    With extend_defaults=true (default), a trigger with an existing name replaces the default one.
+    `keywords` are case-insensitive literals; every pattern match must contain at least one
+    of them (omit keywords to check the patterns against every changed line).
+    """
+    triggers = [dict(t) for t in DEFAULT_TRIGGERS]
+    if not config_path:
+        return triggers
+
+    with open(config_path, "r", encoding="utf-8") as fh:
+        doc = json.load(fh)
+    if not isinstance(doc, dict):
+        raise ValueError("config root must be an object")
+    raw = doc.get("triggers", [])
+    if not isinstance(raw, list):
+        raise ValueError("triggers must be an array")
+    custom = [_validate_trigger(t, f"triggers[{i}]") for i, t in enumerate(raw)]
+
+    if doc.get("extend_defaults", True) is False:
+        return custom
+    by_name = {t["name"]: t for t in triggers}
+    for trig in custom:
+        by_name[trig["name"]] = trig
+    return list(by_name.values())
+
+
+def _excerpt(text: str, redact: bool) -> str:
+    text = text.strip()
+    if redact:
+        return (text[:4] + "***") if len(text) > 4 else "***"
+    if len(text) > MAX_EXCERPT_CHARS:
+        return text[: MAX_EXCERPT_CHARS - 1] + "…"
+    return text
+
+
+def scan_diff(lines: Iterable[str], triggers: TriggerSet) -> dict:
+    """
+    Stream a unified diff once and collect trigger hits.
+
+    Added lines are reported with their new-file line number ("+"), removed lines with
+    their old-file line number ("-"). Deleted files also fire the "destructive" trigger.
+    """
+    hit_counts: Dict[str, int] = {name: 0 for name in triggers.names}
+    hits: Dict[str, List[dict]] = {name: [] for name in triggers.names}
+    path_hits: Dict[str, List[str]] = {name: [] for name in triggers.names}
+    files: List[str] = []
+    sha = hashlib.sha256()
+
+    # Changed lines are buffered as parallel arrays; content matching runs once at the end.
+    texts: List[str] = []
+    locs: List[Tuple[int, int, str]] = []
+
+    def record(name: str, entry: dict) -> None:
+        hit_counts[name] += 1
+        if len(hits[name]) < MAX_HITS_PER_TRIGGER:
+            hits[name].append(entry)
+
+    current = -1
+    deleted: List[int] = []
+
+    def enter_file(path: str) -> None:
+        nonlocal current
+        if not path or path == "/dev/null":
+            return
+        if current >= 0 and files[current] == path:
+            return
+        files.append(path)
+        current = len(files) - 1
+        for name in triggers.match_path(path):
+            path_hits[name].append(path)
+
+    old_line = new_line = 0
+    old_left = new_left = 0
+    for raw in lines:
+        sha.update(raw.encode("utf-8", "surrogateescape"))
+        line = raw.rstrip("\n").rstrip("\r")
+
+        if old_left > 0 or new_left > 0:
+            tag = line[:1]
+            if tag == "+":
+                texts.append(line[1:])
+                locs.append((current, new_line, "+"))
+                new_line += 1
+                new_left -= 1
+                continue
+            if tag == "-":
+                texts.append(line[1:])
+                locs.append((current, old_line, "-"))
+                old_line += 1
+                old_left -= 1
+                continue
+            if tag == " " or line == "":
+                old_line += 1
+                new_line += 1
+                old_left -= 1
+                new_left -= 1
+                continue
+            if tag == "\\":
+                continue
+            # Hunk counts do not match the body; resync on the next header.
+            old_left = new_left = 0
+
+        if line.startswith("diff --git "):
+            parts = line.split(" ")
+            if len(parts) == 4:
+                enter_file(strip_prefix(parts[3]))
+            continue
+        if line.startswith("+++ "):
+            enter_file(strip_prefix(line[4:].split("\t", 1)[0]))
+            continue
+        if line.startswith("rename to ") or line.startswith("copy to "):
+            enter_file(unquote_path(line.split(" ", 2)[2]))
+            continue
+        if line.startswith("deleted file mode "):
+            deleted.append(current)
+            continue
+        m = HUNK_RE.match(line)
+        if m:
+            old_line = int(m.group(1))
+            old_left = int(m.group(2)) if m.group(2) is not None else 1
+            new_line = int(m.group(3))
+            new_left = int(m.group(4)) if m.group(4) is not None else 1
+
+    for idx in triggers.candidate_lines(texts):
+        matched = triggers.match_content(texts[idx])
+        if not matched:
+            continue
+        file_idx, line_no, side = locs[idx]
+        path = files[file_idx] if file_idx >= 0 else "<unknown>"
+        for name, text in matched:
+            record(name, {"path": path, "line": line_no, "side": side,
+                          "excerpt": _excerpt(text, triggers.redact[name])})
+
+    if "destructive" in hit_counts:
+        for file_idx in deleted:
+            path = files[file_idx] if file_idx >= 0 else "<unknown>"
+            record("destructive", {"path": path, "line": 0, "side": "-", "excerpt": "file deleted"})
+
+    triggers_out: Dict[str, dict] = {}
+    fired: List[str] = []
+    for name in triggers.names:
+        if not hit_counts[name] and not path_hits[name]:
+            continue
+        fired.append(name)
+        triggers_out[name] = {
+            "paths": path_hits[name],
+            "hit_count": hit_counts[name],
+            "hits": hits[name],
+        }
+
+    return {
+        "version": 1,
+        "diff_sha256": sha.hexdigest(),
+        "files_scanned": len(files),
+        "lines_scanned": len(texts),
+        "fired": fired,
+        "triggers": triggers_out,
+    }
+
+
+def format_prompt_summary(result: dict) -> str:
+    if not result["fired"]:
+        return "- none fired\n"
+    out: List[str] = []
+    for name in result["fired"]:
+        info = result["triggers"][name]
+        out.append(f"- {name}: {info['hit_count']} content hit(s), {len(info['paths'])} path match(es)")
+        for path in info["paths"][:5]:
+            out.append(f"  - path: {path}")
+        for hit in info["hits"][:5]:
+            where = f"{hit['path']}:{hit['line']}" if hit["line"] else hit["path"]
+            out.append(f"  - {where} ({hit['side']}) {hit['excerpt']}")
+        extra = info["hit_count"] - min(5, len(info["hits"]))
+        if extra > 0:
+            out.append(f"  - ...({extra} more)")
+    return "\n".join(out) + "\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Scan a unified diff for review hard triggers (authn/authz, secrets, payments, migrations, destructive)."
+    )
+    parser.add_argument("diff_file", help="Unified diff to scan ('-' for stdin)")
+    parser.add_argument(
+        "--config",
+        default="",
+        help=f"Trigger config JSON (default: {DEFAULT_CONFIG_PATH} when present)",
+    )
+    parser.add_argument("--out", default="", help="Write the JSON result here (default: stdout)")
+    parser.add_argument(
+        "--summary-out",
+        default="",
+        help="Also write a short prompt-ready summary here",
+    )
+    args = parser.parse_args(argv)
+
+    config_path = args.config.strip()
+    if not config_path and os.path.isfile(DEFAULT_CONFIG_PATH):
+        config_path = DEFAULT_CONFIG_PATH
+    if config_path and not os.path.isfile(config_path):
+        eprint(f"trigger config not found: {config_path}")
+        return 1
+
+    try:
+        triggers = TriggerSet(load_triggers(config_path or None))
+    except Exception as exc:
+        eprint(f"invalid trigger config: {exc}")
+        return 1
+
+    started = time.perf_counter()
+    if args.diff_file == "-":
+        result = scan_diff(sys.stdin, triggers)
+    else:
+        with open(args.diff_file, "r", encoding="utf-8", errors="surrogateescape") as fh:
+            result = scan_diff(fh, triggers)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    result["config"] = config_path or "builtin"
+
+    text = json.dumps(result, ensure_ascii=False, indent=2) + "\n"
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text)
+    if args.summary_out:
+        with open(args.summary_out, "w", encoding="utf-8") as fh:
+            fh.write(format_prompt_summary(result))
+
+    fired = ", ".join(result["fired"]) if result["fired"] else "none"
+    eprint(f"Hard triggers: {fired} ({result['files_scanned']} files, {result['elapsed_ms']}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Choose which review-parallel facets to run for a diff.
+
+Modes (FACET_SELECT in run_review_parallel.sh):
+  all     every facet (no selection)
+  auto    facets relevant to the diff's file classes, adjusted by history
+  <csv>   exactly these facet slugs
+
+Auto mode classifies changed paths as docs / tests / config / code. A facet's static prior is
+1 when its `classes` in the facet registry (facets.json) cover one of the diff's classes. The prior is blended with the historical yield of
+past review runs with the same diff class (read from their diff-manifest.json, or diff-summary.txt for
+older runs, and fragments):
+
+  rate = (runs with a P0-P2 finding + prior * PRIOR_WEIGHT) / (runs + PRIOR_WEIGHT)
+
+A facet runs when its rate reaches --min-yield, when it is must-run, or (security) when the
+hard-trigger scan fired. History therefore only overrides the prior once it has enough runs.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from diff_manifest import MANIFEST_FILE, load_manifest, manifest_paths
+from facet_registry import DIFF_CLASSES, load_registry, registry_path
+from scan_hard_triggers import glob_to_regex
+from unified_diff import strip_prefix
+
+HISTORY_ROOT = ".skilled-reviews/.reviews/reviewed_scopes"
+SELECTION_FILE = "facet-selection.json"
+PRIOR_WEIGHT = 2.0
+# Findings at or above this priority (P0..P2) count as a facet "hit".
+MAX_YIELD_PRIORITY = 2
+DEFAULT_MIN_YIELD = 0.05
+DEFAULT_HISTORY_RUNS = 200
+
+# First match wins: test docs are tests, JSON fixtures under tests/ are tests.
+PATH_CLASSES: List[Tuple[str, List[str]]] = [
+    ("tests", [
+        "tests/**", "test/**", "**/tests/**", "**/test/**", "**/__tests__/**", "**/testdata/**",
+        "**/*_test.*", "**/test_*.py", "**/*.test.*", "**/*.spec.*", "**/*_spec.rb", "**/conftest.py",
+    ]),
+    ("docs", [
+        "docs/**", "doc/**", "**/*.md", "**/*.rst", "**/*.adoc", "**/*.txt",
+        "**/LICENSE*", "**/CHANGELOG*", "**/README*", "**/NOTICE*",
+    ]),
+    ("config", [
+        ".github/**", "**/*.json", "**/*.yml", "**/*.yaml", "**/*.toml", "**/*.ini", "**/*.cfg",
+        "**/*.lock", "**/Dockerfile*", "**/.gitignore", "**/.editorconfig",
+    ]),
+]
+CLASS_RES = [(name, re.compile("|".join(f"(?:{glob_to_regex(p)})" for p in pats))) for name, pats in PATH_CLASSES]
+STAT_LINE_RE = re.compile(r"^\s*(\S.*?)\s+\|\s+(?:\d+|Bin)")
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def classify(path: str) -> str:
+    for name, rx in CLASS_RES:
+        if rx.match(path):
+            return name
+    return "code"
+
+
+def diff_paths(lines: Iterable[str]) -> List[str]:
+    """Changed paths of a unified diff (header lines only)."""
+    out: List[str] = []
+    seen: Set[str] = set()
+    for raw in lines:
+        if raw.startswith("diff --git "):
+            parts = raw.rstrip("\n").split(" ")
+            path = strip_prefix(parts[3]) if len(parts) == 4 else ""
+        elif raw.startswith("+++ ") or raw.startswith("--- "):
+            path = strip_prefix(raw[4:].rstrip("\n").split("\t", 1)[0])
+        else:
+            continue
+        if path and path != "/dev/null" and path not in seen:
+            seen.add(path)
+            out.append(path)
+    return out
+
+
+def stat_paths(text: str) -> List[str]:
+    """Paths of a `git apply --stat` summary (long paths are abbreviated but keep their suffix)."""
+    out = []
+    for line in text.splitlines():
+        m = STAT_LINE_RE.match(line)
+        if m:
+            path = m.group(1).split(" => ")[-1].strip("{} ")
+            out.append(path[4:] if path.startswith(".../") else path)
+    return out
+
+
+def class_key(paths: Iterable[str]) -> Tuple[str, Dict[str, int]]:
+    counts: Dict[str, int] = {}
+    for path in paths:
+        cls = classify(path)
+        counts[cls] = counts.get(cls, 0) + 1
+    return "+".join(sorted(counts)) or "empty", counts
+
+
+def prior_for(key: str, facet_classes: Iterable[str]) -> float:
+    """1.0 when the facet is registered as relevant to one of the diff's classes ("code" = anything else)."""
+    classes = key.split("+")
+    if "empty" in classes:
+        return 1.0
+    return 1.0 if any(cls in classes for cls in facet_classes) else 0.0
+
+
+def fragment_hit(path: str) -> Optional[bool]:
+    """True if the fragment has a P0-P2 finding, False if none, None if unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    findings = data.get("findings") if isinstance(data, dict) else None
+    if not isinstance(findings, list):
+        return None
+    for finding in findings:
+        prio = finding.get("priority") if isinstance(finding, dict) else None
+        if isinstance(prio, int) and prio <= MAX_YIELD_PRIORITY:
+            return True
+    return False
+
+
+def load_history(root: str, key: str, facets: List[str], limit: int,
+                 exclude: str = "") -> Tuple[Dict[str, Tuple[int, int]], int]:
+    """{facet: (runs, hits)} over the newest `limit` review runs whose diff class equals `key`."""
+    runs: List[Tuple[float, str]] = []
+    try:
+        scopes = [e.path for e in os.scandir(root) if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return {}, 0
+    exclude = os.path.realpath(exclude) if exclude else ""
+    for scope in scopes:
+        try:
+            entries = [e for e in os.scandir(scope) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                runs.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
+    runs.sort(reverse=True)
+    stats: Dict[str, Tuple[int, int]] = {}
+    matched = 0
+    for _mtime, run_dir in runs:
+        if matched >= limit:
+            break
+        if exclude and os.path.realpath(run_dir) == exclude:
+            continue
+        run_key = ""
+        selection = load_selection(os.path.join(run_dir, SELECTION_FILE))
+        ran = set(facets) if selection is None else set(str(s) for s in selection["selected"])
+        if selection and selection.get("diff_class"):
+            run_key = str(selection["diff_class"])
+        elif os.path.isfile(os.path.join(run_dir, MANIFEST_FILE)):
+            manifest = load_manifest(os.path.join(run_dir, MANIFEST_FILE))
+            if manifest is None:
+                continue
+            run_key = class_key(manifest_paths(manifest))[0]
+        else:
+            try:
+                with open(os.path.join(run_dir, "diff-summary.txt"), "r", encoding="utf-8") as fh:
+                    run_key = class_key(stat_paths(fh.read()))[0]
+            except OSError:
+                continue
+        if run_key != key:
+            continue
+        matched += 1
+        for facet in facets:
+            # A skipped facet's file (if any) is left over from an earlier run in the same dir.
+            hit = None if facet not in ran else fragment_hit(os.path.join(run_dir, f"{facet}.json"))
+            if hit is None:
+                continue
+            n, h = stats.get(facet, (0, 0))
+            stats[facet] = (n + 1, h + (1 if hit else 0))
+    return stats, matched
+
+
+def load_selection(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) and isinstance(data.get("selected"), list) else None
+
+
+def split_csv(value: str) -> List[str]:
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+def select(facets: List[str], mode: str, paths: List[str], must_run: List[str], min_yield: float,
+           fired: List[str], history: Dict[str, Tuple[int, int]],
+           facet_classes: Optional[Dict[str, List[str]]] = None) -> dict:
+    key, counts = class_key(paths)
+    decisions = []
+    explicit = split_csv(mode) if mode not in {"all", "auto"} else []
+    for facet in facets:
+        runs, hits = history.get(facet, (0, 0))
+        prior = prior_for(key, (facet_classes or {}).get(facet, DIFF_CLASSES))
+        rate = (hits + prior * PRIOR_WEIGHT) / (runs + PRIOR_WEIGHT)
+        if mode == "all":
+            run, reason = True, "all"
+        elif explicit:
+            run, reason = facet in explicit, "listed" if facet in explicit else "not listed"
+        elif facet in must_run:
+            run, reason = True, "must-run"
+        elif facet == "security" and fired:
+            run, reason = True, "hard-trigger: " + ",".join(fired)
+        elif rate >= min_yield:
+            run, reason = True, f"yield {rate:.2f}" if runs else "prior"
+        else:
+            run, reason = False, f"yield {rate:.2f} < {min_yield:g}" if runs else f"not relevant to {key} diffs"
+        decisions.append({"facet": facet, "run": run, "reason": reason, "rate": round(rate, 3),
+                          "history_runs": runs, "history_hits": hits})
+    return {
+        "version": 1,
+        "mode": "list" if explicit else mode,
+        "diff_class": key,
+        "files": counts,
+        "selected": [d["facet"] for d in decisions if d["run"]],
+        "skipped": [d["facet"] for d in decisions if not d["run"]],
+        "decisions": decisions,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Choose review-parallel facets for a diff.")
+    parser.add_argument("diff_file", nargs="?", default="", help="Unified diff ('-' for stdin)")
+    parser.add_argument("--facets", default="", help="Candidate facet slugs, comma-separated (in run order)")
+    parser.add_argument("--manifest", default="", help=f"{MANIFEST_FILE} of the diff: read its paths instead of parsing diff_file")
+    parser.add_argument("--mode", default="auto", help="all | auto | comma-separated slugs (default: auto)")
+    parser.add_argument("--must-run", default="correctness", help="Facets auto mode always runs (default: correctness)")
+    parser.add_argument("--min-yield", type=float, default=DEFAULT_MIN_YIELD,
+                        help=f"Minimum blended finding rate for auto mode (default: {DEFAULT_MIN_YIELD})")
+    parser.add_argument("--registry", default="", help="facets.json for the class priors (default: FACETS_FILE, repo override, bundled)")
+    parser.add_argument("--hard-triggers", default="", help="hard-triggers.json of this run (forces security when fired)")
+    parser.add_argument("--history-root", default="", help=f"Past review runs (default: <repo>/{HISTORY_ROOT})")
+    parser.add_argument("--history-runs", type=int, default=DEFAULT_HISTORY_RUNS,
+                        help=f"Use at most this many similar past runs (default: {DEFAULT_HISTORY_RUNS})")
+    parser.add_argument("--exclude-run", default="", help="Run dir to leave out of the history (the current one)")
+    parser.add_argument("--out", default="", help=f"Write the selection JSON here (e.g. <run-dir>/{SELECTION_FILE})")
+    parser.add_argument("--read", default="", metavar="SELECTION",
+                        help="Print the selected slugs (comma-separated) of an existing selection file and exit")
+    args = parser.parse_args(argv)
+
+    if args.read:
+        selection = load_selection(args.read)
+        if selection is None:
+            eprint(f"invalid facet selection: {args.read}")
+            return 1
+        print(",".join(str(s) for s in selection["selected"]))
+        return 0
+
+    facets = split_csv(args.facets)
+    if not facets or not args.diff_file:
+        eprint("diff_file and --facets are required")
+        return 2
+    if args.mode not in {"all", "auto"}:
+        unknown = [s for s in split_csv(args.mode) if s not in facets]
+        if unknown or not split_csv(args.mode):
+            eprint(f"invalid FACET_SELECT: {args.mode} (use all, auto or slugs from: {','.join(facets)})")
+            return 1
+    must_run = split_csv(args.must_run)
+    unknown = [s for s in must_run if s not in facets]
+    if unknown:
+        eprint(f"unknown must-run facet(s): {','.join(unknown)}")
+        return 1
+
+    manifest = load_manifest(args.manifest) if args.manifest else None
+    if manifest is not None:
+        paths = manifest_paths(manifest)
+    elif args.diff_file == "-":
+        paths = diff_paths(sys.stdin)
+    else:
+        with open(args.diff_file, "r", encoding="utf-8", errors="surrogateescape") as fh:
+            paths = diff_paths(fh)
+
+    fired: List[str] = []
+    if args.hard_triggers:
+        try:
+            with open(args.hard_triggers, "r", encoding="utf-8") as fh:
+                fired = [str(n) for n in json.load(fh).get("fired", [])]
+        except (OSError, ValueError, AttributeError):
+            fired = []
+
+    registry = registry_path(args.registry)
+    try:
+        facet_classes = {f["slug"]: f["classes"] for f in load_registry(registry)}
+    except (OSError, ValueError) as exc:
+        eprint(f"invalid facet registry {registry}: {exc}")
+        return 1
+
+    key = class_key(paths)[0]
+    history: Dict[str, Tuple[int, int]] = {}
+    similar = 0
+    if args.mode == "auto":
+        root = args.history_root or os.path.join(os.getcwd(), HISTORY_ROOT)
+        history, similar = load_history(root, key, facets, args.history_runs, args.exclude_run)
+
+    result = select(facets, args.mode, paths, must_run, args.min_yield, fired, history, facet_classes)
+    result["history_similar_runs"] = similar
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+            fh.write("\n")
+    print(",".join(result["selected"]))
+    skipped = f" (skipped: {', '.join(result['skipped'])})" if result["skipped"] else ""
+    eprint(
+        f"Facets: {len(result['selected'])}/{len(facets)} selected for {key} diff, "
+        f"{similar} similar past run(s){skipped}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,294 @@
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+HUNK_LINE_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@", re.M)
+EMPTY_LINE_RE = re.compile(r"\n(?=\r?\n)")
+INDEX_RE = re.compile(r"^index ([0-9a-f]+)\.\.([0-9a-f]+)(?: ([0-7]{6}))?$")
+
+
+class PatchParseError(ValueError):
+    pass
+
+
+@dataclass
+class FilePatch:
+    old_path: str = ""
+    new_path: str = ""
+    old_mode: str = ""
+    new_mode: str = ""
+    new_file_mode: str = ""
+    deleted_file_mode: str = ""
+    index_mode: str = ""
+    rename_from: str = ""
+    rename_to: str = ""
+    copy_from: str = ""
+    copy_to: str = ""
+    binary: bool = False
+    added: int = 0
+    deleted: int = 0
+    hunks: List[Tuple[int, int, int, int]] = field(default_factory=list)
+    header_line: int = 0
+
+    @property
+    def path(self) -> str:
+        """Repo-relative path the patch writes to (old path for deletes)."""
+        return self.new_path or self.old_path
+
+    @property
+    def is_new(self) -> bool:
+        return bool(self.new_file_mode)
+
+    @property
+    def is_deleted(self) -> bool:
+        return bool(self.deleted_file_mode)
+
+    @property
+    def is_rename(self) -> bool:
+        return bool(self.rename_from or self.rename_to)
+
+    @property
+    def is_copy(self) -> bool:
+        return bool(self.copy_from or self.copy_to)
+
+    @property
+    def is_mode_change(self) -> bool:
+        return bool(self.old_mode or self.new_mode)
+
+    def modes(self) -> List[str]:
+        return [m for m in (self.old_mode, self.new_mode, self.new_file_mode, self.deleted_file_mode, self.index_mode) if m]
+
+
+def unquote_path(value: str) -> str:
+    """Decode a git C-style quoted path ("a/caf\\303\\251") when quoted."""
+    value = value.strip()
+    if len(value) < 2 or value[0] != '"' or value[-1] != '"':
+        return value
+    body = value[1:-1]
+    out = bytearray()
+    i = 0
+    escapes = {"n": 10, "t": 9, "r": 13, '"': 34, "\\": 92, "a": 7, "b": 8, "f": 12, "v": 11}
+    while i < len(body):
+        ch = body[i]
+        if ch == "\\" and i + 1 < len(body):
+            nxt = body[i + 1]
+            if re.match(r"[0-7]{3}", body[i + 1 : i + 4]):
+                out.append(int(body[i + 1 : i + 4], 8))
+                i += 4
+                continue
+            if nxt in escapes:
+                out.append(escapes[nxt])
+                i += 2
+                continue
+        out.extend(ch.encode("utf-8"))
+        i += 1
+    return out.decode("utf-8", errors="replace")
+
+
+def strip_prefix(value: str) -> str:
+    value = unquote_path(value)
+    if value.startswith("a/") or value.startswith("b/"):
+        return value[2:]
+    return value
+
+
+def _split_git_header(rest: str) -> Tuple[str, str]:
+    """Split the `a/<old> b/<new>` part of a `diff --git` line."""
+    if rest.startswith('"'):
+        m = re.match(r'^("(?:[^"\\]|\\.)*")\s+(.*)$', rest)
+        if m:
+            return strip_prefix(m.group(1)), strip_prefix(m.group(2))
+    # Common case: identical old/new path ("a/<p> b/<p>"), split in the middle.
+    if rest.startswith("a/") and (len(rest) - 5) % 2 == 0:
+        half = (len(rest) - 5) // 2
+        if rest[2 + half : 5 + half] == " b/" and rest[2 : 2 + half] == rest[5 + half :]:
+            return rest[2 : 2 + half], rest[5 + half :]
+    # Unquoted paths may contain spaces; prefer the split where both sides name the same path.
+    candidates = [m.start() for m in re.finditer(r" b/", rest)]
+    for pos in candidates:
+        a, b = rest[:pos], rest[pos + 1 :]
+        if a.startswith("a/") and a[2:] == b[2:]:
+            return a[2:], b[2:]
+    if candidates:
+        pos = candidates[-1]
+        return strip_prefix(rest[:pos]), strip_prefix(rest[pos + 1 :])
+    raise PatchParseError(f"cannot parse diff header: diff --git {rest}")
+
+
+def _side_path(value: str) -> str:
+    value = value.split("\t", 1)[0].rstrip()
+    if value == "/dev/null":
+        return ""
+    return strip_prefix(value)
+
+
+def _parse_header(fp: FilePatch, header: str) -> None:
+    for raw in header.split("\n"):
+        line = raw.rstrip("\r")
+        if line.startswith("--- "):
+            fp.old_path = _side_path(line[4:])
+        elif line.startswith("+++ "):
+            fp.new_path = _side_path(line[4:])
+        elif line.startswith("index "):
+            m = INDEX_RE.match(line)
+            if m and m.group(3):
+                fp.index_mode = m.group(3)
+        elif line.startswith("old mode "):
+            fp.old_mode = line[len("old mode ") :].strip()
+        elif line.startswith("new mode "):
+            fp.new_mode = line[len("new mode ") :].strip()
+        elif line.startswith("new file mode "):
+            fp.new_file_mode = line[len("new file mode ") :].strip()
+        elif line.startswith("deleted file mode "):
+            fp.deleted_file_mode = line[len("deleted file mode ") :].strip()
+        elif line.startswith("rename from "):
+            fp.rename_from = unquote_path(line[len("rename from ") :])
+        elif line.startswith("rename to "):
+            fp.rename_to = unquote_path(line[len("rename to ") :])
+        elif line.startswith("copy from "):
+            fp.copy_from = unquote_path(line[len("copy from ") :])
+        elif line.startswith("copy to "):
+            fp.copy_to = unquote_path(line[len("copy to ") :])
+        elif line.startswith("GIT binary patch"):
+            fp.binary = True
+            return
+        elif line.startswith("Binary files ") and line.endswith(" differ"):
+            fp.binary = True
+    if fp.deleted_file_mode:
+        fp.new_path = ""
+
+
+def _cut_headerless(text: str) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Split off `--- <old>` / `+++ <new>` header pairs that sit outside any hunk.
+
+    git apply treats every such pair as the start of another file patch, with or without a
+    `diff --git` line, so they are parsed (and policy-checked) as files of their own.
+    Hunks are walked by their header counts: a `--- ` line inside a hunk is a removed line.
+    Returns the text before the first pair and [(offset, block)] for each pair.
+    """
+    lines = text.split("\n")
+    cuts: List[int] = []
+    offsets: List[int] = []
+    pos = 0
+    old_left = new_left = 0
+    for i, line in enumerate(lines):
+        offsets.append(pos)
+        pos += len(line) + 1
+        if old_left > 0 or new_left > 0:
+            tag = line[:1]
+            if tag == "+":
+                new_left -= 1
+                continue
+            if tag == "-":
+                old_left -= 1
+                continue
+            if tag in (" ", "", "\r"):
+                old_left -= 1
+                new_left -= 1
+                continue
+            if tag == "\\":
+                continue
+            # Hunk counts do not match the body; the count check reports it.
+            old_left = new_left = 0
+        m = HUNK_RE.match(line)
+        if m:
+            old_left = int(m.group(2)) if m.group(2) is not None else 1
+            new_left = int(m.group(4)) if m.group(4) is not None else 1
+        elif line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            cuts.append(offsets[i])
+    if not cuts:
+        return text, []
+    blocks = [(at, text[at:end]) for at, end in zip(cuts, cuts[1:] + [len(text)])]
+    return text[: cuts[0]], blocks
+
+
+def _count_hunks(fp: FilePatch, body: str, block_line: int) -> None:
+    """Fill the hunks and +/- counts of `fp` from its body (starting at the first "\n@@")."""
+    # Trailing blank lines (e.g. before a closing fence) are not hunk content.
+    body = body.rstrip("\r\n") + "\n"
+    fp.added = body.count("\n+")
+    fp.deleted = body.count("\n-")
+    context = body.count("\n ") + len(EMPTY_LINE_RE.findall(body))
+    old_total = new_total = 0
+    for m in HUNK_LINE_RE.finditer(body):
+        old_count = int(m.group(2)) if m.group(2) is not None else 1
+        new_count = int(m.group(4)) if m.group(4) is not None else 1
+        fp.hunks.append((int(m.group(1)), old_count, int(m.group(3)), new_count))
+        old_total += old_count
+        new_total += new_count
+    if not fp.hunks:
+        raise PatchParseError(f"line {block_line}: malformed hunk header for {fp.path or '<unknown>'}")
+    if old_total != fp.deleted + context or new_total != fp.added + context:
+        raise PatchParseError(
+            f"line {block_line}: hunk line counts do not match their headers for {fp.path or '<unknown>'} "
+            f"(headers: -{old_total} +{new_total}; body: -{fp.deleted + context} +{fp.added + context})"
+        )
+
+
+def _headerless_patches(blocks: List[Tuple[int, str]], text: str, base: int) -> Iterator[FilePatch]:
+    """FilePatches for `---`/`+++` blocks cut by _cut_headerless (offsets relative to text[base:])."""
+    for at, block in blocks:
+        block_line = text.count("\n", 0, base + at) + 1
+        fp = FilePatch(header_line=block_line)
+        body_at = block.find("\n@@")
+        _parse_header(fp, block if body_at == -1 else block[:body_at])
+        if body_at != -1 and not fp.binary:
+            _count_hunks(fp, block[body_at:], block_line)
+        yield fp
+
+
+def iter_file_patches(text: str) -> Iterator[FilePatch]:
+    """
+    Yield one FilePatch per file block, in patch order (single pass).
+
+    A file block is a `diff --git` block, or a `--- `/`+++ ` header pair outside any hunk
+    (git apply applies those too, so they must not hide inside the previous block).
+    Each FilePatch carries what `git apply --summary/--numstat` would report: paths,
+    modes, renames/copies/deletes, binary markers, per-file add/delete counts and hunks.
+    Blocks are located with str.find and +/- lines are counted with str.count, so the
+    per-line work stays in C; hunks are walked line by line only when a block contains
+    a `--- ` line after its first hunk header.
+
+    Blocks are parsed lazily: consumers may stop at the first violation.
+    Raises PatchParseError when hunk bodies do not add up to their header counts.
+    """
+    marker = "\ndiff --git "
+    if text.startswith("diff --git "):
+        pos = 0
+    else:
+        found = text.find(marker)
+        pos = len(text) if found == -1 else found + 1
+        # Text before the first `diff --git` line: only header pairs there are file patches.
+        _, blocks = _cut_headerless(text[:pos])
+        yield from _headerless_patches(blocks, text, 0)
+    header_line = text.count("\n", 0, pos) + 1
+    while pos < len(text):
+        nxt = text.find(marker, pos)
+        end = len(text) if nxt == -1 else nxt + 1
+        block = text[pos:end]
+        block_line = header_line
+        header_line += block.count("\n")
+        block_at = pos
+        pos = end
+
+        first_nl = block.find("\n")
+        first = block if first_nl == -1 else block[:first_nl]
+        old_path, new_path = _split_git_header(first.rstrip("\r")[len("diff --git ") :])
+        fp = FilePatch(old_path=old_path, new_path=new_path, header_line=block_line)
+
+        body_at = block.find("\n@@")
+        header = block if body_at == -1 else block[:body_at]
+        _parse_header(fp, header)
+        if body_at == -1 or fp.binary:
+            yield fp
+            continue
+
+        body = block[body_at:]
+        extra: List[Tuple[int, str]] = []
+        if "\n--- " in body:
+            body, extra = _cut_headerless(body)
+        _count_hunks(fp, body, block_line)
+        yield fp
+        yield from _headerless_patches(extra, text, block_at + body_at)
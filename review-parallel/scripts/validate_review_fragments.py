@@ -6,14 +6,8 @@ import re
 import sys
 from typing import Dict, List, Optional, Tuple
 
-DEFAULT_FACETS = [
-    "correctness",
-    "edge-cases",
-    "security",
-    "performance",
-    "tests-observability",
-    "design-consistency",
-]
+# Facet registry lookup (same order as facet_registry.py): FACETS_FILE, repo override, bundled.
+REPO_FACETS_FILE = ".skilled-reviews/.reviews/facets.json"
 
 STATUS_ALLOWED = {"Approved", "Approved with nits", "Blocked", "Question"}
 OVERALL_CORRECTNESS_ALLOWED = {"patch is correct", "patch is incorrect"}
@@ -65,6 +59,36 @@ def eprint(msg: str) -> None:
     print(msg, file=sys.stderr)
 
 
+def registry_facets() -> List[str]:
+    """Facet slugs of the facet registry (facets.json)."""
+    path = os.environ.get("FACETS_FILE") or ""
+    if not path:
+        path = REPO_FACETS_FILE if os.path.isfile(REPO_FACETS_FILE) else os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "facets.json"
+        )
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            facets = json.load(fh)["facets"]
+        slugs = [f["slug"] for f in facets]
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise ValueError(f"cannot read facet registry {path}: {exc}") from None
+    if not slugs or not all(isinstance(s, str) and s for s in slugs):
+        raise ValueError(f"cannot read facet registry {path}: no facet slugs")
+    return slugs
+
+
+def load_selected_facets(run_dir: str) -> List[str]:
+    """Facets chosen by review-parallel's FACET_SELECT (facet-selection.json), else the registry's."""
+    try:
+        with open(os.path.join(run_dir, "facet-selection.json"), "r", encoding="utf-8") as fh:
+            selected = json.load(fh).get("selected")
+    except (OSError, ValueError, AttributeError):
+        return registry_facets()
+    if not isinstance(selected, list) or not selected:
+        return registry_facets()
+    return [str(s) for s in selected]
+
+
 def load_run_id(scope_dir: str, run_id: Optional[str]) -> str:
     if run_id:
         return run_id
@@ -388,7 +412,7 @@ def validate_extra(extra_path: str, expected_slug: str) -> List[str]:
     return validate_fragment(data, expected_slug)
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(
         description="Validate review-parallel fragment JSONs for a run."
     )
@@ -396,8 +420,8 @@ def main() -> int:
     parser.add_argument("run_id", nargs="?", help="Run identifier (default: .current_run)")
     parser.add_argument(
         "--facets",
-        default=",".join(DEFAULT_FACETS),
-        help="Comma-separated facet slugs",
+        default=None,
+        help="Comma-separated facet slugs (default: the run's facet-selection.json, else all of facets.json)",
     )
     parser.add_argument(
         "--schema",
@@ -419,7 +443,7 @@ def main() -> int:
         action="store_true",
         help="Rewrite validated JSON files with pretty formatting.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not SCOPE_ID_RE.match(args.scope_id):
         eprint(f"invalid scope-id: {args.scope_id}")
@@ -445,13 +469,6 @@ def main() -> int:
             eprint(f"  - {err}")
         return 1
 
-    facets = [f.strip() for f in args.facets.split(",") if f.strip()]
-    extra_file = args.extra_file.strip()
-    extra_slug = args.extra_slug.strip()
-    if not facets and not extra_file:
-        eprint("no facets provided (set --facets or --extra-file)")
-        return 1
-
     scope_dir = os.path.join(".skilled-reviews/.reviews/reviewed_scopes", args.scope_id)
     run_id = load_run_id(scope_dir, args.run_id)
     if not RUN_ID_RE.match(run_id):
@@ -466,6 +483,20 @@ def main() -> int:
         eprint(f"run directory not found: {run_dir}")
         return 1
 
+    if args.facets is None:
+        try:
+            facets = load_selected_facets(run_dir)
+        except ValueError as exc:
+            eprint(str(exc))
+            return 1
+    else:
+        facets = [f.strip() for f in args.facets.split(",") if f.strip()]
+    extra_file = args.extra_file.strip()
+    extra_slug = args.extra_slug.strip()
+    if not facets and not extra_file:
+        eprint("no facets provided (set --facets or --extra-file)")
+        return 1
+
     missing = []
     invalid: List[Tuple[str, List[str]]] = []
     facet_data: Dict[str, dict] = {}
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Worker pool for review-parallel facet calls over SSH (WORKERS=host[:slots],...).
+
+`run` wraps one `codex exec ... --output-last-message <out> --output-schema <schema> -` call:
+  - the call goes to the host with the fewest in-flight jobs (ties: the order in WORKERS); a host
+    given as host:N never holds more than N jobs, and callers wait in turn for a free one
+  - one ssh connection per call: the prompt is streamed over stdin, the schema travels inside
+    the remote command, codex writes its last message into a remote temp dir and the remote side
+    prints it back on stdout, so nothing is copied with scp
+  - the collected message is written to <out> locally; the runner validates it like any fragment
+  - an ssh failure (exit 255 without output) moves the call to the next host not tried yet
+  - codex runs in WORKERS_REPO_DIR on the worker when it is set, after checking that its HEAD is
+    the commit the call would read locally (the `-C` dir, else the cwd); a local `-C` path is
+    never sent. Without it codex runs in the ssh login dir and sees only the prompt
+In-flight jobs are counted in a state file shared by every run on this machine (WORKERS_STATE_DIR,
+default <tmp>/skilled-reviews-workers-<uid>), read and rewritten under an flock on `lock`;
+entries of dead processes are dropped on every pass.
+
+Env: WORKERS_SSH (ssh command, default `ssh -o BatchMode=yes`), WORKERS_CODEX_BIN (codex on the
+workers, default `codex`), WORKERS_REPO_DIR (checkout of this repo on every worker).
+
+Usage:
+  worker_pool.py run [--workers SPEC] [--tag T] [--metrics FILE] -- codex exec ...
+  worker_pool.py status [--workers SPEC]      print the in-flight jobs per host as JSON
+"""
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import re
+import shlex
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+STATE_FILE = "state.json"
+LOCK_FILE = "lock"
+POLL_SEC = 0.2
+DEFAULT_SSH = "ssh -o BatchMode=yes"
+# ssh exits 255 when it cannot connect (or the connection drops).
+SSH_FAILED = 255
+# Queue waits shorter than this are not reported on stderr.
+REPORT_WAIT_SEC = 1.0
+VALUE_FLAGS = ("--output-last-message", "--output-schema")
+# Local working-dir flags: the path means nothing on a worker.
+CD_FLAGS = ("-C", "--cd")
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def default_dir() -> str:
+    return os.environ.get("WORKERS_STATE_DIR") or os.path.join(
+        tempfile.gettempdir(), f"skilled-reviews-workers-{os.getuid()}"
+    )
+
+
+def parse_workers(spec: str) -> List[Tuple[str, int]]:
+    """[(host, slots)] from `host[:slots],...`; slots 0 means no cap."""
+    hosts: List[Tuple[str, int]] = []
+    for item in spec.replace(" ", ",").split(","):
+        if not item:
+            continue
+        m = re.fullmatch(r"(.+?)(?::([0-9]+))?", item)
+        host, slots = m.group(1), int(m.group(2) or 0)
+        if not re.fullmatch(r"[A-Za-z0-9._@%-]+|\[[0-9A-Fa-f:.%]+\]", host) or host.startswith("-"):
+            raise ValueError(f"invalid worker host: {host!r}")
+        if any(h == host for h, _ in hosts):
+            raise ValueError(f"worker listed twice: {host!r}")
+        hosts.append((host, slots))
+    if not hosts:
+        raise ValueError("no workers given")
+    return hosts
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Pool:
+    def __init__(self, directory: str, hosts: List[Tuple[str, int]]) -> None:
+        self.directory = directory
+        self.hosts = hosts
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    @contextlib.contextmanager
+    def state(self) -> Iterator[dict]:
+        """The shared state, locked for the duration of the block and saved afterwards."""
+        fd = os.open(os.path.join(self.directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            path = os.path.join(self.directory, STATE_FILE)
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    st = json.load(fh)
+                if not isinstance(st, dict):
+                    raise ValueError("state is not an object")
+            except (OSError, ValueError):
+                st = {}
+            st.setdefault("next_ticket", 1)
+            st.setdefault("queue", [])
+            st.setdefault("jobs", [])
+            st["queue"] = [e for e in st["queue"] if _alive(int(e.get("pid", 0)))]
+            st["jobs"] = [e for e in st["jobs"] if _alive(int(e.get("pid", 0)))]
+            yield st
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(st, fh)
+            os.replace(tmp, path)
+        finally:
+            os.close(fd)
+
+    def in_flight(self, st: dict) -> Dict[str, int]:
+        counts = {host: 0 for host, _ in self.hosts}
+        for job in st["jobs"]:
+            if job.get("host") in counts:
+                counts[job["host"]] += 1
+        return counts
+
+    def acquire(self, tag: str, tried: List[str]) -> Tuple[int, str]:
+        """Wait for a host (least in-flight first, never one in `tried`); returns (ticket, host)."""
+        entry = {"pid": os.getpid(), "tag": tag, "since": round(time.time(), 3), "tried": list(tried)}
+        with self.state() as st:
+            entry["ticket"] = st["next_ticket"]
+            st["next_ticket"] += 1
+            st["queue"].append(entry)
+        while True:
+            with self.state() as st:
+                if entry["ticket"] not in [e.get("ticket") for e in st["queue"]]:
+                    # The state file was reset under us: queue again.
+                    st["queue"].append(entry)
+                counts = self.in_flight(st)
+                free = [(counts[host], i, host) for i, (host, slots) in enumerate(self.hosts)
+                        if host not in tried and (slots == 0 or counts[host] < slots)]
+                if free:
+                    host = min(free)[2]
+                    # Arrival order among the callers that could take this host (a retried call
+                    # never goes back to a host it already left).
+                    ahead = [e for e in st["queue"] if e.get("ticket", 0) < entry["ticket"]
+                             and host not in e.get("tried", [])]
+                    if not ahead:
+                        st["queue"] = [e for e in st["queue"] if e.get("ticket") != entry["ticket"]]
+                        st["jobs"].append(dict(entry, host=host))
+                        return entry["ticket"], host
+            time.sleep(POLL_SEC)
+
+    def release(self, ticket: int) -> None:
+        with self.state() as st:
+            st["jobs"] = [e for e in st["jobs"] if e.get("ticket") != ticket]
+            st["queue"] = [e for e in st["queue"] if e.get("ticket") != ticket]
+
+
+def remote_script(command: List[str], schema_text: Optional[str], codex_bin: str,
+                  repo_dir: str = "", commit: str = "") -> str:
+    """
+    POSIX sh for the worker: run codex (in repo_dir once its HEAD is `commit`), print its last
+    message into stdout and keep its exit code.
+    """
+    exec_args = command[command.index("exec"):]
+    args: List[str] = []
+    i = 0
+    while i < len(exec_args):
+        arg = exec_args[i]
+        flag, eq, _ = arg.partition("=")
+        if flag in CD_FLAGS and (eq or i + 1 < len(exec_args)):
+            i += 1 if eq else 2
+            continue
+        if flag in VALUE_FLAGS and (eq or i + 1 < len(exec_args)):
+            target = '"$d"/out' if flag == "--output-last-message" else '"$d"/schema.json'
+            args += [flag, target]
+            i += 1 if eq else 2
+            continue
+        args.append(shlex.quote(arg))
+        i += 1
+    lines = [
+        'd="$(mktemp -d "${TMPDIR:-/tmp}/skilled-reviews-worker.XXXXXX")" || exit 1',
+        "trap 'rm -rf \"$d\"' EXIT",
+        "trap 'exit 143' HUP INT TERM",
+    ]
+    if schema_text is not None:
+        lines.append(f"printf '%s' {shlex.quote(schema_text)} >\"$d\"/schema.json")
+    if repo_dir:
+        lines += [
+            f"cd {shlex.quote(repo_dir)} || exit 1",
+            'head="$(git rev-parse HEAD 2>/dev/null)"',
+            f'if [ "$head" != {shlex.quote(commit)} ]; then',
+            f'  echo "workers: $(uname -n):$PWD is at ${{head:-<no commit>}}, expected {commit}" >&2',
+            "  exit 1",
+            "fi",
+        ]
+    lines += [
+        # codex's own stdout goes to stderr: stdout carries only the last message.
+        f"{shlex.quote(codex_bin)} {' '.join(args)} >&2",
+        "rc=$?",
+        'if [ -f "$d"/out ]; then cat "$d"/out; fi',
+        'exit "$rc"',
+    ]
+    return "\n".join(lines)
+
+
+def _value(command: List[str], flag: str) -> str:
+    for i, arg in enumerate(command):
+        if arg == flag and i + 1 < len(command):
+            return command[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return ""
+
+
+def run_on_workers(pool: Pool, command: List[str], tag: str, metrics: str) -> int:
+    if "exec" not in command:
+        eprint("workers: expected a `codex exec ...` command")
+        return 2
+    out_path = _value(command, "--output-last-message")
+    schema_path = _value(command, "--output-schema")
+    schema_text = None
+    if schema_path:
+        try:
+            with open(schema_path, "r", encoding="utf-8") as fh:
+                schema_text = fh.read()
+        except OSError as exc:
+            eprint(f"workers: cannot read schema {schema_path}: {exc}")
+            return 1
+    repo_dir = os.environ.get("WORKERS_REPO_DIR", "")
+    commit = ""
+    if repo_dir:
+        local_dir = _value(command, "-C") or _value(command, "--cd") or "."
+        try:
+            commit = subprocess.run(["git", "-C", local_dir, "rev-parse", "HEAD"], check=True,
+                                    capture_output=True, text=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            eprint(f"workers: WORKERS_REPO_DIR is set but {local_dir} has no commit to compare with")
+            return 1
+    ssh = shlex.split(os.environ.get("WORKERS_SSH") or DEFAULT_SSH)
+    script = remote_script(command, schema_text, os.environ.get("WORKERS_CODEX_BIN") or "codex", repo_dir, commit)
+    # The prompt is read once: a call that moves to another host sends it again.
+    prompt = sys.stdin.buffer.read()
+
+    child: Optional[subprocess.Popen] = None
+
+    def on_signal(signum, _frame):
+        # Pass the signal on to ssh (which closes the remote session); a waiting caller just leaves.
+        if child is not None and child.poll() is None:
+            child.send_signal(signum)
+            return
+        raise SystemExit(128 + signum)
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, on_signal)
+
+    tried: List[str] = []
+    rc = 1
+    while len(tried) < len(pool.hosts):
+        start = time.monotonic()
+        ticket, host = pool.acquire(tag, tried)
+        tried.append(host)
+        queued = time.monotonic() - start
+        if queued >= REPORT_WAIT_SEC:
+            eprint(f"workers: {tag or 'codex'} waited {queued:.1f}s for a worker")
+        started = time.monotonic()
+        try:
+            try:
+                # `sh -c`: the script is POSIX sh whatever the worker's login shell is.
+                child = subprocess.Popen(ssh + [host, "sh -c " + shlex.quote(script)], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            except OSError as exc:
+                eprint(f"workers: cannot run {ssh[0]}: {exc}")
+                return 127
+            output, _ = child.communicate(prompt)
+            rc = child.returncode
+            rc = 128 - rc if rc < 0 else rc
+        finally:
+            pool.release(ticket)
+        if metrics:
+            record = {"tag": tag, "host": host, "queued_sec": round(queued, 3),
+                      "run_sec": round(time.monotonic() - started, 3), "exit": rc, "ts": round(time.time(), 3)}
+            with open(metrics, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if rc == SSH_FAILED and not output:
+            if len(tried) < len(pool.hosts):
+                eprint(f"workers: {host} unreachable; retrying {tag or 'the call'} on another worker")
+            continue
+        if out_path and output:
+            os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+            with open(out_path, "wb") as fh:
+                fh.write(output)
+        return rc
+    eprint(f"workers: no worker reachable for {tag or 'the call'} (tried {', '.join(tried)})")
+    return rc
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run codex exec calls on a pool of SSH workers.")
+    sub = parser.add_subparsers(dest="what", required=True)
+    for name, help_text in (("run", "Run one `codex exec` call on the least busy worker"),
+                            ("status", "Print the in-flight jobs per worker as JSON")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--workers", default=os.environ.get("WORKERS", ""),
+                       help="host[:slots],... (default: WORKERS)")
+        p.add_argument("--dir", default="", help="Shared state dir (default: WORKERS_STATE_DIR or <tmp>/skilled-reviews-workers-<uid>)")
+        if name == "run":
+            p.add_argument("--tag", default="", help="Label for the queue and metrics (e.g. the facet)")
+            p.add_argument("--metrics", default="", help="Append {tag, host, queued_sec, run_sec, exit} to this NDJSON file")
+            p.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    try:
+        hosts = parse_workers(args.workers)
+    except ValueError as exc:
+        eprint(f"workers: {exc} (WORKERS={args.workers!r}; expected host[:slots],...)")
+        return 2
+    pool = Pool(args.dir or default_dir(), hosts)
+    if args.what == "status":
+        with pool.state() as st:
+            counts = pool.in_flight(st)
+            report = {"workers": [{"host": h, "slots": s, "in_flight": counts[h]} for h, s in hosts],
+                      "queued": len(st["queue"])}
+        print(json.dumps(report, indent=2))
+        return 0
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        eprint("workers: expected a command after --")
+        return 2
+    return run_on_workers(pool, command, args.tag, args.metrics)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for skilled_reviews_cli.py subcommands.
+
+Each subcommand is started as a fresh interpreter (`--help`, so only startup + imports
+are measured; bytecode is cached in a temp dir) and compared with a bare `python3 -c pass`.
+The "imports" column is the number of modules each command loads (`-X importtime`).
+
+Usage:
+  python3 scripts/bench/bench_cli_startup.py [--repeat 15] [--python python3]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# Every command is available from one of the shipped copies.
+CLI_DIRS = [
+    os.path.join(REPO_ROOT, "implementation", "scripts"),
+    os.path.join(REPO_ROOT, "review-parallel", "scripts"),
+]
+# Keep bytecode out of the skill directories (but do cache it, like an installed skill).
+PYCACHE_DIR = tempfile.mkdtemp(prefix="bench-cli-pycache.")
+BENCH_ENV = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+BENCH_ENV["PYTHONPYCACHEPREFIX"] = PYCACHE_DIR
+
+
+def find_cli(command: str) -> str:
+    from skilled_reviews_cli import COMMANDS
+
+    module = COMMANDS[command][0]
+    for cli_dir in CLI_DIRS:
+        if module is None or os.path.isfile(os.path.join(cli_dir, f"{module}.py")):
+            return os.path.join(cli_dir, "skilled_reviews_cli.py")
+    raise SystemExit(f"no CLI copy ships {module}.py")
+
+
+def time_cmd(cmd: List[str], repeat: int) -> Tuple[float, float]:
+    samples = []
+    # One untimed run writes the .pyc files.
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=BENCH_ENV)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=BENCH_ENV)
+        samples.append(time.perf_counter() - start)
+    return min(samples), statistics.median(samples)
+
+
+def count_imports(cmd: List[str]) -> int:
+    proc = subprocess.run(
+        [cmd[0], "-X", "importtime", *cmd[1:]],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=BENCH_ENV,
+    )
+    return sum(1 for line in proc.stderr.splitlines() if line.startswith("import time:") and "|" in line) - 1
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=15)
+    ap.add_argument("--python", default=sys.executable)
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, CLI_DIRS[0])
+    from skilled_reviews_cli import COMMANDS  # noqa: E402
+
+    rows = [("python -c pass", [args.python, "-c", "pass"])]
+    for command in COMMANDS:
+        rows.append((command, [args.python, find_cli(command), command, "--help"]))
+
+    base_min, _ = time_cmd(rows[0][1], args.repeat)
+    print(f"{'command':<24} {'min ms':>8} {'median ms':>10} {'+ over bare':>12} {'imports':>8}")
+    for label, cmd in rows:
+        best, median = time_cmd(cmd, args.repeat)
+        print(
+            f"{label:<24} {best * 1000:8.1f} {median * 1000:10.1f} "
+            f"{(best - base_min) * 1000:12.1f} {count_imports(cmd):8d}"
+        )
+    shutil.rmtree(PYCACHE_DIR, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
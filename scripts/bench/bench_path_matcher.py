@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-pattern fnmatchcase loop vs the compiled PathMatcher
+used by implementation/scripts/guardrails_policy.py.
+
+Usage:
+  python3 scripts/bench/bench_path_matcher.py [--patterns 400] [--paths 3000] [--repeat 5]
+"""
+import argparse
+import fnmatch
+import os
+import random
+import sys
+import time
+from typing import List
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "implementation", "scripts"))
+
+from guardrails_policy import PathMatcher  # noqa: E402
+
+
+def naive_matches_any(path: str, patterns: List[str]) -> bool:
+    for pat in patterns:
+        if fnmatch.fnmatchcase(path, pat):
+            return True
+    return False
+
+
+def make_patterns(rng: random.Random, count: int) -> List[str]:
+    # Mix what monorepo guardrails look like: directory globs, extension globs, literal files.
+    out: List[str] = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            out.append(f"services/svc{i}/**")
+        elif kind == 1:
+            out.append(f"packages/pkg{i}/src/*.py")
+        elif kind == 2:
+            out.append(f"libs/lib{i}/README.md")
+        else:
+            out.append(f"tools/t{i}/*/config.[jt]s")
+    rng.shuffle(out)
+    return out
+
+
+def make_paths(rng: random.Random, count: int, pattern_count: int) -> List[str]:
+    out: List[str] = []
+    for i in range(count):
+        n = rng.randrange(pattern_count * 2)  # ~half the paths match nothing
+        kind = n % 4
+        if kind == 0:
+            out.append(f"services/svc{n}/handlers/h{i}.go")
+        elif kind == 1:
+            out.append(f"packages/pkg{n}/src/m{i}.py")
+        elif kind == 2:
+            out.append(f"libs/lib{n}/README.md")
+        else:
+            out.append(f"tools/t{n}/x{i}/config.ts")
+    return out
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--patterns", type=int, default=400)
+    ap.add_argument("--paths", type=int, default=3000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    patterns = make_patterns(rng, args.patterns)
+    paths = make_paths(rng, args.paths, args.patterns)
+
+    expected = [naive_matches_any(p, patterns) for p in paths]
+    matcher = PathMatcher(patterns, "write_allow")
+    got = [matcher.match(p) is not None for p in paths]
+    if got != expected:
+        print("ERROR: PathMatcher disagrees with fnmatchcase", file=sys.stderr)
+        return 1
+
+    naive = best_of(args.repeat, lambda: [naive_matches_any(p, patterns) for p in paths])
+    compile_s = best_of(args.repeat, lambda: PathMatcher(patterns, "write_allow"))
+    compiled = best_of(args.repeat, lambda: [matcher.match(p) for p in paths])
+
+    print(f"patterns={len(patterns)} paths={len(paths)} matched={sum(expected)}")
+    print(f"fnmatchcase loop : {naive * 1000:9.2f} ms")
+    print(f"PathMatcher build: {compile_s * 1000:9.2f} ms")
+    print(f"PathMatcher match: {compiled * 1000:9.2f} ms")
+    print(f"speedup (build+match): {naive / (compile_s + compiled):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for `codex exec` with configurable latency, failures and output size.
+
+It answers the prompts of the skill scripts the way scripts/self_test.sh's stub does:
+- implementation prompt -> unified diff creating files under bench/
+- "Facet-Slug: <slug>" prompt (review-parallel / code-review) -> review-v2 fragment
+- anything else (pr-review) -> review-v2 aggregate for "- Scope-id: <id>"
+
+Env:
+  FAKE_CODEX_LATENCY      0 | <sec> | fixed:<sec> | uniform:<lo>:<hi> | normal:<mean>:<sd>
+                          | lognormal:<median>:<sigma> | exp:<mean>   (default 0)
+  FAKE_CODEX_FAIL_RATE    probability (0-1) that a call exits 1 without output (default 0)
+  FAKE_CODEX_FINDINGS     P3 findings per review fragment (default 0)
+  FAKE_CODEX_BODY_CHARS   characters per finding body (default 200)
+  FAKE_CODEX_PATCH_FILES  files per implementation patch (default 1)
+  FAKE_CODEX_PATCH_LINES  added lines per file (default 1)
+  FAKE_CODEX_SEED         base seed; each call mixes in a hash of its prompt (default 0)
+  FAKE_CODEX_LOG          append one JSON line per call (start/end/latency/kind/failed/bytes)
+"""
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+
+def parse_latency(spec: str) -> Tuple[str, List[float]]:
+    spec = (spec or "0").strip()
+    kind, _, rest = spec.partition(":")
+    try:
+        if not rest:
+            return "fixed", [float(kind)]
+        params = [float(x) for x in rest.split(":")]
+    except ValueError:
+        raise ValueError(f"invalid FAKE_CODEX_LATENCY: {spec}") from None
+    expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+    if expected.get(kind) != len(params):
+        raise ValueError(f"invalid FAKE_CODEX_LATENCY: {spec}")
+    return kind, params
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    kind, params = parse_latency(spec)
+    if kind == "fixed":
+        value = params[0]
+    elif kind == "uniform":
+        value = rng.uniform(params[0], params[1])
+    elif kind == "normal":
+        value = rng.gauss(params[0], params[1])
+    elif kind == "lognormal":
+        # median * e^(sigma * N(0,1)): heavy right tail like real model calls.
+        value = params[0] * pow(2.718281828459045, params[1] * rng.gauss(0.0, 1.0))
+    else:
+        value = rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+    return max(0.0, value)
+
+
+def make_finding(idx: int, rng: random.Random, body_chars: int, path: str = "a.txt") -> dict:
+    start = rng.randint(1, 500)
+    body = ("Synthetic finding %d. " % idx) * (body_chars // 20 + 1)
+    return {
+        "title": f"[P3] Synthetic finding {idx}",
+        "body": body[:body_chars] or "stub",
+        "confidence_score": round(rng.random(), 3),
+        "priority": 3,
+        "code_location": {
+            "repo_relative_path": path,
+            "line_range": {"start": start, "end": start + rng.randint(0, 9)},
+        },
+    }
+
+
+def make_fragment(facet: str, slug: str, findings: int, rng: random.Random, body_chars: int = 200) -> dict:
+    items = [make_finding(i, rng, body_chars) for i in range(findings)]
+    return {
+        "schema_version": 2,
+        "facet": facet,
+        "facet_slug": slug,
+        "status": "Approved with nits" if items else "Approved",
+        "findings": items,
+        "questions": [],
+        "uncertainty": [],
+        "overall_correctness": "patch is correct",
+        "overall_explanation": "synthetic output",
+        "overall_confidence_score": 1,
+    }
+
+
+def make_patch(files: int, lines: int, prefix: str = "bench") -> str:
+    out: List[str] = []
+    for i in range(files):
+        path = f"{prefix}/f{i}.txt"
+        out.append(f"diff --git a/{path} b/{path}\n")
+        out.append("new file mode 100644\n")
+        out.append("--- /dev/null\n")
+        out.append(f"+++ b/{path}\n")
+        out.append(f"@@ -0,0 +1,{lines} @@\n" if lines != 1 else "@@ -0,0 +1 @@\n")
+        out.extend(f"+line {j}\n" for j in range(lines))
+    return "".join(out)
+
+
+def parse_args(argv: List[str]) -> Optional[str]:
+    if not argv or argv[0] != "exec":
+        return None
+    out = ""
+    args = argv[1:]
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--output-last-message" and i + 1 < len(args):
+            out = args[i + 1]
+            i += 2
+        elif arg.startswith("--output-last-message="):
+            out = arg.split("=", 1)[1]
+            i += 1
+        elif arg in {"--output-schema", "--sandbox", "-m", "-c", "-C"}:
+            i += 2
+        else:
+            i += 1
+    return out
+
+
+def prompt_value(prompt: str, prefix: str) -> str:
+    for line in prompt.splitlines():
+        if line.startswith(prefix):
+            return line[len(prefix):].strip()
+    return ""
+
+
+def answer(prompt: str, rng: random.Random) -> Tuple[str, str]:
+    """Return (kind, output text) for a prompt."""
+    env = os.environ
+    findings = int(env.get("FAKE_CODEX_FINDINGS", "0"))
+    body_chars = int(env.get("FAKE_CODEX_BODY_CHARS", "200"))
+    if "You are an implementation agent operating in a git repository." in prompt:
+        files = int(env.get("FAKE_CODEX_PATCH_FILES", "1"))
+        lines = int(env.get("FAKE_CODEX_PATCH_LINES", "1"))
+        return "implementation", make_patch(files, lines)
+
+    slug = prompt_value(prompt, "Facet-Slug: ")
+    if slug:
+        facet = prompt_value(prompt, "Facet: ") or slug
+        return f"facet:{slug}", json.dumps(make_fragment(facet, slug, findings, rng, body_chars)) + "\n"
+
+    scope = prompt_value(prompt, "- Scope-id: ") or "unknown"
+    data = make_fragment("PR-level aggregate", "aggregate", findings, rng, body_chars)
+    data["scope_id"] = scope
+    return "aggregate", json.dumps(data) + "\n"
+
+
+def log_event(path: str, event: dict) -> None:
+    line = (json.dumps(event, sort_keys=True) + "\n").encode("utf-8")
+    # One O_APPEND write per call keeps concurrent calls from interleaving.
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    out = parse_args(argv)
+    if out is None:
+        print("Usage: fake_codex.py exec ... --output-last-message <path> -", file=sys.stderr)
+        return 2
+    if not out:
+        print("missing --output-last-message", file=sys.stderr)
+        return 2
+
+    start = time.time()
+    prompt = sys.stdin.read()
+    seed = os.environ.get("FAKE_CODEX_SEED", "0")
+    digest = hashlib.sha256(f"{seed}\0{out}\0{prompt}".encode("utf-8")).hexdigest()
+    rng = random.Random(int(digest[:16], 16))
+
+    latency = sample_latency(os.environ.get("FAKE_CODEX_LATENCY", "0"), rng)
+    failed = rng.random() < float(os.environ.get("FAKE_CODEX_FAIL_RATE", "0"))
+    kind, text = answer(prompt, rng)
+    if latency:
+        time.sleep(latency)
+
+    if not failed:
+        with open(out, "w", encoding="utf-8") as fh:
+            fh.write(text)
+
+    log_path = os.environ.get("FAKE_CODEX_LOG", "")
+    if log_path:
+        log_event(
+            log_path,
+            {
+                "kind": kind,
+                "start": start,
+                "end": time.time(),
+                "latency": round(latency, 6),
+                "failed": failed,
+                "bytes": 0 if failed else len(text.encode("utf-8")),
+            },
+        )
+    if failed:
+        print("fake codex: simulated failure", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the skill scripts (no network, no real codex).
+
+Suites:
+- orchestration: end-to-end wall time of each runner driven by scripts/bench/fake_codex.py,
+  at several concurrency levels (N runner instances at once; for `implementation-candidates`
+  N = CANDIDATES). `overhead_s` is the wall time not covered by any fake codex call, i.e.
+  what the shell/Python orchestration itself costs (plus the fake codex's own interpreter
+  start, ~20 ms per call).
+- validator: validate-fragments on synthetic fragments with thousands of findings.
+- patch-validator: validate-patch on a synthetic patch with thousands of files.
+
+Results are written as JSON; `--baseline` compares lower-is-better metrics against an
+earlier results file.
+
+Usage:
+  python3 scripts/bench/run_bench.py [--quick] [--out bench.json] [--baseline old.json]
+      [--suites orchestration,validator,patch-validator] [--concurrency 1,2,4]
+      [--latency fixed:0.05] [--fail-rate 0] [--findings 2000] [--patch-files 3000]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(BENCH_DIR, "..", ".."))
+FAKE_CODEX = os.path.join(BENCH_DIR, "fake_codex.py")
+sys.path.insert(0, BENCH_DIR)
+
+from fake_codex import make_fragment, make_patch  # noqa: E402
+
+RUNNERS = {
+    "review-parallel": [os.path.join(REPO_ROOT, "review-parallel", "scripts", "run_review_parallel.sh")],
+    "code-review": [os.path.join(REPO_ROOT, "code-review", "scripts", "run_code_review.sh")],
+    "pr-review": ["bash", os.path.join(REPO_ROOT, "pr-review", "scripts", "run_pr_review.sh")],
+    "implementation": [os.path.join(REPO_ROOT, "implementation", "scripts", "run_implementation.sh")],
+    "implementation-candidates": [os.path.join(REPO_ROOT, "implementation", "scripts", "run_implementation.sh")],
+}
+FACETS = ["correctness", "edge-cases", "security", "performance", "tests-observability", "design-consistency"]
+CLI = os.path.join(REPO_ROOT, "implementation", "scripts", "skilled_reviews_cli.py")
+REVIEW_CLI = os.path.join(REPO_ROOT, "review-parallel", "scripts", "skilled_reviews_cli.py")
+
+# Lower is better for these; anything else in a result is informational.
+COMPARED_METRICS = ("wall_s", "overhead_s", "seconds")
+
+
+def run(cmd: List[str], cwd: str, env: Dict[str, str], check: bool = True) -> subprocess.CompletedProcess:
+    proc = subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if check and proc.returncode != 0:
+        raise SystemExit(f"command failed ({proc.returncode}): {' '.join(cmd)}\n{proc.stderr[-2000:]}")
+    return proc
+
+
+def setup_repo(root: str, env: Dict[str, str]) -> None:
+    os.makedirs(root)
+    run(["git", "init", "-q"], root, env)
+    run(["git", "config", "user.email", "bench@example.com"], root, env)
+    run(["git", "config", "user.name", "bench"], root, env)
+    with open(os.path.join(root, "a.txt"), "w", encoding="utf-8") as fh:
+        fh.write("hello\n")
+    run(["git", "add", "a.txt"], root, env)
+    run(["git", "commit", "-q", "-m", "init"], root, env)
+
+    impl_dir = os.path.join(root, ".skilled-reviews", ".implementation")
+    os.makedirs(impl_dir)
+    with open(os.path.join(impl_dir, "impl-guardrails.toml"), "w", encoding="utf-8") as fh:
+        fh.write('write_allow = [\n  "bench/**",\n]\n\nwrite_deny = [\n  ".skilled-reviews/**",\n]\n')
+    est_dir = os.path.join(root, ".skilled-reviews", ".estimation")
+    os.makedirs(est_dir)
+    with open(os.path.join(est_dir, "bench.md"), "w", encoding="utf-8") as fh:
+        fh.write("# bench\n\n- Create files under bench/.\n")
+    with open(os.path.join(root, "change.diff"), "w", encoding="utf-8") as fh:
+        fh.write(
+            "diff --git a/a.txt b/a.txt\n--- a/a.txt\n+++ b/a.txt\n@@ -1 +1,2 @@\n hello\n+world\n"
+        )
+    run(["bash", os.path.join(REPO_ROOT, "review-parallel", "scripts", "ensure_review_schemas.sh")], root, env)
+
+
+def busy_time(events: List[dict], start: float, end: float) -> float:
+    """Length of the union of fake codex call intervals inside [start, end]."""
+    spans = sorted((max(e["start"], start), min(e["end"], end)) for e in events)
+    total = 0.0
+    cur_start: Optional[float] = None
+    cur_end = 0.0
+    for s, e in spans:
+        if e <= s:
+            continue
+        if cur_start is None or s > cur_end:
+            if cur_start is not None:
+                total += cur_end - cur_start
+            cur_start, cur_end = s, e
+        else:
+            cur_end = max(cur_end, e)
+    if cur_start is not None:
+        total += cur_end - cur_start
+    return total
+
+
+def read_events(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def orchestration_once(
+    repo: str, env: Dict[str, str], runner: str, level: int, tag: str
+) -> Dict[str, float]:
+    log = os.path.join(repo, f".bench-{tag}.ndjson")
+    instances = 1 if runner == "implementation-candidates" else level
+    run_env = dict(env, FAKE_CODEX_LOG=log)
+    if runner == "implementation-candidates":
+        run_env["CANDIDATES"] = str(level)
+        run_env["CANDIDATE_POLICY"] = "smallest"
+
+    scopes = [f"bench-{tag}-{i}" for i in range(instances)]
+    if runner == "pr-review":
+        # pr-review aggregates existing fragments: produce them outside the timed window.
+        quiet = dict(env, FAKE_CODEX_LATENCY="0", FAKE_CODEX_FAIL_RATE="0")
+        for scope in scopes:
+            run(RUNNERS["review-parallel"] + [scope, "r1"], repo, quiet)
+
+    procs = []
+    start = time.time()
+    for scope in scopes:
+        procs.append(
+            subprocess.Popen(
+                RUNNERS[runner] + [scope, "r1"],
+                cwd=repo,
+                env=run_env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        )
+    exits = [p.wait() for p in procs]
+    end = time.time()
+
+    events = read_events(log)
+    busy = busy_time(events, start, end)
+    return {
+        "wall_s": end - start,
+        "codex_busy_s": busy,
+        "overhead_s": max(0.0, (end - start) - busy),
+        "calls": len(events),
+        "failed_calls": sum(1 for e in events if e.get("failed")),
+        "failed_runs": sum(1 for rc in exits if rc != 0),
+    }
+
+
+def median_of(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for key in samples[0]:
+        values = [s[key] for s in samples]
+        if key in {"calls", "failed_calls", "failed_runs"}:
+            out[key] = sum(values)
+        else:
+            out[key] = round(statistics.median(values), 4)
+    return out
+
+
+def bench_orchestration(repo: str, env: Dict[str, str], args) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    for runner in args.runners:
+        for level in args.concurrency:
+            samples = [
+                orchestration_once(repo, env, runner, level, f"{runner}-c{level}-{rep}")
+                for rep in range(args.repeat)
+            ]
+            result = median_of(samples)
+            result["repeat"] = args.repeat
+            results[f"orchestration/{runner}/c{level}"] = result
+            print(
+                f"orchestration/{runner}/c{level}: wall={result['wall_s']:.3f}s "
+                f"overhead={result['overhead_s']:.3f}s calls={result['calls']} failed_runs={result['failed_runs']}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def timed(cmd: List[str], cwd: str, env: Dict[str, str], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(cmd, cwd, env)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_validator(repo: str, env: Dict[str, str], args) -> Dict[str, dict]:
+    scope, run_id = "bench-validator", "r1"
+    run_dir = os.path.join(repo, ".skilled-reviews", ".reviews", "reviewed_scopes", scope, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    rng = random.Random(args.seed)
+    for slug in FACETS:
+        with open(os.path.join(run_dir, f"{slug}.json"), "w", encoding="utf-8") as fh:
+            json.dump(make_fragment(slug, slug, args.findings, rng), fh)
+    total = args.findings * len(FACETS)
+    schema = os.path.join(repo, ".skilled-reviews", ".reviews", "schemas", "review-v2.schema.json")
+    cmd = ["python3", REVIEW_CLI, "validate-fragments", scope, run_id, "--facets", ",".join(FACETS), "--schema", schema]
+    seconds = timed(cmd, repo, env, args.repeat)
+    result = {"seconds": round(seconds, 4), "findings": total, "findings_per_s": round(total / seconds, 1)}
+    print(f"validator/fragments: {seconds:.3f}s for {total} findings", file=sys.stderr)
+    return {"validator/fragments": result}
+
+
+def bench_patch_validator(repo: str, env: Dict[str, str], args) -> Dict[str, dict]:
+    patch = os.path.join(repo, ".bench-large.diff")
+    with open(patch, "w", encoding="utf-8") as fh:
+        fh.write(make_patch(args.patch_files, 3))
+    policy = os.path.join(repo, ".skilled-reviews", ".implementation", "impl-guardrails.toml")
+    cmd = [
+        "python3", CLI, "validate-patch", "--repo-root", repo, "--patch", patch,
+        "--policy", policy, "--allow-large-patch", "--no-policy-cache",
+    ]
+    seconds = timed(cmd, repo, env, args.repeat)
+    result = {
+        "seconds": round(seconds, 4),
+        "files": args.patch_files,
+        "files_per_s": round(args.patch_files / seconds, 1),
+    }
+    print(f"patch-validator/files: {seconds:.3f}s for {args.patch_files} files", file=sys.stderr)
+    return {"patch-validator/files": result}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, min_delta: float) -> List[str]:
+    regressions: List[str] = []
+    print(f"{'benchmark':<48} {'metric':<11} {'baseline':>9} {'current':>9} {'ratio':>6}", file=sys.stderr)
+    for name, metrics in sorted(results.items()):
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in metrics or metric not in base:
+                continue
+            old, new = float(base[metric]), float(metrics[metric])
+            ratio = new / old if old > 0 else float("inf") if new > 0 else 1.0
+            flag = ""
+            if ratio > threshold and new - old > min_delta:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {metric}: {old:.3f} -> {new:.3f}")
+            print(f"{name:<48} {metric:<11} {old:9.3f} {new:9.3f} {ratio:6.2f}{flag}", file=sys.stderr)
+    return regressions
+
+
+def csv_ints(value: str) -> List[int]:
+    return [int(x) for x in value.split(",") if x.strip()]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--quick", action="store_true", help="Small sizes for a smoke run")
+    ap.add_argument("--suites", default="orchestration,validator,patch-validator")
+    ap.add_argument("--runners", default=",".join(RUNNERS), help="Comma-separated orchestration runners")
+    ap.add_argument("--concurrency", default="", help="Comma-separated levels (default 1,2,4; quick: 1,2)")
+    ap.add_argument("--latency", default="", help="FAKE_CODEX_LATENCY (default fixed:0.05; quick: 0)")
+    ap.add_argument("--fail-rate", default="0", help="FAKE_CODEX_FAIL_RATE")
+    ap.add_argument("--output-findings", type=int, default=5, help="Findings per fake review answer")
+    ap.add_argument("--findings", type=int, default=0, help="Findings per facet in the validator suite (default 2000)")
+    ap.add_argument("--patch-files", type=int, default=0, help="Files in the patch-validator suite (default 3000)")
+    ap.add_argument("--repeat", type=int, default=0, help="Repetitions per benchmark (default 3; quick: 1)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default="", help="Write results JSON here (default: stdout)")
+    ap.add_argument("--baseline", default="", help="Earlier results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="Regression ratio (default 1.25)")
+    ap.add_argument("--min-delta", type=float, default=0.05, help="Ignore regressions smaller than this (seconds)")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    ap.add_argument("--keep", action="store_true", help="Keep the scratch repository")
+    args = ap.parse_args(argv)
+
+    args.concurrency = csv_ints(args.concurrency or ("1,2" if args.quick else "1,2,4"))
+    args.latency = args.latency or ("0" if args.quick else "fixed:0.05")
+    args.findings = args.findings or (200 if args.quick else 2000)
+    args.patch_files = args.patch_files or (200 if args.quick else 3000)
+    args.repeat = args.repeat or (1 if args.quick else 3)
+    args.runners = [r for r in args.runners.split(",") if r]
+    unknown = [r for r in args.runners if r not in RUNNERS]
+    if unknown:
+        ap.error(f"unknown runners: {unknown}")
+    suites = [s for s in args.suites.split(",") if s]
+
+    scratch = tempfile.mkdtemp(prefix="skilled-reviews-bench.")
+    repo = os.path.join(scratch, "repo")
+    env = dict(os.environ)
+    env.update(
+        {
+            "CODEX_BIN": FAKE_CODEX,
+            "FAKE_CODEX_LATENCY": args.latency,
+            "FAKE_CODEX_FAIL_RATE": args.fail_rate,
+            "FAKE_CODEX_FINDINGS": str(args.output_findings),
+            "FAKE_CODEX_SEED": str(args.seed),
+            "SOT": "- bench",
+            "TESTS": "- not run",
+            "ESTIMATION_FILE": ".skilled-reviews/.estimation/bench.md",
+            "DIFF_FILE": os.path.join(repo, "change.diff"),
+            "APPLY": "0",
+            "PYTHONPYCACHEPREFIX": os.path.join(scratch, "pycache"),
+        }
+    )
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    results: Dict[str, dict] = {}
+    try:
+        setup_repo(repo, env)
+        if "orchestration" in suites:
+            results.update(bench_orchestration(repo, env, args))
+        if "validator" in suites:
+            results.update(bench_validator(repo, env, args))
+        if "patch-validator" in suites:
+            results.update(bench_patch_validator(repo, env, args))
+    finally:
+        if args.keep:
+            print(f"scratch repository kept: {repo}", file=sys.stderr)
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    git_version = subprocess.run(["git", "--version"], stdout=subprocess.PIPE, text=True).stdout.strip()
+    doc = {
+        "schema_version": 1,
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git": git_version,
+            "cpus": os.cpu_count(),
+            "params": {
+                "quick": args.quick,
+                "concurrency": args.concurrency,
+                "latency": args.latency,
+                "fail_rate": args.fail_rate,
+                "output_findings": args.output_findings,
+                "findings": args.findings,
+                "patch_files": args.patch_files,
+                "repeat": args.repeat,
+                "seed": args.seed,
+            },
+        },
+        "results": results,
+    }
+    text = json.dumps(doc, indent=2, sort_keys=True) + "\n"
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh).get("results", {})
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold}x:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())